@@ -1,5 +1,20 @@
 import numpy as np
 import scipy.io
+from utils.profiling import profiled
+
+try:
+    import h5py  # opcional: necessário apenas para arquivos MATLAB v7.3 (HDF5)
+except ImportError:
+    h5py = None
+
+# variáveis de sinal indexadas pelo tempo (podem ser recortadas por janela)
+SIGNAL_VARS = ("dados_entrada", "dados_saida", "entrada", "salida", "tiempo")
+STRUCT_VARS = ("configuracion_experimento", "parametros_sistema")
+CHUNK_SAMPLES = 1 << 20
+
+def _as_signal(x):
+    """Vetor contíguo float64 (sem cópia quando já estiver no formato)."""
+    return np.ascontiguousarray(np.asarray(x, dtype=np.float64).ravel())
 
 def _safe_item(x):
     try:
@@ -33,6 +48,10 @@ class filtragem:
                     valores.append(elem[0])
             else:
                 valores.append(elem)
+        return filtragem.parametros_de_valores(valores)
+
+    @staticmethod
+    def parametros_de_valores(valores):
         return {
             "k": valores[0],
             "tau": valores[1],
@@ -50,29 +69,29 @@ class filtragem:
 
     @staticmethod
     def filtrar_Dados_Entrada(data):
-        variavel_entrada = data[:, 0].tolist()
-        degrau_valor_fixo_60 = data[:, 1].tolist()
+        variavel_entrada = _as_signal(data[:, 0])
+        degrau_valor_fixo_60 = _as_signal(data[:, 1])
         return variavel_entrada, degrau_valor_fixo_60
 
     @staticmethod
     def filtrar_Dados_Saida(data):
-        variavel_saida = data[:, 0].tolist()
-        coluna2 = data[:, 1].tolist()
+        variavel_saida = _as_signal(data[:, 0])
+        coluna2 = _as_signal(data[:, 1])
         return variavel_saida, coluna2
 
     @staticmethod
     def filtrar_Entrada(data):
-        entrada = data[0,:].tolist()
+        entrada = _as_signal(data[0,:])
         return entrada
 
     @staticmethod
     def filtrar_Salida(data):
-        salida = data[0,:].tolist()
+        salida = _as_signal(data[0,:])
         return salida
 
     @staticmethod
     def filtrar_Tiempo(data):
-        tiempo = data[0,:].tolist()
+        tiempo = _as_signal(data[0,:])
         return tiempo
 
     @staticmethod
@@ -82,36 +101,184 @@ class filtragem:
         theta = data["theta"]
         return (k,tau,theta)
 
+def is_mat_v73(path):
+    """True se o arquivo for MATLAB v7.3 (container HDF5)."""
+    with open(path, "rb") as f:
+        header = f.read(128)
+    return header.startswith(b"MATLAB 7.3") or header[:8] == b"\x89HDF\r\n\x1a\n"
+
+
+class MatFile:
+    """Acesso preguiçoso a um .mat: lê apenas as variáveis/trechos pedidos.
+
+    Para v7.3 (HDF5) os datasets ficam no disco e cada leitura traz só a
+    fatia solicitada. Para v5 o scipy não oferece acesso parcial, então cada
+    variável é carregada inteira (uma vez) com `variable_names`.
+    Sinais são sempre devolvidos na orientação do MATLAB (linhas × colunas).
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.v73 = is_mat_v73(path)
+        self._cache = {}
+        if self.v73:
+            if h5py is None:
+                raise ImportError("h5py é necessário para ler arquivos MATLAB v7.3")
+            self._h5 = h5py.File(path, "r")
+        else:
+            self._h5 = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        if self._h5 is not None:
+            self._h5.close()
+            self._h5 = None
+        self._cache.clear()
+
+    def keys(self):
+        if self.v73:
+            return [k for k in self._h5.keys() if not k.startswith("#")]
+        return [name for name, _, _ in scipy.io.whosmat(self.path)]
+
+    def __contains__(self, name):
+        return name in self.keys()
+
+    def shape(self, name):
+        if self.v73:
+            return tuple(reversed(self._h5[name].shape))
+        return self._v5(name).shape
+
+    def _v5(self, name):
+        if name not in self._cache:
+            self._cache[name] = scipy.io.loadmat(self.path, variable_names=[name])[name]
+        return self._cache[name]
+
+    def read(self, name, window=None):
+        """Lê a variável inteira ou a fatia `window` (slice) ao longo do tempo.
+
+        O eixo do tempo é o das colunas para vetores-linha (1×N) e o das
+        linhas para matrizes N×c (como dados_entrada/dados_saida).
+        """
+        if not self.v73:
+            data = self._v5(name)
+            if window is None or data.dtype.names is not None:
+                return data
+            return data[:, window] if data.shape[0] == 1 else data[window, :]
+        ds = self._h5[name]
+        if isinstance(ds, h5py.Group):
+            return self._h5_struct(ds)
+        # HDF5 guarda o array transposto em relação ao MATLAB
+        rows, cols = tuple(reversed(ds.shape))
+        if window is None:
+            return np.asarray(ds[()], dtype=np.float64).T
+        if rows == 1:
+            return np.asarray(ds[window, :], dtype=np.float64).T
+        return np.asarray(ds[:, window], dtype=np.float64).T
+
+    def iter_chunks(self, name, chunk=CHUNK_SAMPLES):
+        """Itera a variável de sinal em blocos de `chunk` amostras (v7.3 sem carregar tudo)."""
+        rows, cols = self.shape(name)
+        n = cols if rows == 1 else rows
+        for start in range(0, n, chunk):
+            yield self.read(name, slice(start, min(start + chunk, n)))
+
+    def _h5_struct(self, group):
+        """Struct MATLAB 1×1 em HDF5 -> lista de valores na ordem dos campos."""
+        fields = group.attrs.get("MATLAB_fields")
+        if fields is not None:
+            names = ["".join(ch.decode() if isinstance(ch, bytes) else str(ch) for ch in np.ravel(f)) for f in fields]
+        else:
+            names = list(group.keys())
+        values = []
+        for nm in names:
+            ds = group[nm]
+            raw = ds[()]
+            if ds.attrs.get("MATLAB_class", b"") in (b"char", "char"):
+                values.append("".join(chr(c) for c in np.ravel(raw)))
+            else:
+                arr = np.asarray(raw, dtype=np.float64).ravel()
+                values.append(arr.item() if arr.size == 1 else arr)
+        return values
+
+
+def _time_window(t, t_window):
+    """Converte (t0, t1) em slice de índices sobre o vetor de tempo ordenado."""
+    t0, t1 = t_window
+    i0 = 0 if t0 is None else int(np.searchsorted(t, t0, side="left"))
+    i1 = len(t) if t1 is None else int(np.searchsorted(t, t1, side="right"))
+    return slice(i0, i1)
+
+
 # wrapper de conveniência: retorna dicionário padronizado
-def load_mat(path):
-    mat = scipy.io.loadmat(path)
-    out = {}
-    keys = mat.keys()
-    if "configuracion_experimento" in mat:
-        out["config"] = filtragem.filtrar_Configuracao_Experimento(mat["configuracion_experimento"])
-    if "parametros_sistema" in mat:
-        out["params"] = filtragem.filtrar_Parametros_Sistema(mat["parametros_sistema"])
-    if "dados_entrada" in mat:
-        u1, u2 = filtragem.filtrar_Dados_Entrada(mat["dados_entrada"])
-        out["dados_entrada"] = {"u": u1, "u_fixed": u2}
-    if "dados_saida" in mat:
-        y1, y2 = filtragem.filtrar_Dados_Saida(mat["dados_saida"])
-        out["dados_saida"] = {"y": y1, "col2": y2}
-    if "entrada" in mat:
-        out["entrada"] = filtragem.filtrar_Entrada(mat["entrada"])
-    if "salida" in mat:
-        out["salida"] = filtragem.filtrar_Salida(mat["salida"])
-    if "tiempo" in mat:
-        out["tiempo"] = filtragem.filtrar_Tiempo(mat["tiempo"])
+@profiled("load_mat")
+def load_mat(path, variables=None, t_window=None):
+    """Carrega um .mat (v5 ou v7.3) em arrays float64 contíguos.
+
+    variables: lista opcional de variáveis a ler (padrão: todas as conhecidas).
+    t_window: (t0, t1) opcional; só as amostras com t0 <= tiempo <= t1 são lidas
+    (em v7.3 apenas essa fatia sai do disco). Requer a variável "tiempo" ou
+    configuracion_experimento.dt.
+    """
+    wanted = set(variables) if variables is not None else set(SIGNAL_VARS + STRUCT_VARS)
+    with MatFile(path) as mat:
+        present = set(mat.keys())
+        window = None
+        t_full = None
+        if t_window is not None:
+            if "tiempo" in present:
+                t_full = _as_signal(mat.read("tiempo"))
+            elif "configuracion_experimento" in present:
+                cfg = mat.read("configuracion_experimento")
+                dt = cfg[1] if isinstance(cfg, list) else filtragem.filtrar_Configuracao_Experimento(cfg)["dt"]
+                n = max(mat.shape(v)[0] if v.startswith("dados_") else mat.shape(v)[1]
+                        for v in SIGNAL_VARS if v in present)
+                t_full = np.arange(n, dtype=np.float64) * float(dt)
+            if t_full is not None:
+                window = _time_window(t_full, t_window)
+
+        def read(name):
+            return mat.read(name, window if name in SIGNAL_VARS else None)
+
+        out = {}
+        if "configuracion_experimento" in present and "configuracion_experimento" in wanted:
+            cfg = read("configuracion_experimento")
+            if isinstance(cfg, list):
+                out["config"] = dict(zip(("tiempo_total", "dt", "degrau_tiempo", "descripcion"), cfg))
+            else:
+                out["config"] = filtragem.filtrar_Configuracao_Experimento(cfg)
+        if "parametros_sistema" in present and "parametros_sistema" in wanted:
+            par = read("parametros_sistema")
+            if isinstance(par, list):
+                out["params"] = filtragem.parametros_de_valores(par)
+            else:
+                out["params"] = filtragem.filtrar_Parametros_Sistema(par)
+        if "dados_entrada" in present and "dados_entrada" in wanted:
+            u1, u2 = filtragem.filtrar_Dados_Entrada(read("dados_entrada"))
+            out["dados_entrada"] = {"u": u1, "u_fixed": u2}
+        if "dados_saida" in present and "dados_saida" in wanted:
+            y1, y2 = filtragem.filtrar_Dados_Saida(read("dados_saida"))
+            out["dados_saida"] = {"y": y1, "col2": y2}
+        if "entrada" in present and "entrada" in wanted:
+            out["entrada"] = filtragem.filtrar_Entrada(read("entrada"))
+        if "salida" in present and "salida" in wanted:
+            out["salida"] = filtragem.filtrar_Salida(read("salida"))
+        if "tiempo" in present and "tiempo" in wanted:
+            out["tiempo"] = t_full[window] if t_full is not None else filtragem.filtrar_Tiempo(read("tiempo"))
     # se tempo não existir, tenta criar a partir de config dt
     if "tiempo" not in out and "config" in out:
         dt = out["config"]["dt"]
         n = len(out["dados_saida"]["y"]) if "dados_saida" in out else 1
-        out["tiempo"] = [i * dt for i in range(n)]
+        offset = window.start if window is not None else 0
+        out["tiempo"] = (np.arange(n, dtype=np.float64) + offset) * float(dt)
     # parâmetros do sistema padronizados
     if "params" in out:
         out["K"] = out["params"]["k"]
         out["tau"] = out["params"]["tau"]
         out["theta"] = out["params"]["theta"]
         out["amplitude"] = out["params"].get("amplitude_escalon", out["params"].get("entrada_final", None))
-    return out
\ No newline at end of file
+    return out
@@ -0,0 +1,159 @@
+"""Análise em frequência da malha PID + planta com atraso exato.
+
+Avalia L(jω) = C(jω)·G(jω)·e^{-jωθ} diretamente (sem Padé) num grid
+logarítmico denso, de uma vez para uma malha ou para um lote de M malhas
+(ganhos e/ou plantas diferentes por linha), e extrai:
+
+    gm, gm_db  margem de ganho (1/|L| onde a fase cruza -180°)
+    pm         margem de fase em graus (180° + fase onde |L| cruza 1)
+    wgc, wpc   frequências de cruzamento de ganho e de fase (rad/s)
+    ms         sensibilidade máxima  max |1/(1 + L)|
+    bandwidth  banda passante de malha fechada (|T| cai 3 dB)
+
+O PID é o mesmo do simulador (models.closed_loop), com filtro na derivada:
+
+    C(s) = Kp·(1 + 1/(Ti·s) + Td·s/((Td/N)·s + 1))
+
+A fase é desenrolada só na parte racional e o atraso entra como -ωθ,
+assim não há saltos de 2π mesmo com θ grande. Margens sem cruzamento no
+grid ficam inf (e as frequências, NaN).
+"""
+
+import numpy as np
+from models.closed_loop import DERIVATIVE_FILTER_N
+
+FREQ_POINTS = 400
+FREQ_SPAN = (1e-3, 1e3)   # faixa de ω·(τ+θ) coberta pelo grid padrão
+MARGIN_KEYS = ("gm", "gm_db", "pm", "wgc", "wpc", "ms", "bandwidth")
+
+
+def frequency_grid(scale=1.0, points=FREQ_POINTS, span=FREQ_SPAN):
+    """Grid log de ω normalizado por `scale` (ex.: τ+θ); scale (M, 1) dá um grid por linha."""
+    nu = np.logspace(np.log10(span[0]), np.log10(span[1]), int(points))
+    return nu / np.asarray(scale, dtype=float)
+
+
+def pid_response(w, gains, N=DERIVATIVE_FILTER_N):
+    """C(jω) para gains (3,) ou (M, 3); retorna (M, W). Ti <= 0/inf ou Td <= 0 desligam a ação."""
+    gains = np.atleast_2d(np.asarray(gains, dtype=float))
+    Kp, Ti, Td = (gains[:, j:j + 1] for j in range(3))
+    s = 1j * np.asarray(w, dtype=float)
+    has_i = np.isfinite(Ti) & (Ti > 0)
+    has_d = np.isfinite(Td) & (Td > 0)
+    Ti = np.where(has_i, Ti, 1.0)
+    Td = np.where(has_d, Td, 0.0)
+    return Kp * (1.0 + has_i / (Ti * s) + Td * s / (Td / N * s + 1.0))
+
+
+def rational_response(w, num, den):
+    """num(jω)/den(jω) (parte racional da planta, sem atraso)."""
+    s = 1j * np.asarray(w, dtype=float)
+    return np.polyval(num, s) / np.polyval(den, s)
+
+
+def margins(w, L0, theta=0.0):
+    """Margens de L = L0·e^{-jωθ} a partir da parte racional L0 (M, W).
+
+    w: (W,) ou (M, W); theta: escalar ou (M,). Retorna dict MARGIN_KEYS
+    com arrays (M,).
+    """
+    L0 = np.atleast_2d(L0)
+    M = L0.shape[0]
+    w = np.broadcast_to(np.asarray(w, dtype=float), L0.shape)
+    theta = np.asarray(theta, dtype=float).reshape(-1, 1)
+    mag = np.abs(L0)
+    phase = _phase(L0, w, theta)
+    L = L0 * np.exp(-1j * w * theta)
+    rows = np.arange(M)
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        logm = np.log(mag)
+        ms = np.max(1.0 / np.abs(1.0 + L), axis=1)
+
+        # cruzamento de ganho: primeiro |L| = 1 descendo
+        cross = (logm[:, :-1] >= 0.0) & (logm[:, 1:] < 0.0)
+        has = cross.any(axis=1)
+        i = np.argmax(cross, axis=1)
+        a = _fraction(logm[rows, i], logm[rows, i + 1], 0.0)
+        pm = np.where(has, 180.0 + np.degrees(_lerp(phase[rows, i], phase[rows, i + 1], a)), np.inf)
+        wgc = np.where(has, _loglerp(w[rows, i], w[rows, i + 1], a), np.nan)
+
+        # cruzamento de fase: primeiro -180° descendo
+        cross = (phase[:, :-1] > -np.pi) & (phase[:, 1:] <= -np.pi)
+        has = cross.any(axis=1)
+        i = np.argmax(cross, axis=1)
+        a = _fraction(phase[rows, i], phase[rows, i + 1], -np.pi)
+        gm = np.where(has, np.exp(-_lerp(logm[rows, i], logm[rows, i + 1], a)), np.inf)
+        wpc = np.where(has, _loglerp(w[rows, i], w[rows, i + 1], a), np.nan)
+
+        # banda passante: |T| cai 3 dB abaixo do valor em baixa frequência
+        Tmag = np.abs(L / (1.0 + L))
+        level = Tmag[:, :1] / np.sqrt(2.0)
+        below = Tmag < level
+        has = below.any(axis=1)
+        i = np.maximum(np.argmax(below, axis=1), 1) - 1
+        a = _fraction(Tmag[rows, i], Tmag[rows, i + 1], level[:, 0])
+        bandwidth = np.where(has, _loglerp(w[rows, i], w[rows, i + 1], a), np.nan)
+
+        gm_db = 20.0 * np.log10(gm)
+    return {"gm": gm, "gm_db": gm_db, "pm": pm, "wgc": wgc, "wpc": wpc, "ms": ms, "bandwidth": bandwidth}
+
+
+def _phase(L0, w, theta):
+    """Fase desenrolada (rad) de L0·e^{-jωθ}, com o início em (-3π/2, π/2]."""
+    phase = np.unwrap(np.angle(L0), axis=-1)
+    phase -= 2.0 * np.pi * np.ceil((phase[..., :1] - np.pi / 2) / (2.0 * np.pi))
+    return phase - w * theta
+
+
+def _fraction(v0, v1, level):
+    """Posição relativa (0..1) de `level` entre v0 e v1."""
+    return np.clip(np.where(v0 != v1, (v0 - level) / (v0 - v1), 0.0), 0.0, 1.0)
+
+
+def _lerp(v0, v1, a):
+    return v0 + a * (v1 - v0)
+
+
+def _loglerp(w0, w1, a):
+    return np.exp(_lerp(np.log(w0), np.log(w1), a))
+
+
+def _single(out):
+    return {k: float(v[0]) for k, v in out.items()}
+
+
+def loop_analysis(K, tau, theta, gains, w=None, N=DERIVATIVE_FILTER_N):
+    """Margens de PID + FOPDT K·e^{-θs}/(τs+1), vetorizado.
+
+    K, tau, theta: escalares ou (M,); gains: (3,) ou (M, 3). Sem `w` usa
+    frequency_grid(τ+θ) por planta. Entradas escalares e gains (3,)
+    retornam floats; caso contrário arrays (M,).
+    """
+    single = all(np.ndim(v) == 0 for v in (K, tau, theta)) and np.ndim(gains) == 1
+    K, tau, theta = (np.asarray(v, dtype=float).reshape(-1, 1) for v in (K, tau, theta))
+    if w is None:
+        w = frequency_grid(tau + theta)
+    L0 = pid_response(w, gains, N) * K / (1j * np.asarray(w) * tau + 1.0)
+    out = margins(w, L0, theta)
+    return _single(out) if single else out
+
+
+def model_loop_analysis(model, gains, w=None, N=DERIVATIVE_FILTER_N):
+    """Margens de PID + qualquer SystemModel (parte racional de tf_coefficients + atraso θ)."""
+    single = np.ndim(gains) == 1
+    if w is None:
+        w = frequency_grid(model.tau + model.theta)
+    L0 = pid_response(w, gains, N) * rational_response(w, *model.tf_coefficients())
+    out = margins(w, L0, model.theta)
+    return _single(out) if single else out
+
+
+def bode(model, gains, w=None, N=DERIVATIVE_FILTER_N):
+    """(w, |L| em dB, fase em graus, L complexo) da malha aberta de uma sintonia."""
+    if w is None:
+        w = frequency_grid(model.tau + model.theta)
+    L0 = (pid_response(w, gains, N) * rational_response(w, *model.tf_coefficients()))[0]
+    with np.errstate(divide="ignore"):
+        mag_db = 20.0 * np.log10(np.abs(L0))
+    phase = np.degrees(_phase(L0, w, model.theta))
+    return w, mag_db, phase, L0 * np.exp(-1j * w * model.theta)
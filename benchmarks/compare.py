@@ -0,0 +1,51 @@
+"""Compara dois JSON de benchmarks.run e aponta regressões.
+
+    python -m benchmarks.compare antes.json depois.json [--threshold 1.2]
+
+Para cada (etapa, ordem de Padé, n) presente nos dois arquivos mostra os
+tempos, a razão depois/antes e a variação do pico de memória. Sai com
+código 1 se alguma razão passar de --threshold.
+"""
+
+import argparse
+import json
+import sys
+
+THRESHOLD = 1.2
+
+
+def _index(path):
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    return {(r["stage"], r.get("order"), r["n"]): r for r in data["results"] if "error" not in r}
+
+
+def compare(before, after, threshold=THRESHOLD):
+    """Lista de (chave, t_antes, t_depois, razão, pico_antes, pico_depois, regressão?)."""
+    rows = []
+    for key in sorted(set(before) & set(after), key=lambda k: (k[0], k[1] or 0, k[2])):
+        b, a = before[key], after[key]
+        ratio = a["time_s"] / b["time_s"] if b["time_s"] > 0 else float("inf")
+        rows.append((key, b["time_s"], a["time_s"], ratio, b.get("peak_bytes"), a.get("peak_bytes"), ratio > threshold))
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.compare", description=__doc__.splitlines()[0])
+    parser.add_argument("before")
+    parser.add_argument("after")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD, help=f"razão de tempo considerada regressão (padrão: {THRESHOLD})")
+    args = parser.parse_args(argv)
+
+    rows = compare(_index(args.before), _index(args.after), args.threshold)
+    mib = lambda v: "-" if v is None else f"{v / 2 ** 20:.1f}"
+    for (stage, order, n), tb, ta, ratio, pb, pa, slow in rows:
+        label = stage + (f"[{order}]" if order else "")
+        flag = "  REGRESSÃO" if slow else ""
+        print(f"{label:<22} n={n:>9}  {tb * 1000:10.2f} -> {ta * 1000:10.2f} ms  x{ratio:5.2f}  "
+              f"pico {mib(pb)} -> {mib(pa)} MiB{flag}")
+    return 1 if any(r[-1] for r in rows) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,222 @@
+"""Benchmarks dos caminhos críticos: leitura, identificação, simulação, métricas e sintonia.
+
+Gera registros FOPDT sintéticos (K=1, τ=20, θ=4, degrau de 60 com ruído,
+horizonte fixo de 150 s) de 1e3 a 1e7 amostras e mede, para cada etapa e
+tamanho, o tempo de parede (melhor de `repeat` execuções) e o pico de
+memória alocada (tracemalloc, numa execução separada). A simulação em
+malha aberta e fechada é comparada entre o backend exato e Padé de
+ordem 5/10/20, com o erro máximo em relação ao exato.
+
+    python -m benchmarks.run -o bench.json
+    python -m benchmarks.run --sizes 1e3 1e4 --stages smith closedloop
+    python -m benchmarks.compare antes.json depois.json
+
+Etapas lentas por natureza (laços em Python, python-control) têm um
+limite de amostras (STAGE_MAX_SAMPLES); --no-limits remove os limites.
+Os caches de models.system_model são limpos antes de cada execução, para
+medir o custo real e não acertos de cache.
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+import numpy as np
+import scipy
+import scipy.io
+
+from Filtragem_dados import load_mat
+from identification.smith import smith_identification
+from identification.least_squares import least_squares_identification
+from models.simulation import simulate_fopdt
+from models.system_model import SystemModel
+from tuning.optimization import optimize_pid
+from tuning.tuning_methods import chr_from_params
+from utils.cache import clear_caches
+from utils.metrics import step_metrics, eqm
+
+SIZES = (1e3, 1e4, 1e5, 1e6, 1e7)
+PADE_ORDERS = (5, 10, 20)
+PLANT = (1.0, 20.0, 4.0)   # K, τ, θ
+AMPLITUDE = 60.0
+HORIZON = 150.0
+NOISE_STD = 0.05
+SEED = 0
+REPEAT = 3
+LARGE = 1e6                # a partir daqui cada etapa roda uma vez só
+# maior registro (amostras) de cada etapa por padrão
+STAGE_MAX_SAMPLES = {
+    "load_mat": 1e7,
+    "smith": 1e7,
+    "least_squares": 1e6,
+    "openloop_exact": 1e7,
+    "openloop_pade": 1e5,
+    "closedloop_exact": 1e6,
+    "closedloop_pade": 1e5,
+    "step_metrics": 1e7,
+    "eqm": 1e7,
+    "optimize_pid": 1e4,
+}
+STAGES = ("load_mat", "smith", "least_squares", "openloop", "closedloop", "step_metrics", "eqm", "optimize_pid")
+
+
+def make_dataset(n, seed=SEED):
+    """Registro sintético (t, u, y) de n amostras da planta PLANT."""
+    t = np.linspace(0.0, HORIZON, int(n))
+    u = np.full(t.shape, AMPLITUDE)
+    _, y = simulate_fopdt(t, u, *PLANT)
+    y += np.random.default_rng(seed).normal(0.0, NOISE_STD, t.size)
+    return t, u, y
+
+
+def write_mat(path, t, u, y):
+    scipy.io.savemat(path, {
+        "tiempo": t[None, :], "entrada": u[None, :], "salida": y[None, :],
+    }, do_compression=False)
+
+
+def measure(fn, repeat=REPEAT, memory=True):
+    """(melhor tempo, média, pico de memória em bytes, último resultado) de fn()."""
+    times = []
+    result = None
+    for _ in range(max(int(repeat), 1)):
+        clear_caches()
+        t0 = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - t0)
+    peak = None
+    if memory:
+        clear_caches()
+        tracemalloc.start()
+        try:
+            fn()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+    return min(times), float(np.mean(times)), peak, result
+
+
+def _closedloop(backend, order, t, u):
+    model = SystemModel(*PLANT, pade_order=order, backend=backend)
+    kp, ti, td = chr_from_params(*PLANT)
+    return model.simulate_step_closedloop(kp, ti, td, t, U=u)[1]
+
+
+def _openloop(backend, order, t, u):
+    model = SystemModel(*PLANT, pade_order=order, backend=backend)
+    return model.simulate_forced_response(t, u)[1]
+
+
+def _cases(stage, n, t, u, y, tmpdir):
+    """[(nome da etapa, extras do registro, fn)] para `stage` com n amostras."""
+    if stage == "load_mat":
+        path = os.path.join(tmpdir, f"fopdt_{n}.mat")
+        write_mat(path, t, u, y)
+        return [("load_mat", {"file_bytes": os.path.getsize(path)}, lambda: load_mat(path))]
+    if stage == "smith":
+        return [("smith", {}, lambda: smith_identification(t, y, amplitude=AMPLITUDE, u=u))]
+    if stage == "least_squares":
+        return [("least_squares", {}, lambda: least_squares_identification(t, y, amplitude=AMPLITUDE, u=u))]
+    if stage in ("openloop", "closedloop"):
+        sim = _openloop if stage == "openloop" else _closedloop
+        cases = [(f"{stage}_exact", {"backend": "exact"}, lambda: sim("exact", 0, t, u))]
+        for order in PADE_ORDERS:
+            cases.append((f"{stage}_pade", {"backend": "pade", "order": order},
+                          lambda order=order: sim("pade", order, t, u)))
+        return cases
+    if stage == "step_metrics":
+        return [("step_metrics", {}, lambda: step_metrics(t, y))]
+    if stage == "eqm":
+        y_hat = simulate_fopdt(t, u, *PLANT)[1]
+        return [("eqm", {}, lambda: eqm(y, y_hat))]
+    if stage == "optimize_pid":
+        return [("optimize_pid", {}, lambda: optimize_pid(*PLANT, T=t, sp=AMPLITUDE))]
+    raise ValueError(f"etapa desconhecida: {stage!r}")
+
+
+def run(sizes=SIZES, stages=STAGES, repeat=REPEAT, memory=True, limits=True, log=print):
+    """Executa as etapas para cada tamanho; retorna lista de registros (dicts)."""
+    records = []
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for n in (int(s) for s in sizes):
+            t, u, y = make_dataset(n)
+            reference = {}
+            for stage in stages:
+                for name, extra, fn in _cases(stage, n, t, u, y, tmpdir):
+                    if limits and n > STAGE_MAX_SAMPLES.get(name, np.inf):
+                        continue
+                    rec = {"stage": name, "n": n, **extra}
+                    try:
+                        best, mean, peak, result = measure(fn, 1 if n >= LARGE else repeat, memory)
+                        rec.update(time_s=best, mean_s=mean, peak_bytes=peak)
+                        # erro do Padé em relação ao backend exato no mesmo grid
+                        if name.endswith("_exact"):
+                            reference[stage] = np.asarray(result)
+                        elif name.endswith("_pade") and stage in reference:
+                            rec["max_abs_err_vs_exact"] = float(np.max(np.abs(np.asarray(result) - reference[stage])))
+                    except Exception as e:
+                        rec["error"] = f"{type(e).__name__}: {e}"
+                    records.append(rec)
+                    log(_format(rec))
+            if "load_mat" in stages:
+                for f in os.listdir(tmpdir):
+                    os.remove(os.path.join(tmpdir, f))
+    return records
+
+
+def _format(rec):
+    label = rec["stage"] + (f"[{rec['order']}]" if "order" in rec else "")
+    if "error" in rec:
+        return f"{label:<22} n={rec['n']:>9}  ERRO {rec['error']}"
+    peak = "" if rec.get("peak_bytes") is None else f"  pico {rec['peak_bytes'] / 2 ** 20:9.1f} MiB"
+    err = f"  err {rec['max_abs_err_vs_exact']:.2e}" if "max_abs_err_vs_exact" in rec else ""
+    return f"{label:<22} n={rec['n']:>9}  {rec['time_s'] * 1000:11.2f} ms{peak}{err}"
+
+
+def environment():
+    """Metadados para comparar resultados entre versões/máquinas."""
+    import control
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__)), timeout=10).stdout.strip() or None
+    except Exception:
+        commit = None
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "scipy": scipy.__version__,
+        "control": control.__version__,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.run", description="Benchmarks dos caminhos críticos.")
+    parser.add_argument("--sizes", nargs="+", type=float, default=list(SIZES), help="tamanhos dos registros (amostras)")
+    parser.add_argument("--stages", nargs="+", choices=STAGES, default=list(STAGES), help="etapas a medir")
+    parser.add_argument("--repeat", type=int, default=REPEAT, help=f"repetições por medida (padrão: {REPEAT})")
+    parser.add_argument("--no-memory", action="store_true", help="não mede pico de memória (tracemalloc)")
+    parser.add_argument("--no-limits", action="store_true", help="ignora STAGE_MAX_SAMPLES")
+    parser.add_argument("-o", "--output", default=None, help="arquivo JSON de saída")
+    args = parser.parse_args(argv)
+
+    records = run(args.sizes, args.stages, repeat=args.repeat, memory=not args.no_memory, limits=not args.no_limits)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"environment": environment(), "results": records}, f, indent=2)
+        print(f"{len(records)} medidas -> {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,70 @@
+"""Linha de comando do projeto.
+
+    python -m c213 batch datasets/ --method ITAE -o resumo.csv
+    python -m c213 schedule pontos.json --method ITAE -o tabela.csv
+"""
+
+import argparse
+import json
+import sys
+from c213.batch import run_batch, write_summary, IDENTIFICATION, TUNING_METHODS, OUTPUT_FORMATS
+from preprocessing.pipeline import PRESETS, load_pipeline
+from tuning.scheduling import design_schedule, verify_schedule, SCHEDULE_FORMATS
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m c213", description="Identificação e sintonia PID sem interface gráfica.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    batch = sub.add_parser("batch", help="identifica e sintoniza todos os .mat de um diretório")
+    batch.add_argument("paths", nargs="+", help="diretórios e/ou arquivos .mat")
+    batch.add_argument("--method", default="ITAE", choices=TUNING_METHODS, help="método de sintonia (padrão: ITAE)")
+    batch.add_argument("--identification", default="smith", choices=sorted(IDENTIFICATION), help="método de identificação (padrão: smith)")
+    batch.add_argument("--preprocess", default="none",
+                       help=f"pré-processamento: {', '.join(PRESETS)} ou arquivo .json com os estágios (padrão: none)")
+    batch.add_argument("-o", "--output", default="resumo.csv", help="arquivo de saída .csv, .json ou .parquet (padrão: resumo.csv)")
+    batch.add_argument("-j", "--workers", type=int, default=None, help="processos paralelos (padrão: núcleos disponíveis)")
+
+    schedule = sub.add_parser("schedule", help="escalonamento de ganhos entre pontos de operação")
+    schedule.add_argument("points", help="arquivo .json com a lista de pontos {op, k, tau, theta}")
+    schedule.add_argument("--method", default="ITAE", choices=TUNING_METHODS, help="método de sintonia (padrão: ITAE)")
+    schedule.add_argument("-o", "--output", default="tabela.csv", help="tabela .csv ou .json (padrão: tabela.csv)")
+    schedule.add_argument("--resolution", type=int, default=None, help="exporta N pontos interpolados em vez dos nós")
+    schedule.add_argument("--verify", action="store_true", help="simula as transições entre os pontos e compara com ganhos fixos")
+    schedule.add_argument("-j", "--workers", type=int, default=None, help="processos paralelos (padrão: núcleos disponíveis)")
+
+    args = parser.parse_args(argv)
+    if args.command == "batch":
+        # antes de processar os arquivos: o resumo só é gravado no fim
+        if not args.output.lower().endswith(OUTPUT_FORMATS):
+            parser.error(f"formato de saída inválido: {args.output!r} (use {', '.join(OUTPUT_FORMATS)})")
+        preprocess = load_pipeline(args.preprocess).spec() if args.preprocess.endswith(".json") else args.preprocess
+        if preprocess not in PRESETS and isinstance(preprocess, str):
+            parser.error(f"pré-processamento desconhecido: {preprocess!r}")
+        rows = run_batch(args.paths, method=args.method, identification=args.identification, workers=args.workers,
+                         preprocess=preprocess)
+        write_summary(rows, args.output)
+        failed = [r for r in rows if r["error"]]
+        print(f"{len(rows)} arquivo(s) processado(s), {len(failed)} com erro -> {args.output}")
+        for r in failed:
+            print(f"  {r['file']}: {r['error']}", file=sys.stderr)
+        return 1 if failed else 0
+    if args.command == "schedule":
+        if not args.output.lower().endswith(SCHEDULE_FORMATS):
+            parser.error(f"formato de saída inválido: {args.output!r} (use {', '.join(SCHEDULE_FORMATS)})")
+        with open(args.points, encoding="utf-8") as f:
+            points = json.load(f)
+        sched = design_schedule(points, method=args.method, workers=args.workers)
+        sched.save(args.output, points=args.resolution)
+        print(f"{len(sched)} ponto(s) de operação ({args.method}) -> {args.output}")
+        if args.verify and len(sched) > 1:
+            v = verify_schedule(sched)
+            kp, ti, td = v["fixed_gains"]
+            print(f"IAE escalonado = {v['iae']:.4g} | ganhos fixos (Kp={kp:.4g}, Ti={ti:.4g}, Td={td:.4g}) = {v['iae_fixed']:.4g}")
+            for s, f in zip(v["segments"], v["segments_fixed"]):
+                print(f"  {s['label']}: IAE {s['iae']:.4g} (fixo {f['iae']:.4g})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,113 @@
+"""Identificação + sintonia em lote, sem interface gráfica.
+
+Carrega cada .mat de um diretório, identifica o modelo, calcula os ganhos
+PID, simula a malha fechada e mede tr/ts/Mp/ess. Os arquivos são
+processados em paralelo num pool de processos e o resumo é gravado em
+CSV, JSON ou Parquet (este último requer pandas + pyarrow).
+"""
+
+import csv
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from Filtragem_dados import load_mat
+from identification.smith import smith_identification
+from identification.least_squares import least_squares_identification
+from identification.segmentation import segmented_identification
+from tuning.optimization import tune, TUNING_METHODS
+from models.system_model import SystemModel
+from preprocessing.pipeline import make_pipeline
+from utils.metrics import step_metrics
+
+IDENTIFICATION = {
+    "smith": smith_identification,
+    "ls": least_squares_identification,
+    "seg": segmented_identification,
+}
+OUTPUT_FORMATS = (".csv", ".json", ".parquet")
+SUMMARY_FIELDS = (
+    "file", "k", "tau", "theta", "eqm", "kp", "ti", "td",
+    "tr", "ts", "mp", "ess", "elapsed", "error",
+)
+
+
+def dataset_signals(data):
+    """Extrai (t, y, u, amplitude) do dict de load_mat, como a interface faz."""
+    t = np.asarray(data["tiempo"], dtype=float)
+    y = np.asarray(data["salida"] if "salida" in data else data["dados_saida"]["y"], dtype=float)
+    u = np.asarray(data["entrada"] if "entrada" in data else data["dados_entrada"]["u_fixed"], dtype=float)
+    amplitude = data.get("amplitude")
+    if amplitude is None:
+        amplitude = float(np.mean(u)) if u.size else 1.0
+    return t, y, u, float(amplitude)
+
+
+def process_file(path, method="ITAE", identification="smith", preprocess=None):
+    """Processa um dataset e devolve uma linha do resumo (dict).
+
+    preprocess: nome de preprocessing.pipeline.PRESETS ou lista de estágios.
+    """
+    row = dict.fromkeys(SUMMARY_FIELDS)
+    row["file"] = os.path.basename(path)
+    start = time.perf_counter()
+    try:
+        t, y, u, amplitude = dataset_signals(load_mat(path))
+        t, y, u = make_pipeline(preprocess).apply(t, y, u, cache=False)
+        params, _, _ = IDENTIFICATION[identification](t, y, amplitude=amplitude, u=u)
+        k, tau, theta = params["k"], params["tau"], params["theta"]
+        kp, ti, td = tune(method, k, tau, theta, T=t)
+        _, y_cl = SystemModel(k, tau, theta).simulate_step_closedloop(kp, ti, td, t, U=u)
+        m = step_metrics(t, y_cl, sp=float(u[-1]))
+        row.update(
+            k=k, tau=tau, theta=theta, eqm=params["eqm"], kp=kp, ti=ti, td=td,
+            tr=m["tr"], ts=m["ts"], mp=m["mp"], ess=m["ess"],
+        )
+    except Exception as e:
+        row["error"] = f"{type(e).__name__}: {e}"
+    row["elapsed"] = time.perf_counter() - start
+    return {key: (float(v) if isinstance(v, (np.floating, np.integer)) else v) for key, v in row.items()}
+
+
+def find_datasets(paths):
+    """Expande diretórios em arquivos .mat (ordenados); arquivos passam direto."""
+    files = []
+    for p in paths:
+        if os.path.isdir(p):
+            files.extend(sorted(os.path.join(p, f) for f in os.listdir(p) if f.lower().endswith(".mat")))
+        else:
+            files.append(p)
+    return files
+
+
+def run_batch(paths, method="ITAE", identification="smith", workers=None, preprocess=None):
+    """Processa todos os datasets em paralelo; retorna as linhas na ordem dos arquivos."""
+    files = find_datasets(paths)
+    workers = (os.cpu_count() or 1) if workers is None else int(workers)
+    if workers <= 1 or len(files) <= 1:
+        return [process_file(f, method, identification, preprocess) for f in files]
+    with ProcessPoolExecutor(max_workers=min(workers, len(files))) as pool:
+        return list(pool.map(process_file, files, [method] * len(files), [identification] * len(files),
+                             [preprocess] * len(files)))
+
+
+def write_summary(rows, output):
+    """Grava o resumo conforme a extensão de `output` (.csv, .json ou .parquet)."""
+    ext = os.path.splitext(output)[1].lower()
+    if ext == ".csv":
+        with open(output, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=SUMMARY_FIELDS)
+            writer.writeheader()
+            writer.writerows(rows)
+    elif ext == ".json":
+        with open(output, "w", encoding="utf-8") as f:
+            json.dump(rows, f, indent=2, ensure_ascii=False)
+    elif ext == ".parquet":
+        try:
+            import pandas as pd
+        except ImportError as e:
+            raise ImportError("saída Parquet requer pandas e pyarrow") from e
+        pd.DataFrame(rows, columns=SUMMARY_FIELDS).to_parquet(output, index=False)
+    else:
+        raise ValueError(f"formato de saída inválido: {ext!r} (use um de {OUTPUT_FORMATS})")
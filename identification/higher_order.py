@@ -0,0 +1,123 @@
+"""Identificação de modelos de ordem superior por mínimos quadrados.
+
+Complementa o FOPDT (smith.py / least_squares.py) com:
+
+- SOPDT:     K·e^{-θs}/((τ1·s+1)(τ2·s+1))
+- FOPDT_INT: K·e^{-θs}/(s·(τs+1))             (processo integrador)
+- SOPDT_UD:  K·ωn²·e^{-θs}/(s² + 2ζωn·s + ωn²)  (subamortecido)
+
+Todos ajustam a curva inteira com o simulador exato das variantes de
+SystemModel e retornam (params, t_model, y_model) como smith_identification,
+com params incluindo "model", "eqm" e "aic". Como em least_squares.py, o
+nível inicial da saída (y0) é ajustado junto e entradas arbitrárias são
+tratadas em variáveis de desvio (u - u[0]).
+"""
+
+import numpy as np
+from scipy.optimize import least_squares
+from identification.least_squares import least_squares_identification, TAU_MIN
+from models.system_model import SOPDTModel, IntegratingModel, UnderdampedModel
+from utils.metrics import eqm, aic
+
+ZETA_MIN = 0.01
+TAIL_FRACTION = 0.2  # trecho final usado para estimar a inclinação do integrador
+
+
+def _input_signal(t, amplitude, u):
+    if u is not None:
+        U = np.asarray(u, dtype=float).ravel()
+        # u constante: degrau implícito a partir de 0; senão, desvio do equilíbrio inicial
+        return U if np.all(U == U[0]) else U - U[0]
+    return np.full(t.shape, float(amplitude) if amplitude else 1.0)
+
+
+def _fopdt_start(t, y, amplitude, u, x0):
+    """(k, tau, theta, y0) do ajuste FOPDT, usado como ponto de partida."""
+    if x0 is not None:
+        return tuple(float(v) for v in x0) if len(x0) > 3 else (*map(float, x0), float(y[0]))
+    p0, _, _ = least_squares_identification(t, y, amplitude=amplitude, u=u)
+    return p0["k"], p0["tau"], p0["theta"], p0["y0"]
+
+
+def _fit(build, x0, lower, upper, t, y, U, y0):
+    """Ajusta os parâmetros de `build(x) -> SystemModel` e o nível inicial à saída y."""
+    simulate = lambda x: x[-1] + build(x[:-1])._simulate_exact(t, U)[1]
+    lower = list(lower) + [-np.inf]
+    upper = list(upper) + [np.inf]
+    x0 = np.clip(np.asarray(list(x0) + [y0], dtype=float), lower, upper)
+    res = least_squares(lambda x: simulate(x) - y, x0, bounds=(lower, upper),
+                        x_scale="jac", method="trf")
+    model = build(res.x[:-1])
+    y_model = simulate(res.x)
+    params = model.params()
+    params["y0"] = float(res.x[-1])
+    params["eqm"] = float(eqm(y, y_model))
+    params["aic"] = aic(y, y_model, len(x0))
+    params["n_params"] = len(x0)
+    return params, t, y_model
+
+
+def _prepare(t, y):
+    t = np.asarray(t, dtype=float).ravel()
+    y = np.asarray(y, dtype=float).ravel()
+    if t.size == 0 or y.size == 0:
+        raise ValueError("t or y empty in higher-order identification")
+    return t, y, float(t[-1] - t[0]) if t.size > 1 else 1.0
+
+
+def sopdt_identification(t, y, amplitude=1.0, u=None, x0=None):
+    """SOPDT superamortecido, partindo do ajuste FOPDT (τ dividido em τ1 > τ2).
+
+    x0: (k, tau, theta[, y0]) de um ajuste FOPDT já feito; se None, ajusta aqui.
+    """
+    t, y, span = _prepare(t, y)
+    k, tau, theta, y0 = _fopdt_start(t, y, amplitude, u, x0)
+    x0 = [k, 0.7 * tau, 0.3 * tau, 0.7 * theta]
+    lower = [-np.inf, TAU_MIN, TAU_MIN, 0.0]
+    upper = [np.inf, np.inf, np.inf, span]
+    params, t_m, y_m = _fit(lambda x: SOPDTModel(*x), x0, lower, upper, t, y, _input_signal(t, amplitude, u), y0)
+    if params["tau2"] > params["tau1"]:
+        params["tau1"], params["tau2"] = params["tau2"], params["tau1"]
+    return params, t_m, y_m
+
+
+def integrating_identification(t, y, amplitude=1.0, u=None):
+    """FOPDT com integrador; chute inicial pela assíntota de rampa no fim do registro."""
+    t, y, span = _prepare(t, y)
+    U = _input_signal(t, amplitude, u)
+    A = float(U[-1]) if abs(float(U[-1])) > 1e-12 else 1.0
+    m = max(2, int(TAIL_FRACTION * t.size))
+    slope = float(np.polyfit(t[-m:], y[-m:], 1)[0]) if t.size >= 2 else 1.0
+    if abs(slope) < 1e-12:
+        slope = 1e-6
+    # y ≈ K·A·(t - t0 - θ - τ) no fim: o cruzamento da assíntota dá θ + τ
+    t_cross = float(t[-1] - t[0]) - float(y[-1] - y[0]) / slope
+    t_cross = min(max(t_cross, 2 * TAU_MIN), span)
+    x0 = [slope / A, 0.5 * t_cross, 0.5 * t_cross]
+    lower = [-np.inf, TAU_MIN, 0.0]
+    upper = [np.inf, np.inf, span]
+    return _fit(lambda x: IntegratingModel(*x), x0, lower, upper, t, y, U, float(y[0]))
+
+
+def underdamped_identification(t, y, amplitude=1.0, u=None, x0=None):
+    """Segunda ordem subamortecida; chute inicial pelo sobressinal e tempo de pico.
+
+    x0: como em sopdt_identification (θ e τ do FOPDT entram no chute).
+    """
+    t, y, span = _prepare(t, y)
+    k0, tau0, theta0, y_start = _fopdt_start(t, y, amplitude, u, x0)
+    y0 = float(y[0]); yf = float(np.mean(y[-max(1, int(0.05 * y.size)):]))
+    delta = yf - y0
+    peak = int(np.argmax((y - y0) * np.sign(delta))) if delta != 0 else 0
+    mp = (y[peak] - yf) / delta if delta != 0 else 0.0
+    t_peak = float(t[peak] - t[0]) - theta0
+    if mp > 1e-3 and t_peak > 0:
+        lm = np.log(mp)
+        zeta = float(-lm / np.sqrt(np.pi ** 2 + lm ** 2))
+        wn = float(np.pi / (t_peak * np.sqrt(1.0 - zeta ** 2)))
+    else:
+        zeta, wn = 0.7, 2.0 / max(tau0, TAU_MIN)
+    x0 = [k0, wn, zeta, theta0]
+    lower = [-np.inf, TAU_MIN, ZETA_MIN, 0.0]
+    upper = [np.inf, np.inf, 1.0, span]
+    return _fit(lambda x: UnderdampedModel(*x), x0, lower, upper, t, y, _input_signal(t, amplitude, u), y_start)
@@ -0,0 +1,133 @@
+"""Identificação FOPDT por mínimos quadrados sobre a curva inteira.
+
+Ajusta K, τ e θ minimizando o EQM entre a saída medida e a resposta do
+modelo em todo o registro (e não só nos pontos de 28,3%/63,2% como no
+método de Smith). Para entrada em degrau usa a resposta analítica
+
+    y(t) = y0 + K·A·(1 - e^{-(t - t0 - θ)/τ}),  t - t0 > θ
+
+e para entradas constantes por partes a superposição desses degraus
+(models.analytic), ambas com jacobiano analítico; para entradas
+arbitrárias usa o simulador exato (models.simulation) com diferenças
+finitas. O nível inicial y0 é ajustado junto (quarto parâmetro): registros
+reais partem de um ponto de operação, não de y = 0. Com u arbitrário o
+modelo fica em variáveis de desvio, u - u[0], supondo a planta em
+equilíbrio no início do registro. O chute inicial vem de smith_identification e os
+intervalos de confiança saem da aproximação linear cov = s²·(JᵀJ)⁻¹.
+"""
+
+import numpy as np
+from scipy.optimize import least_squares
+from scipy.stats import t as student_t
+from identification.smith import smith_identification
+from models.simulation import simulate_fopdt
+from models.analytic import fopdt_step, fopdt_step_jacobian, fopdt_piecewise, change_points
+from utils.metrics import eqm
+from utils.profiling import profiled
+
+CONFIDENCE = 0.95
+TAU_MIN = 1e-6
+START_GRID = 12   # pontos por eixo da grade (τ, θ) do chute inicial com vários degraus
+
+
+def _is_step(u):
+    u = np.asarray(u, dtype=float).ravel()
+    return u.size == 0 or bool(np.all(u == u[0]))
+
+
+def _grid_start(t, y, response, span):
+    """Chute (K, τ, θ, y0) para entradas com vários degraus.
+
+    A resposta é linear em K e y0: para cada (τ, θ) de uma grade grossa os
+    dois saem de mínimos quadrados lineares e fica o par de menor resíduo.
+    """
+    A = np.ones((t.size, 2))
+    best, x0 = np.inf, None
+    for tau in np.geomspace(span / 200.0, span, START_GRID):
+        for theta in np.linspace(0.0, span / 4.0, START_GRID):
+            A[:, 0] = response((1.0, tau, theta))
+            coef, *_ = np.linalg.lstsq(A, y, rcond=None)
+            cost = float(np.sum((A @ coef - y) ** 2))
+            if cost < best:
+                best, x0 = cost, (coef[0], tau, theta, coef[1])
+    return x0
+
+
+@profiled("least_squares_identification")
+def least_squares_identification(t, y, amplitude=1.0, u=None, x0=None, confidence=CONFIDENCE):
+    """
+    Retorna (params, t_model, y_model), no mesmo formato de smith_identification.
+    - params: dict com k, tau, theta, eqm, mais
+      "std": desvio padrão de (k, tau, theta) e
+      "ci": {nome: (inferior, superior)} no nível `confidence` e
+      "cov": matriz de covariância 3x3 de (k, tau, theta) e
+      "y0": nível inicial da saída ajustado (y_model já o inclui).
+    - x0: chute inicial (k, tau, theta[, y0]); se None usa o método de Smith
+      (degrau) ou uma grade em (τ, θ) (entradas com vários degraus).
+    """
+    t = np.asarray(t, dtype=float).ravel()
+    y = np.asarray(y, dtype=float).ravel()
+    if t.size == 0 or y.size == 0:
+        raise ValueError("t or y empty in least_squares_identification")
+    if not amplitude:
+        amplitude = 1.0
+
+    span = float(t[-1] - t[0]) if t.size > 1 else 1.0
+    step_input = u is None or _is_step(u)
+    if step_input:
+        # degrau implícito em t[0] a partir de u = 0 (convenção dos datasets)
+        amp = float(amplitude) if u is None else float(np.asarray(u, dtype=float).ravel()[0])
+        response = lambda p: fopdt_step(t, p[0], p[1], p[2], amp)
+        jac3 = lambda p: fopdt_step_jacobian(t, p[0], p[1], p[2], amp)
+    else:
+        u_arr = np.asarray(u, dtype=float).ravel()
+        # mudanças em relação a u[0]: a planta parte do equilíbrio, não de u = 0
+        cp = change_points(u_arr, u_init=u_arr[0])
+        if cp is not None:
+            times, du = t[cp[0]], cp[1]
+            response = lambda p: fopdt_piecewise(t, times, du, p[0], p[1], p[2])
+            jac3 = lambda p: fopdt_piecewise(t, times, du, p[0], p[1], p[2], jacobian=True)[1]
+        else:
+            u_dev = u_arr - u_arr[0]
+            response = lambda p: simulate_fopdt(t, u_dev, p[0], p[1], p[2])[1]
+            jac3 = None
+
+    if x0 is None and step_input:
+        p0, _, _ = smith_identification(t, y, amplitude=amplitude, u=u)
+        x0 = (p0["k"], p0["tau"], p0["theta"])
+    elif x0 is None:
+        # o método de Smith supõe um único degrau em t[0]
+        x0 = _grid_start(t, y, response, span)
+    y0 = float(x0[3]) if len(x0) > 3 else float(y[0])
+    x0 = np.array([float(x0[0]), max(float(x0[1]), TAU_MIN), min(max(float(x0[2]), 0.0), span), y0])
+
+    model = lambda p: p[3] + response(p)
+    jac = "2-point" if jac3 is None else (lambda p: np.column_stack([jac3(p), np.ones(t.size)]))
+    res = least_squares(lambda p: model(p) - y, x0, jac=jac,
+                        bounds=([-np.inf, TAU_MIN, 0.0, -np.inf], [np.inf, np.inf, span, np.inf]),
+                        x_scale="jac", method="trf")
+    K, tau, theta, y0 = (float(v) for v in res.x)
+    y_model = model(res.x)
+
+    # intervalos de confiança pela aproximação linear em torno do ótimo
+    n, p = y.size, 4
+    dof = max(n - p, 1)
+    s2 = float(np.sum(res.fun ** 2)) / dof
+    try:
+        cov = (s2 * np.linalg.pinv(res.jac.T @ res.jac))[:3, :3]
+    except np.linalg.LinAlgError:
+        cov = np.full((3, 3), np.nan)
+    std = np.sqrt(np.clip(np.diag(cov), 0.0, None))
+    half = float(student_t.ppf(0.5 + confidence / 2.0, dof)) * std
+    names = ("k", "tau", "theta")
+    ci = {name: (float(v - h), float(v + h)) for name, v, h in zip(names, (K, tau, theta), half)}
+
+    params = {
+        "k": K, "tau": tau, "theta": theta, "y0": y0,
+        "eqm": float(eqm(y, y_model)),
+        "std": {name: float(sd) for name, sd in zip(names, std)},
+        "ci": ci,
+        "cov": cov.tolist(),
+        "confidence": float(confidence),
+    }
+    return params, t, y_model
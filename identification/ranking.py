@@ -0,0 +1,120 @@
+"""Seleção automática de modelo: ajusta todos os candidatos e ordena por AIC/EQM.
+
+O FOPDT é ajustado primeiro e serve de ponto de partida para SOPDT e 2ª
+ordem subamortecida; os demais ajustes (SOPDT, FOPDT com integrador e 2ª
+ordem subamortecida) são independentes e rodam em paralelo num pool de
+processos.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from identification.least_squares import least_squares_identification
+from identification.higher_order import (
+    sopdt_identification, integrating_identification, underdamped_identification,
+)
+from utils.metrics import aic
+from utils.profiling import profiled
+
+RANK_CRITERIA = ("aic", "eqm")
+
+
+def fopdt_identification(t, y, amplitude=1.0, u=None):
+    """FOPDT por mínimos quadrados com os campos usados no ranking."""
+    params, t_model, y_model = least_squares_identification(t, y, amplitude=amplitude, u=u)
+    params["model"] = "FOPDT"
+    # k, tau, theta e o nível inicial y0
+    params["aic"] = aic(y, y_model, 4)
+    params["n_params"] = 4
+    return params, t_model, y_model
+
+
+MODEL_FITTERS = {
+    "FOPDT": fopdt_identification,
+    "SOPDT": sopdt_identification,
+    "FOPDT_INT": integrating_identification,
+    "SOPDT_UD": underdamped_identification,
+}
+# candidatos que partem do ajuste FOPDT (recebem x0 = (k, tau, theta, y0))
+SEEDED_BY_FOPDT = ("SOPDT", "SOPDT_UD")
+
+
+def _fit_one(kind, t, y, amplitude, u, x0=None):
+    try:
+        kwargs = {"x0": x0} if kind in SEEDED_BY_FOPDT else {}
+        params, t_model, y_model = MODEL_FITTERS[kind](t, y, amplitude=amplitude, u=u, **kwargs)
+        return kind, params, t_model, y_model, None
+    except Exception as e:
+        return kind, None, None, None, str(e)
+
+
+def rank_models(t, y, amplitude=1.0, u=None, kinds=tuple(MODEL_FITTERS), criterion="aic", workers=None):
+    """Ajusta os modelos `kinds` em paralelo e os ordena pelo critério (menor primeiro).
+
+    workers: número de processos (None = um por candidato, limitado aos núcleos;
+    1 = sequencial). Retorna lista de dicts {"model", "params", "t_model",
+    "y_model"}; ajustes que falharem ficam de fora (com o erro em "error"
+    no fim da lista).
+    """
+    if criterion not in RANK_CRITERIA:
+        raise ValueError(f"critério inválido: {criterion!r} (use um de {RANK_CRITERIA})")
+    t = np.asarray(t, dtype=float).ravel()
+    y = np.asarray(y, dtype=float).ravel()
+    u = None if u is None else np.asarray(u, dtype=float).ravel()
+    kinds = list(kinds)
+
+    # FOPDT uma vez só, antes dos demais: os candidatos SEEDED_BY_FOPDT partem dele
+    outcomes, x0 = [], None
+    if "FOPDT" in kinds or any(k in SEEDED_BY_FOPDT for k in kinds):
+        fopdt = _fit_one("FOPDT", t, y, amplitude, u)
+        if fopdt[1] is not None:
+            p = fopdt[1]
+            x0 = (p["k"], p["tau"], p["theta"], p["y0"])
+        if "FOPDT" in kinds:
+            outcomes.append(fopdt)
+    rest = [k for k in kinds if k != "FOPDT"]
+    workers = min(max(len(rest), 1), os.cpu_count() or 1) if workers is None else int(workers)
+
+    if workers <= 1 or len(rest) <= 1:
+        outcomes += [_fit_one(k, t, y, amplitude, u, x0) for k in rest]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_fit_one, k, t, y, amplitude, u, x0) for k in rest]
+            outcomes += [f.result() for f in futures]
+
+    ranked, failed = [], []
+    for kind, params, t_model, y_model, error in outcomes:
+        if params is None:
+            failed.append({"model": kind, "params": None, "t_model": None, "y_model": None, "error": error})
+        else:
+            ranked.append({"model": kind, "params": params, "t_model": t_model, "y_model": y_model})
+    ranked.sort(key=lambda r: r["params"][criterion])
+    return ranked + failed
+
+
+@profiled("best_model_identification")
+def best_model_identification(t, y, amplitude=1.0, u=None, criterion="aic", workers=None):
+    """
+    Identificação automática no formato de smith_identification.
+
+    Retorna (params, t_model, y_model) do melhor modelo. Como a sintonia
+    CHR/ITAE usa FOPDT, k/tau/theta em params vêm sempre do ajuste FOPDT;
+    o melhor modelo fica em params["model"] / params["model_params"] e a
+    classificação completa em params["ranking"] (modelo, eqm, aic).
+    """
+    ranked = [r for r in rank_models(t, y, amplitude=amplitude, u=u, criterion=criterion, workers=workers)
+              if r["params"] is not None]
+    if not ranked:
+        raise ValueError("nenhum modelo pôde ser ajustado")
+    best = ranked[0]
+    fopdt = next((r["params"] for r in ranked if r["model"] == "FOPDT"), None)
+    if fopdt is None:
+        fopdt, _, _ = fopdt_identification(t, y, amplitude=amplitude, u=u)
+    params = {
+        "k": fopdt["k"], "tau": fopdt["tau"], "theta": fopdt["theta"],
+        "eqm": best["params"]["eqm"],
+        "model": best["model"],
+        "model_params": best["params"],
+        "ranking": [(r["model"], r["params"]["eqm"], r["params"]["aic"]) for r in ranked],
+    }
+    return params, best["t_model"], best["y_model"]
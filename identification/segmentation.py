@@ -0,0 +1,175 @@
+"""Identificação a partir de registros longos com vários degraus na entrada.
+
+smith_identification e least_squares_identification supõem um único
+degrau em t[0]. Aqui os degraus de u são detectados de uma vez
+(detect_steps), cada trecho entre dois degraus vira uma janela em
+variáveis de desvio (t - t_degrau, y - y_antes, amplitude Δu) e é
+identificado separadamente, em paralelo num pool de processos
+(utils.parallel). As estimativas são combinadas pela mediana, com média,
+desvio padrão, IQR e coeficiente de variação de cada parâmetro.
+
+Sem degraus detectáveis (u constante, como nos datasets do projeto) o
+registro inteiro é um único segmento, com o degrau implícito em t[0].
+"""
+
+import numpy as np
+from identification.least_squares import least_squares_identification
+from models.simulation import simulate_fopdt
+from utils.metrics import eqm as eqm_func
+from utils.parallel import map_chunks
+from utils.profiling import profiled
+
+STEP_REL_THRESHOLD = 0.1   # |Δu| mínimo como fração da faixa de u
+NOISE_SIGMAS = 6.0         # ... e em desvios (MAD) das diferenças de u
+MIN_SEGMENT_SAMPLES = 20
+BASELINE_FRACTION = 0.1    # fim do segmento anterior usado como nível inicial
+CHUNK_SIZE = 8             # segmentos por tarefa do pool
+POOLED_PARAMS = ("k", "tau", "theta")
+
+
+def detect_steps(u, min_step=None, min_gap=MIN_SEGMENT_SAMPLES, rel_threshold=STEP_REL_THRESHOLD):
+    """Índices das primeiras amostras após cada degrau de u.
+
+    Uma mudança é degrau quando |Δu| > min_step (padrão: o maior entre
+    rel_threshold·faixa de u e NOISE_SIGMAS·MAD das diferenças). Mudanças
+    em amostras consecutivas (rampas curtas) contam como um degrau, e
+    degraus a menos de min_gap amostras do anterior são descartados.
+    """
+    u = np.asarray(u, dtype=float).ravel()
+    if u.size < 2:
+        return np.zeros(0, dtype=int)
+    du = np.diff(u)
+    if min_step is None:
+        mad = 1.4826 * np.median(np.abs(du - np.median(du)))
+        min_step = max(rel_threshold * np.ptp(u), NOISE_SIGMAS * mad)
+    if min_step <= 0:
+        return np.zeros(0, dtype=int)
+    idx = np.flatnonzero(np.abs(du) > min_step)
+    if idx.size == 0:
+        return idx
+    # fim de cada sequência de mudanças consecutivas (u já no novo nível)
+    ends = idx[np.r_[np.diff(idx) > 1, True]] + 1
+    return ends[np.r_[True, np.diff(ends) >= min_gap]]
+
+
+def extract_segments(t, y, u, events, min_samples=MIN_SEGMENT_SAMPLES, max_duration=None):
+    """Janelas em variáveis de desvio, uma por degrau em `events`.
+
+    Cada janela vai do degrau até o próximo (ou max_duration segundos).
+    Retorna lista de dicts {i0, i1, t0, du, u0, y0, t, y}: t começa em
+    zero, y é relativo ao nível antes do degrau (média do fim do trecho
+    anterior) e du é a amplitude do degrau.
+    """
+    t = np.asarray(t, dtype=float).ravel()
+    y = np.asarray(y, dtype=float).ravel()
+    u = np.asarray(u, dtype=float).ravel()
+    bounds = np.r_[0, events, t.size]
+    segments = []
+    for j in range(1, bounds.size - 1):
+        prev, i0, i1 = int(bounds[j - 1]), int(bounds[j]), int(bounds[j + 1])
+        if max_duration is not None:
+            i1 = min(i1, int(np.searchsorted(t, t[i0] + max_duration, side="right")))
+        if i1 - i0 < min_samples:
+            continue
+        base = slice(max(prev, i0 - max(1, int(BASELINE_FRACTION * (i0 - prev)))), i0)
+        u0, y0 = float(np.median(u[base])), float(np.mean(y[base]))
+        du = float(np.median(u[i0:i1])) - u0
+        if du == 0.0:
+            continue
+        segments.append({"i0": i0, "i1": i1, "t0": float(t[i0]), "du": du, "u0": u0, "y0": y0,
+                         "t": t[i0:i1] - t[i0], "y": y[i0:i1] - y0})
+    return segments
+
+
+def _identify_chunk(windows, method):
+    """Identifica cada janela (t, y, du); falhas viram NaN com a mensagem."""
+    out = []
+    for t, y, du in windows:
+        try:
+            params = method(t, y, amplitude=du)[0]
+            out.append({"k": float(params["k"]), "tau": float(params["tau"]),
+                        "theta": float(params["theta"]), "eqm": float(params.get("eqm", np.nan)),
+                        "error": None})
+        except Exception as e:
+            out.append({"k": np.nan, "tau": np.nan, "theta": np.nan, "eqm": np.nan, "error": str(e)})
+    return out
+
+
+def pooled_statistics(estimates, names=POOLED_PARAMS):
+    """{parâmetro: {median, mean, std, iqr, cv, n}} das estimativas finitas."""
+    stats = {}
+    for name in names:
+        v = np.array([e[name] for e in estimates], dtype=float)
+        v = v[np.isfinite(v)]
+        if v.size == 0:
+            stats[name] = {"median": np.nan, "mean": np.nan, "std": np.nan, "iqr": np.nan, "cv": np.nan, "n": 0}
+            continue
+        q1, med, q3 = np.percentile(v, (25, 50, 75))
+        mean, std = float(np.mean(v)), float(np.std(v, ddof=1)) if v.size > 1 else 0.0
+        stats[name] = {"median": float(med), "mean": mean, "std": std, "iqr": float(q3 - q1),
+                       "cv": std / abs(mean) if mean else np.nan, "n": int(v.size)}
+    return stats
+
+
+@profiled("segmented_identification")
+def identify_segments(t, y, u, method=least_squares_identification, amplitude=1.0, min_step=None,
+                      min_samples=MIN_SEGMENT_SAMPLES, max_duration=None, workers=None,
+                      chunk_size=CHUNK_SIZE, progress=None, cancelled=None):
+    """Detecta os degraus de u, identifica cada segmento e combina as estimativas.
+
+    method: função com a assinatura de smith_identification (precisa ser
+    importável pelos processos filhos). workers/progress/cancelled: ver
+    utils.parallel.map_chunks (retorna None se cancelado). Retorna dict com:
+      "segments": lista de dicts (t0, t1, du, u0, y0, k, tau, theta, eqm, error),
+      "stats": pooled_statistics, "pooled": {k, tau, theta} (medianas),
+      "t", "y_model": resposta do modelo combinado ao registro inteiro.
+    """
+    t = np.asarray(t, dtype=float).ravel()
+    y = np.asarray(y, dtype=float).ravel()
+    u = np.full(t.shape, float(amplitude)) if u is None else np.asarray(u, dtype=float).ravel()
+    events = detect_steps(u, min_step=min_step, min_gap=min_samples)
+    segments = extract_segments(t, y, u, events, min_samples=min_samples, max_duration=max_duration)
+    implicit = not segments
+    if implicit:
+        # registro de um degrau só, aplicado em t[0] a partir do repouso
+        segments = [{"i0": 0, "i1": t.size, "t0": float(t[0]), "du": float(amplitude), "u0": 0.0,
+                     "y0": 0.0, "t": t - t[0], "y": y}]
+    windows = [(s["t"], s["y"], s["du"]) for s in segments]
+    chunks = [windows[i:i + chunk_size] for i in range(0, len(windows), chunk_size)]
+
+    parts = map_chunks(_identify_chunk, chunks, (method,), workers=workers, progress=progress, cancelled=cancelled)
+    if parts is None:
+        return None
+
+    estimates = [e for p in parts for e in p]
+    stats = pooled_statistics(estimates)
+    pooled = {name: stats[name]["median"] for name in POOLED_PARAMS}
+    if not np.all(np.isfinite(list(pooled.values()))):
+        errors = "; ".join(sorted({e["error"] for e in estimates if e["error"]}))
+        raise RuntimeError(f"nenhum segmento identificado ({errors or 'estimativas não finitas'})")
+
+    # modelo combinado no registro todo, partindo do nível antes do primeiro degrau
+    first = segments[0]
+    u_init = first["u0"] if not implicit else 0.0
+    _, y_model = simulate_fopdt(t, u, pooled["k"], pooled["tau"], pooled["theta"], u_init=u_init)
+    y_model = y_model + first["y0"] - pooled["k"] * u_init
+    return {
+        "segments": [{"t0": s["t0"], "t1": float(t[s["i1"] - 1]), "du": s["du"], "u0": s["u0"], "y0": s["y0"], **e}
+                     for s, e in zip(segments, estimates)],
+        "stats": stats,
+        "pooled": pooled,
+        "t": t,
+        "y_model": y_model,
+    }
+
+
+def segmented_identification(t, y, amplitude=1.0, u=None):
+    """identify_segments com a assinatura de smith_identification.
+
+    params traz k, tau, theta (medianas), eqm do modelo combinado no
+    registro, "spread" (pooled_statistics) e "segments".
+    """
+    result = identify_segments(t, y, u, amplitude=amplitude)
+    params = {**result["pooled"], "eqm": float(eqm_func(np.asarray(y, dtype=float).ravel(), result["y_model"])),
+              "spread": result["stats"], "segments": result["segments"]}
+    return params, result["t"], result["y_model"]
@@ -1,11 +1,9 @@
 import numpy as np
-from scipy.signal import savgol_filter
-from scipy.interpolate import interp1d
-from models.system_model import SystemModel
+from models.system_model import SystemModel, BACKEND_DEFAULT
 from utils.metrics import eqm
+from utils.profiling import profiled
+from preprocessing.stages import savgol, SAVGOL_WINDOW, SAVGOL_POLYORDER
 
-SAVGOL_WINDOW = 11
-SAVGOL_POLYORDER = 3
 PADE_ORDER = 20
 
 def _find_first_crossing_time(y, t, target):
@@ -21,11 +19,13 @@ def _find_first_crossing_time(y, t, target):
             return float(t0 + alpha * (t1 - t0))
     return None
 
-def smith_identification(t, y, amplitude=1.0, u=None, do_savgol=True, window=SAVGOL_WINDOW, polyorder=SAVGOL_POLYORDER, pade_order=PADE_ORDER):
+@profiled("smith_identification")
+def smith_identification(t, y, amplitude=1.0, u=None, do_savgol=True, window=SAVGOL_WINDOW, polyorder=SAVGOL_POLYORDER, pade_order=PADE_ORDER, backend=BACKEND_DEFAULT):
     """
     Retorna (params, t_model, y_model)
     - params: dict com k,tau,theta,eqm
     - t_model, y_model: tempo e saída simulada do modelo (no mesmo domínio de t_sim usado na simulação).
+    - backend: "exact" (atraso exato, padrão) ou "pade" (usa pade_order).
     """
     t = np.asarray(t).ravel()
     y = np.asarray(y).ravel()
@@ -33,20 +33,7 @@ def smith_identification(t, y, amplitude=1.0, u=None, do_savgol=True, window=SAV
         raise ValueError("t or y empty in smith_identification")
 
     # smoothing opcional para localizar melhor t1/t2
-    if do_savgol and len(y) >= 5:
-        w = window
-        if w >= len(y):
-            w = len(y) - 1 if (len(y)-1) % 2 == 1 else len(y)-2
-        if w % 2 == 0:
-            w += 1
-        if w < 3:
-            w = 3
-        try:
-            y_s = savgol_filter(y, w, polyorder)
-        except Exception:
-            y_s = y.copy()
-    else:
-        y_s = y.copy()
+    y_s = savgol(y, window, polyorder) if do_savgol else y.copy()
 
     y0 = float(y_s[0]); yf = float(y_s[-1])
     delta = yf - y0
@@ -76,7 +63,7 @@ def smith_identification(t, y, amplitude=1.0, u=None, do_savgol=True, window=SAV
     else:
         K = (yf - y0) / amplitude
 
-    model = SystemModel(K, tau, theta, pade_order=pade_order)
+    model = SystemModel(K, tau, theta, pade_order=pade_order, backend=backend)
     try:
         # If input u is provided, simulate forced response on same T (preferred)
         if u is not None:
@@ -87,20 +74,12 @@ def smith_identification(t, y, amplitude=1.0, u=None, do_savgol=True, window=SAV
     except Exception:
         # fallback: return something aligned to t
         t_sim = t
-        y_sim = np.interp(t, t, y)
-
-    t_sim = np.asarray(t_sim).astype(float).ravel()
-    y_sim = np.asarray(y_sim).astype(float).ravel()
-
-    # agora y_model (y_sim) está no grid t_sim. Para EQM, interpole y_sim em t experimental (t).
-    # Interpole o modelo para o grid experimental usando numpy (robusto)
-    try:
-        t_sim = np.asarray(t_sim).ravel(); y_sim = np.asarray(y_sim).ravel()
-        y_hat_on_t = np.interp(t, t_sim, y_sim)
-    except Exception:
-        y_hat_on_t = np.interp(t, t, y)
+        y_sim = y.copy()
 
-    eqm_val = eqm(y, y_hat_on_t)
+    # os simuladores devolvem o próprio grid t; eqm só reamostra se não for o caso
+    t_sim = np.asarray(t_sim, dtype=float).ravel()
+    y_sim = np.asarray(y_sim, dtype=float).ravel()
+    eqm_val = eqm(y, y_sim, t, t_sim)
 
     params = {"k": float(K), "tau": float(tau), "theta": float(theta), "eqm": float(eqm_val)}
     # retorno: params, t_model (t_sim), y_model (y_sim)
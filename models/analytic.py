@@ -0,0 +1,148 @@
+"""Respostas analíticas da planta FOPDT  K·e^{-θs}/(τs+1)  a entradas simples.
+
+Degrau, rampa e pulso têm forma fechada. Uma entrada constante por partes
+(mudanças Δu_j nos instantes t_j) é a superposição de degraus
+
+    y(t) = K·u_init + K·Σ Δu_j·(1 - e^{-(t - c_j)/τ}),  c_j = t_j + θ < t
+
+avaliada em O(N + J): entre duas mudanças só o termo exponencial varia, e
+S_i = Σ_{j<=i} Δu_j·e^{-(c_i - c_j)/τ} é acumulado de uma vez por
+models.simulation.first_order_scan, sem matriz N×J. Como a entrada
+amostrada é mantida por ZOH entre amostras, o resultado coincide com
+simulate_fopdt (também em grids irregulares); fopdt_response só usa a
+superposição quando a entrada muda em poucas amostras.
+"""
+
+import numpy as np
+from models.simulation import first_order_scan
+
+MAX_CHANGE_FRACTION = 0.25   # acima disso (mudanças / amostras) o simulador recursivo é mais barato
+TAU_MIN = 1e-12
+
+
+def _start(t, t0):
+    return float(t[0]) if t0 is None else float(t0)
+
+
+def fopdt_step(t, K, tau, theta, amplitude=1.0, t0=None):
+    """Resposta analítica ao degrau `amplitude` aplicado em t0 (padrão t[0])."""
+    t = np.asarray(t, dtype=float).ravel()
+    s = t - _start(t, t0) - float(theta)
+    y = np.zeros_like(t)
+    m = s > 0
+    y[m] = float(K) * float(amplitude) * (1.0 - np.exp(-s[m] / float(tau)))
+    return y
+
+
+def fopdt_step_jacobian(t, K, tau, theta, amplitude=1.0, t0=None):
+    """Derivadas (N, 3) de fopdt_step em relação a (K, τ, θ)."""
+    t = np.asarray(t, dtype=float).ravel()
+    s = t - _start(t, t0) - float(theta)
+    J = np.zeros((t.size, 3))
+    m = s > 0
+    E = np.exp(-s[m] / float(tau))
+    KA = float(K) * float(amplitude)
+    J[m, 0] = float(amplitude) * (1.0 - E)
+    J[m, 1] = -KA * E * s[m] / float(tau) ** 2
+    J[m, 2] = -KA * E / float(tau)
+    return J
+
+
+def fopdt_ramp(t, K, tau, theta, slope=1.0, t0=None):
+    """Resposta à rampa de inclinação `slope` iniciada em t0: K·a·(s - τ·(1 - e^{-s/τ}))."""
+    t = np.asarray(t, dtype=float).ravel()
+    s = np.maximum(t - _start(t, t0) - float(theta), 0.0)
+    return float(K) * float(slope) * (s - float(tau) * -np.expm1(-s / float(tau)))
+
+
+def fopdt_pulse(t, K, tau, theta, amplitude=1.0, width=1.0, t0=None):
+    """Resposta ao pulso retangular de `amplitude` e duração `width` a partir de t0."""
+    t = np.asarray(t, dtype=float).ravel()
+    t0 = _start(t, t0)
+    return (fopdt_step(t, K, tau, theta, amplitude, t0)
+            - fopdt_step(t, K, tau, theta, amplitude, t0 + float(width)))
+
+
+def change_points(U, u_init=0.0, max_fraction=MAX_CHANGE_FRACTION):
+    """(índices, Δu) das amostras em que U muda (a primeira contra u_init).
+
+    None se U muda em mais de max_fraction das amostras (não é "constante
+    por partes" para efeito de fopdt_response).
+    """
+    U = np.asarray(U, dtype=float).ravel()
+    dU = np.empty_like(U)
+    if U.size:
+        dU[0] = U[0] - float(u_init)
+        np.subtract(U[1:], U[:-1], out=dU[1:])
+    idx = np.flatnonzero(dU)
+    if idx.size > max(1, max_fraction * U.size):
+        return None
+    return idx, dU[idx]
+
+
+def fopdt_piecewise(t, times, du, K, tau, theta, u_init=0.0, jacobian=False):
+    """Resposta à entrada constante por partes com mudanças du nos instantes `times`.
+
+    times deve ser crescente. Com jacobian=True retorna (y, J) com J (N, 3)
+    em relação a (K, τ, θ).
+    """
+    t = np.asarray(t, dtype=float).ravel()
+    du = np.asarray(du, dtype=float).ravel()
+    K, tau = float(K), max(float(tau), TAU_MIN)
+    c = np.asarray(times, dtype=float).ravel() + float(theta)
+    if c.size == 0:
+        y = np.full(t.shape, K * float(u_init))
+        return (y, np.column_stack([np.full(t.shape, float(u_init)), np.zeros((t.size, 2))])) if jacobian else y
+
+    # antes da primeira mudança a saída fica em K·u_init
+    k0 = int(np.searchsorted(t, c[0], side="right"))
+    tt = t[k0:]
+    y = np.full(t.shape, K * float(u_init))
+    if jacobian:
+        J = np.zeros((t.size, 3))
+        J[:, 0] = float(u_init)
+    if c.size == 1:
+        # degrau único: forma fechada direta
+        r = tt - c[0]
+        E = np.exp(-r / tau)
+        y[k0:] += K * du[0] * (1.0 - E)
+        if jacobian:
+            J[k0:, 0] += du[0] * (1.0 - E)
+            J[k0:, 1] = -K * du[0] * E * r / tau ** 2
+            J[k0:, 2] = -K * du[0] * E / tau
+            return y, J
+        return y
+
+    delta = np.diff(c)
+    a = np.exp(-delta / tau)
+    S = first_order_scan(a, du[1:], du[0])
+    i = np.searchsorted(c, tt, side="left") - 1      # última mudança já ativa (c_i < t)
+    r = tt - c[i]
+    E = np.exp(-r / tau)
+    Si = S[i]
+    base = np.cumsum(du)[i] - E * Si
+    y[k0:] += K * base
+    if not jacobian:
+        return y
+    # Q_i = Σ_{j<=i} Δu_j·(c_i - c_j)·e^{-(c_i - c_j)/τ}, para ∂y/∂τ
+    Q = first_order_scan(a, a * delta * S[:-1], 0.0)
+    J[k0:, 0] += base
+    J[k0:, 1] = -K * E * (r * Si + Q[i]) / tau ** 2
+    J[k0:, 2] = -K * E * Si / tau
+    return y, J
+
+
+def fopdt_response(T, U, K, tau, theta, u_init=0.0, max_fraction=MAX_CHANGE_FRACTION):
+    """Resposta exata ao sinal U (ZOH) por superposição, ou None se U não for
+    constante por partes (ver change_points)."""
+    T = np.asarray(T, dtype=float).ravel()
+    U = np.asarray(U, dtype=float).ravel()
+    if U.size == 1:
+        U = np.full(T.shape, float(U[0]))
+    if U.shape != T.shape:
+        raise ValueError("T e U devem ter o mesmo tamanho em fopdt_response")
+    cp = change_points(U, u_init, max_fraction)
+    if cp is None:
+        return None
+    idx, du = cp
+    return fopdt_piecewise(T, T[idx], du, K, tau, theta, u_init)
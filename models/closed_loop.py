@@ -0,0 +1,310 @@
+"""Simulação em tempo discreto da malha fechada PID + FOPDT.
+
+O laço é executado diretamente no grid de tempo do dataset: a cada amostra
+o PID (forma ideal com filtro na derivada) calcula u[k], que é mantido por
+ZOH e entra na planta K·e^{-θs}/(τs+1) através de um buffer circular com o
+atraso exato (inteiro + fracionário, ver models.simulation).
+
+    C(s) = Kp·(1 + 1/(Ti·s) + Td·s/((Td/N)·s + 1))
+
+Em grids irregulares o PID usa o passo de cada amostra e a planta avança
+pelos subintervalos de models.simulation.delayed_grid (ZOH exato com
+passo variável), sem reamostrar para um grid uniforme.
+
+Anti-windup por integração condicional quando a saída satura em
+[u_min, u_max]. Opcionalmente uma perturbação de carga d[k] soma-se à
+entrada da planta (depois da saturação) e um ruído de medição n[k] soma-se
+à saída vista pelo controlador; y retornado é a saída verdadeira.
+"""
+
+import numpy as np
+from models.simulation import is_uniform_grid, zoh_coefficients, delayed_grid
+
+DERIVATIVE_FILTER_N = 10.0
+
+
+def pid_coefficients(Kp, Ti, Td, dt, N=DERIVATIVE_FILTER_N):
+    """Coeficientes discretos (ki, ad, bd) do PID.
+
+    Integral por Euler progressivo (I += ki·e) e derivada filtrada por
+    diferença regressiva (D = ad·D + bd·(e - e_ant)). Ti <= 0/inf desliga a
+    ação integral e Td <= 0 desliga a derivativa.
+    """
+    Kp = float(Kp); Ti = float(Ti); Td = float(Td)
+    ki = Kp * dt / Ti if (np.isfinite(Ti) and Ti > 0) else 0.0
+    if np.isfinite(Td) and Td > 0:
+        ad = Td / (Td + N * dt)
+        bd = Kp * Td * N / (Td + N * dt)
+    else:
+        ad = bd = 0.0
+    return ki, ad, bd
+
+
+def _as_reference(T, R):
+    T = np.asarray(T, dtype=float).ravel()
+    if R is None:
+        R = np.ones_like(T)
+    R = np.asarray(R, dtype=float).ravel()
+    if R.size == 1:
+        R = np.full(T.shape, float(R[0]))
+    if R.shape != T.shape:
+        raise ValueError("T e R devem ter o mesmo tamanho")
+    return T, R
+
+
+def _as_signal(T, S, name):
+    """Sinal opcional (perturbação/ruído) no grid T: None, escalar ou (N,)."""
+    if S is None:
+        return None
+    S = np.asarray(S, dtype=float).ravel()
+    if S.size == 1:
+        return np.full(T.shape, float(S[0]))
+    if S.shape != T.shape:
+        raise ValueError(f"T e {name} devem ter o mesmo tamanho")
+    return S
+
+
+def simulate_pid_loop(T, R, K, tau, theta, Kp, Ti, Td, N=DERIVATIVE_FILTER_N,
+                      u_min=None, u_max=None, return_u=False, disturbance=None, noise=None):
+    """Simula a malha fechada PID + FOPDT para a referência R no grid T.
+
+    disturbance: perturbação de carga na entrada da planta; noise: ruído de medição
+    (ambos opcionais, no grid T). Retorna (T, y) ou (T, y, u) se return_u=True.
+    """
+    T, R = _as_reference(T, R)
+    disturbance = _as_signal(T, disturbance, "disturbance")
+    noise = _as_signal(T, noise, "noise")
+    n = T.size
+    if n < 2:
+        y = np.zeros(n); u = np.zeros(n)
+        return (T, y, u) if return_u else (T, y)
+
+    if not is_uniform_grid(T):
+        Y, Uc = _irregular_loop(T, R[None], np.array([float(K)]), np.array([float(tau)]), float(theta),
+                                np.array([[Kp, Ti, Td]], dtype=float), N, u_min, u_max,
+                                None if disturbance is None else disturbance[None],
+                                None if noise is None else noise[None])
+        return (T, Y[0], Uc[0]) if return_u else (T, Y[0])
+
+    dt = (T[-1] - T[0]) / (n - 1)
+    a, b1, b2, d = zoh_coefficients(K, tau, theta, dt)
+    ki, ad, bd = pid_coefficients(Kp, Ti, Td, dt, N=N)
+    Kp = float(Kp)
+    lo = -np.inf if u_min is None else float(u_min)
+    hi = np.inf if u_max is None else float(u_max)
+
+    # buffer circular com as últimas d+2 ações de controle (histórico nulo)
+    L = d + 2
+    buf = [0.0] * L
+    y = np.empty(n)
+    u_out = np.empty(n) if return_u else None
+    r = R.tolist()
+    dist = disturbance.tolist() if disturbance is not None else None
+    meas = (R - noise).tolist() if noise is not None else None
+
+    x = 0.0; integ = 0.0; deriv = 0.0; e_prev = 0.0
+    for k in range(n):
+        y[k] = x
+        # com ruído o controlador vê x + n: e = (r - n) - x
+        e = (meas[k] if meas is not None else r[k]) - x
+        deriv = ad * deriv + bd * (e - e_prev)
+        e_prev = e
+        v = Kp * e + integ + deriv
+        if v > hi:
+            uk = hi
+            if e < 0:
+                integ += ki * e
+        elif v < lo:
+            uk = lo
+            if e > 0:
+                integ += ki * e
+        else:
+            uk = v
+            integ += ki * e
+        buf[k % L] = uk if dist is None else uk + dist[k]
+        if return_u:
+            u_out[k] = uk
+        x = a * x + b1 * buf[(k - d - 1) % L] + b2 * buf[(k - d) % L]
+
+    return (T, y, u_out) if return_u else (T, y)
+
+
+def _batch_param(p, M, name):
+    p = np.asarray(p, dtype=float).ravel()
+    if p.size == 1:
+        return np.full(M, float(p[0]))
+    if p.size != M:
+        raise ValueError(f"{name} deve ser escalar ou ter {M} elementos")
+    return p
+
+
+def _zoh_coefficients_batch(K, tau, theta, dt):
+    """Versão vetorizada de models.simulation.zoh_coefficients."""
+    tau = np.maximum(tau, 1e-12)
+    a = np.exp(-dt / tau)
+    q = np.maximum(theta, 0.0) / dt
+    d = np.floor(q + 1e-9)
+    f = q - d
+    f = np.where(f < 1e-9, 0.0, f)
+    af = np.exp(-(1.0 - f) * dt / tau)
+    return a, K * (af - a), K * (1.0 - af), d.astype(int)
+
+
+def _pid_coefficients_batch(gains, dt, N):
+    """Versão vetorizada de pid_coefficients para gains (M, 3)."""
+    Kp, Ti, Td = gains[:, 0], gains[:, 1], gains[:, 2]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        has_i = np.isfinite(Ti) & (Ti > 0)
+        ki = np.where(has_i, Kp * dt / np.where(has_i, Ti, 1.0), 0.0)
+        has_d = np.isfinite(Td) & (Td > 0)
+        Td_s = np.where(has_d, Td, 0.0)
+        ad = np.where(has_d, Td_s / (Td_s + N * dt), 0.0)
+        bd = np.where(has_d, Kp * Td_s * N / (Td_s + N * dt), 0.0)
+    return ki, ad, bd
+
+
+def _batch_signal(S, M, n, name):
+    """None, escalar, (N,) comum ou (M, N) por candidato -> visão (M, N) ou None."""
+    if S is None:
+        return None
+    S = np.asarray(S, dtype=float)
+    if S.ndim == 0 or S.size == 1:
+        S = np.full(n, float(S.ravel()[0]))
+    S = np.broadcast_to(S, (M, n)) if S.ndim == 1 else S
+    if S.shape != (M, n):
+        raise ValueError(f"{name} deve ter forma (N,) ou (M, N)")
+    return S
+
+
+def simulate_pid_loop_batch(T, R, K, tau, theta, gains, N=DERIVATIVE_FILTER_N,
+                            u_min=None, u_max=None, return_u=False, disturbance=None, noise=None):
+    """Simula M malhas PID + FOPDT simultaneamente, vetorizado no eixo dos candidatos.
+
+    gains: array (M, 3) com colunas (Kp, Ti, Td).
+    R: referência (N,) comum a todos ou (M, N) por candidato.
+    K, tau, theta: escalares ou arrays (M,) — permite variar também a planta.
+    disturbance, noise: perturbação de carga e ruído de medição, (N,) ou (M, N)
+    (opcionais).
+    Retorna (T, Y) com Y de forma (M, N), ou (T, Y, Uc) se return_u=True.
+    """
+    T = np.asarray(T, dtype=float).ravel()
+    gains = np.atleast_2d(np.asarray(gains, dtype=float))
+    if gains.shape[1] != 3:
+        raise ValueError("gains deve ter forma (M, 3): Kp, Ti, Td")
+    M, n = gains.shape[0], T.size
+    R = _batch_signal(1.0 if R is None else R, M, n, "R")
+    disturbance = _batch_signal(disturbance, M, n, "disturbance")
+    noise = _batch_signal(noise, M, n, "noise")
+    if n < 2:
+        Y = np.zeros((M, n))
+        return (T, Y, np.zeros((M, n))) if return_u else (T, Y)
+
+    if not is_uniform_grid(T):
+        # uma passada por valor distinto de θ (o grid com os instantes atrasados depende dele)
+        K = _batch_param(K, M, "K"); tau = _batch_param(tau, M, "tau"); theta = _batch_param(theta, M, "theta")
+        Y = np.empty((M, n)); Uc = np.empty((M, n))
+        for th in np.unique(theta):
+            rows = np.flatnonzero(theta == th)
+            Y[rows], Uc[rows] = _irregular_loop(T, R[rows], K[rows], tau[rows], th, gains[rows], N, u_min, u_max,
+                                                None if disturbance is None else disturbance[rows],
+                                                None if noise is None else noise[rows])
+        return (T, Y, Uc) if return_u else (T, Y)
+
+    dt = (T[-1] - T[0]) / (n - 1)
+    K = _batch_param(K, M, "K"); tau = _batch_param(tau, M, "tau"); theta = _batch_param(theta, M, "theta")
+    a, b1, b2, d = _zoh_coefficients_batch(K, tau, theta, dt)
+    ki, ad, bd = _pid_coefficients_batch(gains, dt, N)
+    Kp = gains[:, 0]
+    lo = -np.inf if u_min is None else float(u_min)
+    hi = np.inf if u_max is None else float(u_max)
+    saturates = np.isfinite(lo) or np.isfinite(hi)
+
+    # buffer circular (M, L); atraso comum usa fatias, atrasos distintos usam indexação
+    L = int(d.max()) + 2
+    buf = np.zeros((M, L))
+    rows = np.arange(M)
+    same_delay = bool(np.all(d == d[0]))
+    d0 = int(d[0])
+
+    Y = np.empty((M, n))
+    Uc = np.empty((M, n)) if return_u else None
+    x = np.zeros(M); integ = np.zeros(M); deriv = np.zeros(M); e_prev = np.zeros(M)
+    meas = R if noise is None else R - noise
+    for k in range(n):
+        Y[:, k] = x
+        e = meas[:, k] - x
+        deriv = ad * deriv + bd * (e - e_prev)
+        e_prev = e
+        v = Kp * e + integ + deriv
+        if saturates:
+            uk = np.clip(v, lo, hi)
+            # integração condicional: não integra se o erro empurra ainda mais para a saturação
+            frozen = ((v > hi) & (e > 0)) | ((v < lo) & (e < 0))
+            integ += ki * e * ~frozen
+        else:
+            uk = v
+            integ += ki * e
+        buf[:, k % L] = uk if disturbance is None else uk + disturbance[:, k]
+        if return_u:
+            Uc[:, k] = uk
+        if same_delay:
+            u1 = buf[:, (k - d0 - 1) % L]; u2 = buf[:, (k - d0) % L]
+        else:
+            u1 = buf[rows, (k - d - 1) % L]; u2 = buf[rows, (k - d) % L]
+        x = a * x + b1 * u1 + b2 * u2
+
+    return (T, Y, Uc) if return_u else (T, Y)
+
+
+def _irregular_loop(T, R, K, tau, theta, gains, N, u_min, u_max, disturbance, noise):
+    """Laço PID + FOPDT com passo variável para M malhas com o mesmo θ.
+
+    O PID da amostra k usa h = T[k+1] - T[k] (a última repete o passo
+    anterior); a planta avança de forma exata em cada subintervalo de
+    delayed_grid(T, θ). R, disturbance e noise têm forma (M, N).
+    Retorna (Y, Uc), ambos (M, N).
+    """
+    M, n = gains.shape[0], T.size
+    h = np.diff(T)
+    h = np.r_[h, h[-1]].tolist()
+    S, src, at = delayed_grid(T, theta)
+    sample = np.full(S.size, -1)
+    sample[at] = np.arange(n)
+    hs = np.diff(S).tolist()
+    tau = np.maximum(tau, 1e-12)
+    lo = -np.inf if u_min is None else float(u_min)
+    hi = np.inf if u_max is None else float(u_max)
+    saturates = np.isfinite(lo) or np.isfinite(hi)
+    Kp = gains[:, 0]
+    # coeficientes de pid_coefficients com o passo fatorado: ki = ci·h, ad = Td/(Td + N·h)
+    ki_h, _, _ = _pid_coefficients_batch(gains, 1.0, N)
+    Td = np.where(np.isfinite(gains[:, 2]) & (gains[:, 2] > 0), gains[:, 2], 0.0)
+
+    hist = np.zeros((n, M))   # entrada aplicada à planta em cada amostra
+    Y = np.empty((M, n)); Uc = np.empty((M, n))
+    x = np.zeros(M); integ = np.zeros(M); deriv = np.zeros(M); e_prev = np.zeros(M)
+    meas = R if noise is None else R - noise
+    zero = np.zeros(M)
+    for m, (k, j) in enumerate(zip(sample.tolist(), src.tolist())):
+        if k >= 0:
+            Y[:, k] = x
+            ki = ki_h * h[k]
+            ad = Td / (Td + N * h[k])
+            bd = Kp * N * ad
+            e = meas[:, k] - x
+            deriv = ad * deriv + bd * (e - e_prev)
+            e_prev = e
+            v = Kp * e + integ + deriv
+            if saturates:
+                uk = np.clip(v, lo, hi)
+                frozen = ((v > hi) & (e > 0)) | ((v < lo) & (e < 0))
+                integ = integ + ki * e * ~frozen
+            else:
+                uk = v
+                integ = integ + ki * e
+            Uc[:, k] = uk
+            hist[k] = uk if disturbance is None else uk + disturbance[:, k]
+        if m < len(hs):
+            a = np.exp(-hs[m] / tau)
+            x = a * x + K * (1.0 - a) * (hist[j] if j >= 0 else zero)
+    return Y, Uc
@@ -0,0 +1,208 @@
+"""Cenários de operação para a malha fechada: referência, perturbação e ruído.
+
+Um cenário é um dict (ou JSON) declarativo:
+
+    {
+      "name": "Escada + carga",
+      "duration": 400.0,                # s (ignorado se T for dado)
+      "dt": 0.5,
+      "setpoint": [                     # eventos na ordem do tempo
+        {"type": "step", "t": 0, "value": 60},
+        {"type": "ramp", "t": 100, "to": 70, "duration": 20},
+        {"type": "staircase", "t": 200, "values": [65, 60], "dwell": 50}
+      ],
+      "disturbance": [                  # na entrada da planta (mesma unidade de u)
+        {"type": "step", "t": 320, "value": -5},
+        {"type": "pulse", "t": 360, "value": 3, "duration": 10}
+      ],
+      "noise": {"std": 0.05, "seed": 0} # ruído de medição gaussiano
+    }
+
+Eventos "step", "ramp" e "staircase" definem o nível do sinal a partir do
+instante t; "pulse" e "sine" (amplitude, period, duration) somam-se ao
+nível. Cada instante de evento inicia um segmento, e as métricas são
+calculadas por segmento (segment_metrics) para todas as sintonias de um
+lote de uma vez (simulate_pid_loop_batch).
+"""
+
+import json
+import numpy as np
+from models.closed_loop import simulate_pid_loop_batch, DERIVATIVE_FILTER_N
+
+LEVEL_EVENTS = ("step", "ramp", "staircase")
+ADDITIVE_EVENTS = ("pulse", "sine")
+SETTLING_TOL = 0.02
+SEGMENT_KEYS = ("iae", "ise", "peak_error", "ts", "mp")
+
+
+def _event_times(event):
+    """Instantes em que o evento muda o sinal (limites de segmento)."""
+    t0 = float(event["t"])
+    if event["type"] == "staircase":
+        return [t0 + i * float(event["dwell"]) for i in range(len(event["values"]))]
+    return [t0]
+
+
+def build_signal(t, events, initial=0.0):
+    """Sinal no grid t a partir da lista de eventos (ver docstring do módulo)."""
+    t = np.asarray(t, dtype=float).ravel()
+    level = np.full(t.shape, float(initial))
+    extra = np.zeros(t.shape)
+    for ev in sorted(events or (), key=lambda e: float(e["t"])):
+        kind, t0 = ev["type"], float(ev["t"])
+        if kind == "step":
+            level[t >= t0] = float(ev["value"])
+        elif kind == "ramp":
+            i0 = min(int(np.searchsorted(t, t0)), t.size - 1)
+            v0, v1, dur = level[i0], float(ev["to"]), max(float(ev["duration"]), 1e-12)
+            mask = t >= t0
+            level[mask] = v0 + (v1 - v0) * np.minimum((t[mask] - t0) / dur, 1.0)
+        elif kind == "staircase":
+            for ts, v in zip(_event_times(ev), ev["values"]):
+                level[t >= ts] = float(v)
+        elif kind == "pulse":
+            extra[(t >= t0) & (t < t0 + float(ev["duration"]))] += float(ev["value"])
+        elif kind == "sine":
+            mask = (t >= t0) & (t < t0 + float(ev.get("duration", np.inf)))
+            extra[mask] += float(ev["amplitude"]) * np.sin(2.0 * np.pi * (t[mask] - t0) / float(ev["period"]))
+        else:
+            raise ValueError(f"evento desconhecido: {kind!r} (use {', '.join(LEVEL_EVENTS + ADDITIVE_EVENTS)})")
+    return level + extra
+
+
+def scenario_signals(spec, T=None):
+    """(T, r, d, n): grid, referência, perturbação de carga e ruído de medição."""
+    if T is None:
+        T = np.arange(0.0, float(spec["duration"]) + 0.5 * float(spec["dt"]), float(spec["dt"]))
+    T = np.asarray(T, dtype=float).ravel()
+    r = build_signal(T, spec.get("setpoint"), spec.get("setpoint_initial", 0.0))
+    d = build_signal(T, spec.get("disturbance"), spec.get("disturbance_initial", 0.0))
+    noise = spec.get("noise") or {}
+    std = float(noise.get("std", 0.0))
+    n = np.random.default_rng(noise.get("seed")).normal(0.0, std, T.size) if std > 0 else np.zeros(T.size)
+    return T, r, d, n
+
+
+def scenario_segments(spec, T):
+    """Lista de segmentos {t0, t1, i0, i1, kind, label} delimitados pelos eventos."""
+    T = np.asarray(T, dtype=float).ravel()
+    marks = {}
+    for source in ("disturbance", "setpoint"):   # referência prevalece em instantes comuns
+        for ev in spec.get(source) or ():
+            for ts in _event_times(ev):
+                if T[0] <= ts < T[-1]:
+                    marks[ts] = (source, ev["type"])
+    times = sorted(set(marks) | {float(T[0])})
+    segments = []
+    for j, t0 in enumerate(times):
+        t1 = times[j + 1] if j + 1 < len(times) else float(T[-1])
+        i0, i1 = int(np.searchsorted(T, t0)), int(np.searchsorted(T, t1))
+        if j + 1 == len(times):
+            i1 = T.size
+        if i1 - i0 < 2:
+            continue
+        source, kind = marks.get(t0, ("setpoint", "start"))
+        segments.append({"t0": t0, "t1": t1, "i0": i0, "i1": i1,
+                         "kind": source, "label": f"{kind} @ {t0:.4g} s"})
+    return segments
+
+
+def segment_metrics(T, Y, r, segments, tol=SETTLING_TOL):
+    """Métricas por segmento para Y (N,) ou (M, N); retorna lista de dicts.
+
+    Em cada segmento, com e = r - y:
+      iae, ise      integrais (trapézios) de |e| e e²
+      peak_error    máximo de |e|
+      ts            tempo, a partir do início do segmento, até |e| ficar
+                    dentro de tol·escala (escala = |Δr| na mudança de
+                    referência, |r| nas perturbações); NaN se não acomodar
+      mp            sobressinal além do novo valor, como fração de |Δr|
+                    (apenas mudanças de referência; NaN nas demais)
+    """
+    T = np.asarray(T, dtype=float).ravel()
+    Y = np.asarray(Y, dtype=float)
+    single = Y.ndim == 1
+    Y = np.atleast_2d(Y)
+    r = np.asarray(r, dtype=float).ravel()
+    out = []
+    for seg in segments:
+        i0, i1 = seg["i0"], seg["i1"]
+        t, y, rs = T[i0:i1], Y[:, i0:i1], r[i0:i1]
+        e = rs - y
+        dt = np.diff(t)
+        trap = lambda f: np.sum(0.5 * (f[:, 1:] + f[:, :-1]) * dt, axis=1)
+        r_before = r[i0 - 1] if i0 > 0 else y[:, 0].mean()
+        step = rs[-1] - r_before
+        change = seg["kind"] == "setpoint" and abs(step) > 1e-12
+        scale = abs(step) if change else max(abs(rs[-1]), 1e-12)
+        outside = np.abs(e) > tol * scale
+        last_out = outside.shape[1] - 1 - np.argmax(outside[:, ::-1], axis=1)
+        settled = ~outside[:, -1]
+        ts = np.where(outside.any(axis=1), t[np.minimum(last_out + 1, t.size - 1)] - t[0], 0.0)
+        ts = np.where(settled, ts, np.nan)
+        if change:
+            mp = np.max(np.sign(step) * (y - rs[-1]), axis=1) / abs(step)
+        else:
+            mp = np.full(Y.shape[0], np.nan)
+        m = {"iae": trap(np.abs(e)), "ise": trap(e ** 2), "peak_error": np.max(np.abs(e), axis=1),
+             "ts": ts, "mp": mp}
+        if single:
+            m = {k: float(v[0]) for k, v in m.items()}
+        out.append({**{k: seg[k] for k in ("t0", "t1", "kind", "label")}, **m})
+    return out
+
+
+def run_scenario(spec, k, tau, theta, gains, T=None, N=DERIVATIVE_FILTER_N, u_min=None, u_max=None):
+    """Simula o cenário para uma sintonia (3,) ou um lote (M, 3).
+
+    Retorna dict com "name", "t", "r", "d", "n", "y" ((N,) ou (M, N)), "u",
+    "segments" (segment_metrics) e "iae" total.
+    """
+    single = np.ndim(gains) == 1
+    gains = np.atleast_2d(np.asarray(gains, dtype=float))
+    T, r, d, n = scenario_signals(spec, T)
+    with np.errstate(over="ignore", invalid="ignore"):
+        _, Y, Uc = simulate_pid_loop_batch(T, r, k, tau, theta, gains, N=N, u_min=u_min, u_max=u_max,
+                                           return_u=True, disturbance=d, noise=n)
+        segments = segment_metrics(T, Y, r, scenario_segments(spec, T))
+    if single:
+        Y, Uc = Y[0], Uc[0]
+        segments = [{key: (float(v[0]) if isinstance(v, np.ndarray) else v) for key, v in s.items()}
+                    for s in segments]
+    return {"name": spec.get("name", ""), "t": T, "r": r, "d": d, "n": n, "y": Y, "u": Uc,
+            "segments": segments, "iae": sum(s["iae"] for s in segments)}
+
+
+def run_scenarios(specs, k, tau, theta, gains, **kwargs):
+    """run_scenario para cada cenário da lista (mesmas sintonias)."""
+    return [run_scenario(spec, k, tau, theta, gains, **kwargs) for spec in specs]
+
+
+def load_scenarios(path):
+    """Lista de cenários de um arquivo JSON (um cenário ou uma lista deles)."""
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    return data if isinstance(data, list) else [data]
+
+
+def standard_scenarios(sp, tau, theta, noise_std=0.0):
+    """Cenários típicos escalados pela planta: horizonte em múltiplos de τ+θ."""
+    h = float(tau) + float(theta)
+    dt = h / 100.0
+    sp = float(sp)
+    load = -0.1 * abs(sp) if sp else -0.1
+    noise = {"std": float(noise_std), "seed": 0}
+    return [
+        {"name": "Degrau + perturbação de carga", "duration": 16 * h, "dt": dt, "noise": noise,
+         "setpoint": [{"type": "step", "t": 0.0, "value": sp}],
+         "disturbance": [{"type": "step", "t": 8 * h, "value": load}]},
+        {"name": "Rampa de referência", "duration": 16 * h, "dt": dt, "noise": noise,
+         "setpoint": [{"type": "step", "t": 0.0, "value": 0.5 * sp},
+                      {"type": "ramp", "t": 6 * h, "to": sp, "duration": 3 * h}]},
+        {"name": "Escada de referência", "duration": 24 * h, "dt": dt, "noise": noise,
+         "setpoint": [{"type": "staircase", "t": 0.0, "values": [0.5 * sp, 0.75 * sp, sp, 0.75 * sp],
+                       "dwell": 6 * h}]},
+        {"name": "Pulso de carga", "duration": 12 * h, "dt": dt, "noise": noise,
+         "setpoint": [{"type": "step", "t": 0.0, "value": sp}],
+         "disturbance": [{"type": "pulse", "t": 6 * h, "value": 2 * load, "duration": h}]},
+    ]
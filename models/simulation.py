@@ -0,0 +1,228 @@
+"""Motor de simulação exata para plantas FOPDT  K·e^{-θs}/(τs+1).
+
+A planta de primeira ordem é discretizada por segurador de ordem zero (ZOH)
+de forma exata e o atraso θ é aplicado como um deslocamento de d amostras
+inteiras mais uma fração f de amostra:
+
+    θ = (d + f)·dt,  0 <= f < 1
+    x[k+1] = a·x[k] + K·(a^(1-f) - a)·u[k-d-1] + K·(1 - a^(1-f))·u[k-d]
+
+com a = exp(-dt/τ). Não há aproximação de Padé, portanto a resposta não
+apresenta o ripple inicial e o custo é O(N).
+
+Em grids irregulares a simulação anda com o passo variável de cada
+amostra: o grid é unido aos instantes atrasados T + θ (delayed_grid), de
+modo que a entrada atrasada seja constante em cada subintervalo e a
+discretização ZOH continue exata, sem reamostrar nem interpolar.
+"""
+
+import numpy as np
+from scipy.linalg import expm
+from scipy.signal import lfilter, ss2tf, tf2ss
+from utils.timebase import is_uniform_grid
+
+SCAN_LOG_SPAN = 600.0   # faixa de log(Π a) por bloco em first_order_scan (sem overflow)
+
+
+def split_delay(theta, dt):
+    """Divide o atraso em (d, f): d amostras inteiras e fração f em [0, 1)."""
+    if theta <= 0 or dt <= 0:
+        return 0, 0.0
+    q = float(theta) / float(dt)
+    d = int(np.floor(q + 1e-9))
+    f = q - d
+    if f < 1e-9:
+        f = 0.0
+    return d, float(f)
+
+
+def zoh_coefficients(K, tau, theta, dt):
+    """Coeficientes (a, b1, b2, d) da recorrência ZOH exata com atraso fracionário.
+
+    x[k+1] = a·x[k] + b1·u[k-d-1] + b2·u[k-d]
+    """
+    tau = max(float(tau), 1e-12)
+    a = float(np.exp(-dt / tau))
+    d, f = split_delay(theta, dt)
+    af = float(np.exp(-(1.0 - f) * dt / tau))
+    b1 = float(K) * (af - a)
+    b2 = float(K) * (1.0 - af)
+    return a, b1, b2, d
+
+
+def delay_samples(U, n, u_init=0.0):
+    """Desloca U em n amostras, preenchendo o histórico com u_init."""
+    U = np.asarray(U, dtype=float)
+    if n <= 0:
+        return U
+    out = np.empty_like(U)
+    n = min(n, U.size)
+    out[:n] = u_init
+    out[n:] = U[:U.size - n]
+    return out
+
+
+def delayed_grid(T, theta):
+    """Grid conjunto dos instantes T e dos instantes atrasados T + θ (até T[-1]).
+
+    Retorna (S, src, at): em [S[m], S[m+1]) a entrada atrasada vale
+    u[src[m]] (src = -1: histórico anterior a T[0]) e at[k] é a posição de
+    T[k] em S. Em empates o instante de amostragem vem primeiro.
+    """
+    T = np.asarray(T, dtype=float).ravel()
+    n = T.size
+    shifted = T + max(float(theta), 0.0)
+    times = np.concatenate([T, shifted])
+    src = np.concatenate([np.searchsorted(shifted, T, side="right") - 1, np.arange(n)])
+    order = np.argsort(times, kind="stable")
+    order = order[times[order] <= T[-1]]
+    return times[order], src[order], np.flatnonzero(order < n)
+
+
+def first_order_scan(a, b, x0=0.0):
+    """x[0] = x0, x[m+1] = a[m]·x[m] + b[m] com coeficientes variáveis, vetorizado.
+
+    Usa x[m+1] = P[m]·(x0 + Σ b[i]/P[i]), P = Π a, em blocos nos quais P
+    fica dentro de e^{±SCAN_LOG_SPAN}. Retorna x com len(a) + 1 valores.
+    """
+    a = np.asarray(a, dtype=float).ravel()
+    b = np.asarray(b, dtype=float).ravel()
+    m = a.size
+    x = np.empty(m + 1)
+    x[0] = x0
+    with np.errstate(divide="ignore"):
+        c = np.cumsum(np.minimum(-np.log(a), SCAN_LOG_SPAN))
+    start = 0
+    while start < m:
+        base = c[start - 1] if start else 0.0
+        end = max(int(np.searchsorted(c, base + SCAN_LOG_SPAN, side="right")), start + 1)
+        cb = c[start:end] - base
+        x[start + 1:end + 1] = np.exp(-cb) * (x[start] + np.cumsum(b[start:end] * np.exp(cb)))
+        start = end
+    return x
+
+
+def _delayed_input(U, src, u_init=0.0):
+    """Entrada atrasada em cada subintervalo de delayed_grid."""
+    return np.where(src >= 0, U[np.maximum(src, 0)], float(u_init))
+
+
+def simulate_fopdt(T, U, K, tau, theta, u_init=0.0):
+    """Resposta exata (ZOH) de K·e^{-θs}/(τs+1) ao sinal U amostrado em T.
+
+    u_init: valor de entrada anterior a T[0]; a planta parte do regime
+    permanente correspondente (y = K·u_init).
+    Retorna (T, y) como arrays float64.
+    """
+    T = np.asarray(T, dtype=float).ravel()
+    U = np.asarray(U, dtype=float).ravel()
+    if U.size == 1:
+        U = np.full(T.shape, float(U[0]))
+    if U.shape != T.shape:
+        raise ValueError("T e U devem ter o mesmo tamanho em simulate_fopdt")
+    if T.size == 0:
+        return T, np.zeros(0)
+    if T.size == 1:
+        return T, np.array([float(K) * float(u_init)])
+
+    if not is_uniform_grid(T):
+        # passo variável: recorrência ZOH exata em cada subintervalo de delayed_grid
+        S, src, at = delayed_grid(T, theta)
+        a = np.exp(-np.diff(S) / max(float(tau), 1e-12))
+        dU = _delayed_input(U - float(u_init), src[:-1])
+        x = first_order_scan(a, float(K) * (1.0 - a) * dU)
+        return T, x[at] + float(K) * float(u_init)
+
+    dt = (T[-1] - T[0]) / (T.size - 1)
+    a, b1, b2, d = zoh_coefficients(K, tau, theta, dt)
+    dU = U - float(u_init)
+    w = b2 * delay_samples(dU, d) + b1 * delay_samples(dU, d + 1)
+    # x[k+1] = a·x[k] + w[k]  ->  filtro IIR de 1ª ordem com um atraso unitário
+    y = lfilter([0.0, 1.0], [1.0, -a], w)
+    return T, y + float(K) * float(u_init)
+
+
+def step_fopdt(T, K, tau, theta, amplitude=1.0):
+    """Resposta ao degrau de amplitude `amplitude` aplicado em T[0]."""
+    T = np.asarray(T, dtype=float).ravel()
+    return simulate_fopdt(T, np.full(T.shape, float(amplitude)), K, tau, theta)
+
+
+def _zoh_integral(A, B, h):
+    """Γ(h) = ∫_0^h e^{As} ds · B, via exponencial da matriz aumentada."""
+    n, m = B.shape
+    M = np.zeros((n + m, n + m))
+    M[:n, :n] = A
+    M[:n, n:] = B
+    E = expm(M * h)
+    return E[:n, :n], E[:n, n:]
+
+
+def delayed_lti_coefficients(num, den, theta, dt):
+    """Discretização ZOH exata de num/den · e^{-θs} com atraso fracionário.
+
+    x[k+1] = Φ·x[k] + Γ1·u[k-d-1] + Γ2·u[k-d],  y[k] = C·x[k]
+    Retorna (Φ, Γ1, Γ2, C, d). O modelo deve ser estritamente próprio.
+    """
+    A, B, C, D = tf2ss(np.atleast_1d(num).astype(float), np.atleast_1d(den).astype(float))
+    if np.any(np.abs(D) > 0):
+        raise ValueError("modelo deve ser estritamente próprio")
+    d, f = split_delay(theta, dt)
+    Phi, _ = _zoh_integral(A, B, dt)
+    Phi_b, G2 = _zoh_integral(A, B, (1.0 - f) * dt)
+    _, Gf = _zoh_integral(A, B, f * dt)
+    G1 = Phi_b @ Gf
+    return Phi, G1, G2, C, d
+
+
+def simulate_delayed_lti(T, U, num, den, theta):
+    """Resposta exata (ZOH) de num/den · e^{-θs} ao sinal U, estado inicial nulo.
+
+    Generaliza simulate_fopdt para qualquer função de transferência
+    estritamente própria (2ª ordem, integradora, ...). Cada entrada atrasada
+    é filtrada por lfilter, logo o custo continua O(N).
+    """
+    T = np.asarray(T, dtype=float).ravel()
+    U = np.asarray(U, dtype=float).ravel()
+    if U.size == 1:
+        U = np.full(T.shape, float(U[0]))
+    if U.shape != T.shape:
+        raise ValueError("T e U devem ter o mesmo tamanho em simulate_delayed_lti")
+    if T.size < 2:
+        return T, np.zeros(T.size)
+    if not is_uniform_grid(T):
+        return T, _simulate_lti_irregular(T, U, num, den, theta)
+
+    dt = (T[-1] - T[0]) / (T.size - 1)
+    Phi, G1, G2, C, d = delayed_lti_coefficients(num, den, theta, dt)
+    y = np.zeros(T.size)
+    for G, shift in ((G2, d), (G1, d + 1)):
+        if not np.any(G):
+            continue
+        # com D = 0, b[0] = 0: y[k] só enxerga entradas até k-1
+        b, a = ss2tf(Phi, G, C, np.zeros((1, 1)))
+        y += lfilter(np.ravel(b), np.ravel(a), delay_samples(U, shift))
+    return T, y
+
+
+def _simulate_lti_irregular(T, U, num, den, theta):
+    """simulate_delayed_lti com passo variável: Φ(h) e Γ(h) por passo distinto."""
+    A, B, C, D = tf2ss(np.atleast_1d(num).astype(float), np.atleast_1d(den).astype(float))
+    if np.any(np.abs(D) > 0):
+        raise ValueError("modelo deve ser estritamente próprio")
+    S, src, at = delayed_grid(T, theta)
+    nx = A.shape[0]
+    M = np.zeros((nx + 1, nx + 1))
+    M[:nx, :nx] = A
+    M[:nx, nx:] = B
+    h, inv = np.unique(np.diff(S), return_inverse=True)
+    E = expm(M[None] * h[:, None, None])
+    Phi, Gam = E[:, :nx, :nx], E[:, :nx, nx]
+    u = _delayed_input(U, src[:-1]).tolist()
+    X = np.empty((S.size, nx))
+    x = np.zeros(nx)
+    for m, j in enumerate(inv.tolist()):
+        X[m] = x
+        x = Phi[j] @ x + Gam[j] * u[m]
+    X[-1] = x
+    return X[at] @ np.ravel(C)
@@ -1,28 +1,122 @@
 import numpy as np
 import control as ctrl
+from models.simulation import simulate_fopdt, simulate_delayed_lti
+from models.analytic import fopdt_response
+from models.closed_loop import simulate_pid_loop, simulate_pid_loop_batch, DERIVATIVE_FILTER_N
+from utils.cache import LRUCache, array_key
+from utils.timebase import TimeBase
+from utils.profiling import profiled
 
 PADE_ORDER_DEFAULT = 20
+# "exact": discretização ZOH exata com atraso fracionário (models.simulation)
+# "pade": aproximação de Padé + python-control (mantido para comparação)
+BACKENDS = ("exact", "pade")
+BACKEND_DEFAULT = "exact"
+STEP_HORIZON_FACTOR = 10.0
+STEP_DEFAULT_POINTS = 1000
+
+# memoização: re-sintonizar com os mesmos parâmetros não reconstrói nada
+PADE_CACHE = LRUCache("pade", maxsize=64)
+SYSTEM_CACHE = LRUCache("systems", maxsize=128)
+RESULT_CACHE = LRUCache("results", maxsize=64, max_bytes=64 * 2 ** 20)
+
+
+def pade_coefficients(theta, order):
+    """(num, den) de ctrl.pade(theta, order), memoizado por (θ, ordem)."""
+    return PADE_CACHE.get_or_compute((float(theta), int(order)), lambda: ctrl.pade(float(theta), int(order)))
+
+
+def _input_signal(T, U=None, step_amplitude=1.0):
+    """U no grid T: degrau de step_amplitude se None; com outro tamanho é esticado (TimeBase.fit)."""
+    if U is None:
+        return np.full(T.shape, float(step_amplitude))
+    U = np.asarray(U, dtype=float)
+    return U if U.shape == T.shape else TimeBase(T).fit(U)
+
 
 class SystemModel:
-    def __init__(self, K=1.0, tau=1.0, theta=0.0, pade_order=PADE_ORDER_DEFAULT):
+    """Planta FOPDT  K·e^{-θs}/(τs+1). Base das demais variantes de modelo."""
+    kind = "FOPDT"
+
+    def __init__(self, K=1.0, tau=1.0, theta=0.0, pade_order=PADE_ORDER_DEFAULT, backend=BACKEND_DEFAULT):
+        if backend not in BACKENDS:
+            raise ValueError(f"backend inválido: {backend!r} (use um de {BACKENDS})")
         self.K = float(K)
         self.tau = float(tau)
         self.theta = float(theta)
         self.pade_order = int(pade_order)
-        self.tf = ctrl.tf([self.K], [self.tau, 1.0])
+        self.backend = backend
+        self.tf = SYSTEM_CACHE.get_or_compute(("tf",) + self._key()[:3], lambda: ctrl.tf(*self.tf_coefficients()))
+
+    def tf_coefficients(self):
+        """(num, den) da parte racional da planta (sem o atraso)."""
+        return [self.K], [self.tau, 1.0]
+
+    def params(self):
+        return {"model": self.kind, "k": self.K, "tau": self.tau, "theta": self.theta}
+
+    def _key(self):
+        """Identifica a planta nos caches: (tipo, num, den, θ)."""
+        num, den = self.tf_coefficients()
+        return (self.kind, tuple(float(v) for v in num), tuple(float(v) for v in den), self.theta)
+
+    def _cached_result(self, tag, T, U, extra, simulate):
+        """(t, y) de simulate(), memoizado pelo modelo, `extra` e conteúdo de T/U.
+
+        Devolve cópias, para que quem chama possa alterar os arrays à vontade.
+        """
+        key = (tag, self._key(), self.backend, self.pade_order, extra, array_key(T, U))
+
+        def compute():
+            out = tuple(np.array(v, dtype=float).ravel() for v in simulate()[:2])
+            for v in out:
+                v.setflags(write=False)
+            return out
+
+        t, y = RESULT_CACHE.get_or_compute(key, compute)
+        return t.copy(), y.copy()
+
+    def _simulate_exact(self, T, U):
+        # entradas constantes por partes (degraus do dataset): superposição analítica
+        y = fopdt_response(T, U, self.K, self.tau, self.theta)
+        if y is None:
+            return simulate_fopdt(T, U, self.K, self.tau, self.theta)
+        return T, y
 
     def tf_with_delay(self):
         if self.theta and self.pade_order > 0:
-            num, den = ctrl.pade(self.theta, self.pade_order)
-            pade_tf = ctrl.tf(num, den)
-            return ctrl.series(self.tf, pade_tf)
+            def build():
+                num, den = pade_coefficients(self.theta, self.pade_order)
+                return ctrl.series(self.tf, ctrl.tf(num, den))
+            return SYSTEM_CACHE.get_or_compute(("plant", self._key(), self.pade_order), build)
         return self.tf
 
-    def simulate_step_openloop(self, T):
-        plant = self.tf_with_delay()
-        t, y = ctrl.step_response(plant, T)
-        return t, np.asarray(y)
+    def plant_ss(self):
+        """Realização em espaço de estados da planta com Padé (memoizada)."""
+        return SYSTEM_CACHE.get_or_compute(("plant_ss", self._key(), self.pade_order),
+                                           lambda: ctrl.ss(self.tf_with_delay()))
+
+    def closedloop_ss(self, Kp, Ti, Td):
+        """Malha fechada PID + planta com Padé em espaço de estados, memoizada por
+        (K, τ, θ, ordem, Kp, Ti, Td)."""
+        Kp, Ti, Td = float(Kp), float(Ti), float(Td)
+
+        def build():
+            pid = ctrl.tf([Kp * Td, Kp, Kp / Ti], [1, 0])
+            return ctrl.ss(ctrl.feedback(ctrl.series(pid, self.tf_with_delay()), 1))
+        return SYSTEM_CACHE.get_or_compute(("closed", self._key(), self.pade_order, Kp, Ti, Td), build)
+
+    @profiled("SystemModel.simulate_step_openloop")
+    def simulate_step_openloop(self, T=None):
+        if self.backend == "exact":
+            if T is None:
+                t_end = STEP_HORIZON_FACTOR * (self.tau + self.theta)
+                T = np.linspace(0.0, t_end, STEP_DEFAULT_POINTS)
+            T = np.asarray(T, dtype=float).ravel()
+            return self._cached_result("step", T, None, None, lambda: self._simulate_exact(T, np.ones_like(T)))
+        return self._cached_result("step", T, None, None, lambda: tuple(ctrl.step_response(self.plant_ss(), T)))
 
+    @profiled("SystemModel.simulate_forced_response")
     def simulate_forced_response(self, T, U):
         """Simula resposta forçada (open-loop) da planta para o sinal de entrada U.
 
@@ -30,54 +124,155 @@ class SystemModel:
         U: sinal de entrada (array com mesmo tamanho de T)
         Retorna (t_sim, y_sim)
         """
-        plant = self.tf_with_delay()
-        T = np.asarray(T)
-        U = np.asarray(U, dtype=float)
-        # if sizes differ, interpolate U to T
-        if U.shape != T.shape:
+        T = np.asarray(T, dtype=float)
+        U = _input_signal(T, U)
+        if self.backend == "exact":
+            return self._cached_result("forced", T, U, None, lambda: self._simulate_exact(T, U))
+
+        def simulate():
+            plant = self.plant_ss()
             try:
-                U = np.interp(T, np.linspace(T.min(), T.max(), num=U.size), U)
+                return ctrl.forced_response(plant, T=T, U=U)[:2]
             except Exception:
-                U = np.ones_like(T, dtype=float) * float(np.mean(U))
-        try:
-            t_sim, y_sim = ctrl.forced_response(plant, T=T, U=U)[:2]
-        except Exception:
-            resp = ctrl.forced_response(plant, T=T, U=U)
-            t_sim, y_sim = resp[0], resp[1]
-        return np.asarray(t_sim, dtype=float).ravel(), np.asarray(y_sim, dtype=float).ravel()
-
-    def simulate_step_closedloop(self, Kp, Ti, Td, T, U=None, step_amplitude=1.0):
+                resp = ctrl.forced_response(plant, T=T, U=U)
+                return resp[0], resp[1]
+        return self._cached_result("forced", T, U, None, simulate)
+
+    @profiled("SystemModel.simulate_step_closedloop")
+    def simulate_step_closedloop(self, Kp, Ti, Td, T, U=None, step_amplitude=1.0,
+                                 N=DERIVATIVE_FILTER_N, u_min=None, u_max=None,
+                                 disturbance=None, noise=None):
         """
         Simula resposta em malha fechada.
-        - Se U for fornecido (mesmo tamanho de T), usa forced_response(sys, T, U)
+        - Se U for fornecido (mesmo tamanho de T), usa U como referência
         - Caso contrário, gera um degrau unitário * step_amplitude
+        - backend "exact": laço discreto PID + FOPDT no próprio grid T
+          (derivada filtrada com fator N, saturação [u_min, u_max] com anti-windup)
+        - backend "pade": PID contínuo + Padé via python-control (também usado
+          pelas variantes de ordem superior)
+        - disturbance/noise: perturbação de carga na entrada da planta e ruído
+          de medição no grid T (apenas backend "exact" com FOPDT)
         Retorna (t_sim, y_sim) numpy arrays.
         """
-        # cria PID e planta (com possível atraso via pade)
+        # prepara sinal de entrada U
+        T = np.asarray(T, dtype=float)
+        U = _input_signal(T, U, step_amplitude)
+
+        extra = (float(Kp), float(Ti), float(Td), float(N), u_min, u_max)
+        if disturbance is not None or noise is not None:
+            extra += (array_key(disturbance, noise),)
+        if self.backend == "exact" and self.kind == "FOPDT":
+            T_sim, Y_sim = self._cached_result(
+                "closed", T, U, extra,
+                lambda: simulate_pid_loop(T, U, self.K, self.tau, self.theta, Kp, Ti, Td,
+                                          N=N, u_min=u_min, u_max=u_max,
+                                          disturbance=disturbance, noise=noise))
+            return [T_sim, Y_sim]
+        if disturbance is not None or noise is not None:
+            raise ValueError("perturbação e ruído exigem o backend exato (FOPDT)")
+
+        # PID + planta (com possível atraso via pade), montados uma vez por conjunto de parâmetros
         # guard against Ti being zero
         #Ti_safe = float(Ti) if (Ti is not None and np.isfinite(Ti) and Ti != 0) else 1e-6
-        pid = ctrl.tf([Kp * Td, Kp, Kp / Ti], [1, 0])
-        plant = self.tf_with_delay()
-        ol = ctrl.series(pid, plant)
-        cl = ctrl.feedback(ol, 1)
-
-        # prepara sinal de entrada U
-        T = np.asarray(T)
-        if U is None:
-            U = np.ones_like(T, dtype=float) * float(step_amplitude)
-        else:
-            U = np.asarray(U, dtype=float)
-            # se U tiver tamanho diferente, tenta interpolar para grid T
-            if U.shape != T.shape:
-                U = np.interp(T, np.linspace(T.min(), T.max(), num=U.size), U)
-
-        # usa forced_response para simular com o sinal U
-        try:
-            T_sim, Y_sim = ctrl.forced_response(cl, T=T, U=U)[:2]
-        except Exception:
-            # fallback para versões/instâncias do control que retornam 3-tupla ou se algo falhar
-            resp = ctrl.forced_response(cl, T=T, U=U)
-            T_sim, Y_sim = resp[0], resp[1]
+        def simulate():
+            cl = self.closedloop_ss(Kp, Ti, Td)
+            # usa forced_response para simular com o sinal U
+            try:
+                return ctrl.forced_response(cl, T=T, U=U)[:2]
+            except Exception:
+                # fallback para versões/instâncias do control que retornam 3-tupla ou se algo falhar
+                resp = ctrl.forced_response(cl, T=T, U=U)
+                return resp[0], resp[1]
 
+        T_sim, Y_sim = self._cached_result("closed", T, U, extra, simulate)
         return [T_sim,Y_sim]
 
+    @profiled("SystemModel.simulate_closedloop_batch")
+    def simulate_closedloop_batch(self, gains, T, U=None, step_amplitude=1.0,
+                                  N=DERIVATIVE_FILTER_N, u_min=None, u_max=None,
+                                  disturbance=None, noise=None):
+        """Simula a malha fechada para M conjuntos de ganhos de uma só vez.
+
+        gains: array (M, 3) com (Kp, Ti, Td); U: referência (mesmo tamanho de T);
+        disturbance/noise como em simulate_step_closedloop.
+        Retorna (t_sim, Y) com Y de forma (M, len(T)). Sempre usa o laço
+        discreto exato, independente do backend (apenas FOPDT).
+        """
+        if self.kind != "FOPDT":
+            raise ValueError("simulação em lote disponível apenas para FOPDT")
+        T = np.asarray(T, dtype=float)
+        U = _input_signal(T, U, step_amplitude)
+        return simulate_pid_loop_batch(T, U, self.K, self.tau, self.theta, gains,
+                                       N=N, u_min=u_min, u_max=u_max,
+                                       disturbance=disturbance, noise=noise)
+
+
+class SOPDTModel(SystemModel):
+    """Segunda ordem superamortecida com atraso: K·e^{-θs}/((τ1·s+1)(τ2·s+1))."""
+    kind = "SOPDT"
+
+    def __init__(self, K=1.0, tau1=1.0, tau2=1.0, theta=0.0, pade_order=PADE_ORDER_DEFAULT, backend=BACKEND_DEFAULT):
+        self.tau1 = float(tau1)
+        self.tau2 = float(tau2)
+        # tau (soma das constantes) é usado apenas para horizontes de simulação
+        super().__init__(K, self.tau1 + self.tau2, theta, pade_order=pade_order, backend=backend)
+
+    def tf_coefficients(self):
+        return [self.K], list(np.polymul([self.tau1, 1.0], [self.tau2, 1.0]))
+
+    def params(self):
+        return {"model": self.kind, "k": self.K, "tau1": self.tau1, "tau2": self.tau2, "theta": self.theta}
+
+    def _simulate_exact(self, T, U):
+        return simulate_delayed_lti(T, U, *self.tf_coefficients(), self.theta)
+
+
+class IntegratingModel(SystemModel):
+    """Primeira ordem com integrador e atraso: K·e^{-θs}/(s·(τs+1))."""
+    kind = "FOPDT_INT"
+
+    def tf_coefficients(self):
+        return [self.K], [self.tau, 1.0, 0.0]
+
+    def _simulate_exact(self, T, U):
+        return simulate_delayed_lti(T, U, *self.tf_coefficients(), self.theta)
+
+
+class UnderdampedModel(SystemModel):
+    """Segunda ordem subamortecida com atraso: K·ωn²·e^{-θs}/(s² + 2ζωn·s + ωn²)."""
+    kind = "SOPDT_UD"
+
+    def __init__(self, K=1.0, wn=1.0, zeta=0.5, theta=0.0, pade_order=PADE_ORDER_DEFAULT, backend=BACKEND_DEFAULT):
+        self.wn = float(wn)
+        self.zeta = float(zeta)
+        # tau = constante de tempo da envoltória, usada para horizontes de simulação
+        super().__init__(K, 1.0 / max(self.zeta * self.wn, 1e-12), theta, pade_order=pade_order, backend=backend)
+
+    def tf_coefficients(self):
+        return [self.K * self.wn ** 2], [1.0, 2.0 * self.zeta * self.wn, self.wn ** 2]
+
+    def params(self):
+        return {"model": self.kind, "k": self.K, "wn": self.wn, "zeta": self.zeta, "theta": self.theta}
+
+    def _simulate_exact(self, T, U):
+        return simulate_delayed_lti(T, U, *self.tf_coefficients(), self.theta)
+
+
+MODEL_CLASSES = {
+    SystemModel.kind: SystemModel,
+    SOPDTModel.kind: SOPDTModel,
+    IntegratingModel.kind: IntegratingModel,
+    UnderdampedModel.kind: UnderdampedModel,
+}
+
+
+def model_from_params(params, **kwargs):
+    """Cria o modelo correspondente a um dict de parâmetros (chave "model", padrão FOPDT)."""
+    kind = params.get("model", SystemModel.kind)
+    if kind == SOPDTModel.kind:
+        return SOPDTModel(params["k"], params["tau1"], params["tau2"], params["theta"], **kwargs)
+    if kind == UnderdampedModel.kind:
+        return UnderdampedModel(params["k"], params["wn"], params["zeta"], params["theta"], **kwargs)
+    if kind not in MODEL_CLASSES:
+        raise ValueError(f"modelo desconhecido: {kind!r}")
+    return MODEL_CLASSES[kind](params["k"], params["tau"], params["theta"], **kwargs)
@@ -0,0 +1,97 @@
+"""Pipeline de pré-processamento: sequência declarativa de estágios.
+
+Um pipeline é uma lista de dicts (ou JSON) com o nome do estágio e seus
+parâmetros, aplicada a (t, y, u):
+
+    [{"stage": "hampel", "window": 7, "n_sigmas": 3},
+     {"stage": "resample", "dt": 0.5},
+     {"stage": "butterworth", "cutoff": 0.05}]
+
+A saída de cada estágio fica num cache LRU indexado pelo conteúdo da
+entrada e pelos parâmetros dos estágios até ele: mudar só o último
+estágio reaproveita os anteriores. Os arrays em cache são compartilhados
+e não devem ser alterados por quem os recebe.
+"""
+
+import hashlib
+import json
+from preprocessing import stages as st
+from utils.cache import LRUCache, array_key
+from utils.profiling import profiled
+
+_cache = LRUCache("preprocessing", maxsize=32, max_bytes=256 * 2 ** 20)
+
+# nome -> função (t, y, u, **params) -> (t, y, u)
+STAGES = {
+    "hampel": lambda t, y, u, **p: (t, st.hampel(y, **p), u),
+    "median": lambda t, y, u, **p: (t, st.median(y, **p), u),
+    "detrend": lambda t, y, u, **p: (t, st.detrend(t, y, **p), u),
+    "resample": lambda t, y, u, **p: st.resample(t, y, u, **p),
+    "decimate": lambda t, y, u, **p: st.decimate(t, y, u, **p),
+    "butterworth": lambda t, y, u, **p: (t, st.butterworth(t, y, **p), u),
+    "savgol": lambda t, y, u, **p: (t, st.savgol(y, **p), u),
+}
+
+# conjuntos prontos usados pela interface e pelo modo em lote
+PRESETS = {
+    "none": [],
+    "hampel": [{"stage": "hampel"}],
+    "hampel-butter": [{"stage": "hampel"}, {"stage": "butterworth"}],
+    "savgol": [{"stage": "savgol"}],
+    "resample-hampel": [{"stage": "resample"}, {"stage": "hampel"}],
+}
+
+
+class Pipeline:
+    """Sequência de estágios (ver docstring do módulo); apply(t, y, u) -> (t, y, u)."""
+
+    def __init__(self, stages=()):
+        self.stages = []
+        for spec in stages:
+            spec = dict(spec)
+            if spec.get("stage") not in STAGES:
+                raise ValueError(f"estágio desconhecido: {spec.get('stage')!r} (use {', '.join(STAGES)})")
+            self.stages.append(spec)
+
+    def __len__(self):
+        return len(self.stages)
+
+    def spec(self):
+        """Lista de dicts serializável (JSON) que recria o pipeline."""
+        return [dict(s) for s in self.stages]
+
+    @profiled("preprocessing")
+    def apply(self, t, y, u=None, cache=True):
+        """Aplica os estágios em ordem; sem estágios devolve as entradas."""
+        if not self.stages:
+            return t, y, u
+        key = array_key(t, y, u)
+        out = (t, y, u)
+        for spec in self.stages:
+            params = {k: v for k, v in spec.items() if k != "stage"}
+            fn = STAGES[spec["stage"]]
+            if not cache:
+                out = fn(*out, **params)
+                continue
+            key = hashlib.blake2b(f"{key}|{json.dumps(spec, sort_keys=True)}".encode(), digest_size=16).hexdigest()
+            out = _cache.get_or_compute(key, lambda prev=out: fn(*prev, **params))
+        return out
+
+
+def make_pipeline(spec):
+    """Pipeline a partir de um nome de PRESETS, de uma lista de estágios ou de um Pipeline."""
+    if isinstance(spec, Pipeline):
+        return spec
+    if spec is None:
+        return Pipeline()
+    if isinstance(spec, str):
+        if spec not in PRESETS:
+            raise ValueError(f"pré-processamento desconhecido: {spec!r} (use {', '.join(PRESETS)})")
+        return Pipeline(PRESETS[spec])
+    return Pipeline(spec)
+
+
+def load_pipeline(path):
+    """Pipeline descrito num arquivo JSON (lista de estágios)."""
+    with open(path, encoding="utf-8") as f:
+        return Pipeline(json.load(f))
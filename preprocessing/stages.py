@@ -0,0 +1,143 @@
+"""Estágios de pré-processamento de sinais amostrados (arrays NumPy 1-D).
+
+Filtros (hampel, median, detrend, butterworth, savgol) atuam só em y;
+hampel e detrend aceitam `out` (ex.: out=y para operar no próprio
+array) e hampel percorre o sinal em blocos de CHUNK_SAMPLES, com
+memória limitada mesmo em registros de 1e7 amostras. Estágios de grid
+(resample, decimate) mudam t e levam u junto: u é amostrado por
+retenção de ordem zero, como a entrada aplicada à planta.
+"""
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from scipy.ndimage import median_filter as _ndi_median
+from scipy.signal import butter, sosfiltfilt, savgol_filter, decimate as _decimate
+from utils.timebase import is_uniform_grid, ResamplePlan, UNIFORM_RTOL
+
+CHUNK_SAMPLES = 1 << 18
+HAMPEL_WINDOW = 7
+HAMPEL_SIGMAS = 3.0
+MEDIAN_WINDOW = 5
+BUTTER_ORDER = 4
+BUTTER_CUTOFF = 0.1       # fração da frequência de Nyquist quando cutoff não é dado
+SAVGOL_WINDOW = 11
+SAVGOL_POLYORDER = 3
+
+
+def _as_1d(x):
+    return np.asarray(x, dtype=float).ravel()
+
+
+def sample_period(t):
+    """Período de amostragem (mediana das diferenças de t)."""
+    t = _as_1d(t)
+    return float(np.median(np.diff(t))) if t.size > 1 else 1.0
+
+
+def _require_uniform(t, stage):
+    if not is_uniform_grid(t):
+        raise ValueError(f"{stage} exige grid uniforme (aplique o estágio 'resample' antes)")
+
+
+def hampel(y, window=HAMPEL_WINDOW, n_sigmas=HAMPEL_SIGMAS, out=None, chunk=CHUNK_SAMPLES):
+    """Substitui pela mediana local os pontos a mais de n_sigmas·MAD dela.
+
+    window: janela centrada (ímpar) em amostras; bordas replicam o sinal.
+    """
+    y = _as_1d(y)
+    out = y.copy() if out is None else out
+    half = max(int(window) // 2, 1)
+    n = y.size
+    tail = None   # valores originais antes do bloco (out pode ser o próprio y)
+    for s in range(0, n, chunk):
+        e = min(s + chunk, n)
+        lo, hi = max(s - half, 0), min(e + half, n)
+        raw = y[lo:hi].copy()
+        if tail is not None:
+            raw[:s - lo] = tail
+        tail = raw[max(e - half, lo) - lo:e - lo].copy()
+        seg = np.pad(raw, (half - (s - lo), half - (hi - e)), mode="edge")
+        win = sliding_window_view(seg, 2 * half + 1)
+        med = np.median(win, axis=1)
+        mad = 1.4826 * np.median(np.abs(win - med[:, None]), axis=1)
+        x = raw[s - lo:e - lo]
+        out[s:e] = np.where(np.abs(x - med) > n_sigmas * mad, med, x)
+    return out
+
+
+def median(y, window=MEDIAN_WINDOW):
+    """Filtro de mediana centrado (bordas replicadas)."""
+    return _ndi_median(_as_1d(y), size=int(window), mode="nearest")
+
+
+def detrend(t, y, order=1, out=None):
+    """Remove o polinômio de grau `order` ajustado a y(t) (deriva lenta).
+
+    Não usar num único degrau: a própria resposta seria tratada como tendência.
+    """
+    t, y = _as_1d(t), _as_1d(y)
+    x = (t - t[0]) / max(t[-1] - t[0], 1e-12)
+    trend = np.polynomial.polynomial.polyval(x, np.polynomial.polynomial.polyfit(x, y, int(order)))
+    if out is None:
+        return y - trend
+    np.subtract(y, trend, out=out)
+    return out
+
+
+def resample(t, y, u=None, dt=None):
+    """(t, y, u) num grid uniforme de passo dt (padrão: mediana das diferenças).
+
+    y é interpolado linearmente; u por retenção de ordem zero. Grids já
+    uniformes com o mesmo passo voltam sem cópia.
+    """
+    t, y = _as_1d(t), _as_1d(y)
+    dt = sample_period(t) if dt is None else float(dt)
+    if is_uniform_grid(t) and abs(sample_period(t) - dt) <= UNIFORM_RTOL * dt:
+        return t, y, u
+    tu = t[0] + dt * np.arange(int(np.floor((t[-1] - t[0]) / dt + 1e-9)) + 1)
+    yu = ResamplePlan(t, tu).apply(y)
+    if u is not None:
+        u = ResamplePlan(t, tu, "zoh").apply(_as_1d(u))
+    return tu, yu, u
+
+
+def decimate(t, y, u=None, factor=2):
+    """Mantém 1 de cada `factor` amostras; y passa antes por um passa-baixas (fase zero)."""
+    factor = int(factor)
+    if factor <= 1:
+        return t, y, u
+    _require_uniform(t, "decimate")
+    y = _as_1d(y)
+    yd = _decimate(y, factor, ftype="iir", zero_phase=True) if y.size > 27 * factor else y[::factor]
+    return _as_1d(t)[::factor], yd, (None if u is None else _as_1d(u)[::factor])
+
+
+def butterworth(t, y, cutoff=None, order=BUTTER_ORDER):
+    """Passa-baixas Butterworth de fase zero (sosfiltfilt); cutoff em Hz."""
+    _require_uniform(t, "butterworth")
+    y = _as_1d(y)
+    fs = 1.0 / sample_period(t)
+    cutoff = BUTTER_CUTOFF * fs / 2.0 if cutoff is None else float(cutoff)
+    if not 0.0 < cutoff < fs / 2.0:
+        raise ValueError(f"cutoff deve estar entre 0 e a frequência de Nyquist ({fs / 2.0:.4g} Hz)")
+    sos = butter(int(order), cutoff, fs=fs, output="sos")
+    if y.size <= 3 * (2 * sos.shape[0] + 1):
+        return y.copy()
+    return sosfiltfilt(sos, y)
+
+
+def savgol(y, window=SAVGOL_WINDOW, polyorder=SAVGOL_POLYORDER):
+    """Savitzky-Golay; a janela é ajustada (ímpar, < len(y)) em sinais curtos."""
+    y = _as_1d(y)
+    if y.size < 5:
+        return y.copy()
+    w = int(window)
+    if w >= y.size:
+        w = y.size - 1 if (y.size - 1) % 2 == 1 else y.size - 2
+    if w % 2 == 0:
+        w += 1
+    w = max(w, 3)
+    try:
+        return savgol_filter(y, w, min(int(polyorder), w - 1))
+    except ValueError:
+        return y.copy()
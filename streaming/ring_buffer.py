@@ -0,0 +1,51 @@
+"""Buffer circular de tamanho fixo para amostras (t, u, y)."""
+
+import numpy as np
+
+
+class RingBuffer:
+    """Guarda as últimas `capacity` linhas de `width` colunas float64.
+
+    extend() custa O(k) para k amostras novas (independe do tamanho do
+    buffer); view() devolve as linhas em ordem cronológica (cópia).
+    """
+
+    def __init__(self, capacity, width=3):
+        self.capacity = int(capacity)
+        self._data = np.zeros((self.capacity, int(width)))
+        self._head = 0     # próxima posição de escrita
+        self._size = 0
+        self.total = 0     # amostras recebidas desde o início
+
+    def __len__(self):
+        return self._size
+
+    def extend(self, rows):
+        rows = np.atleast_2d(np.asarray(rows, dtype=float))
+        k = rows.shape[0]
+        if k == 0:
+            return
+        self.total += k
+        if k >= self.capacity:
+            self._data[:] = rows[-self.capacity:]
+            self._head = 0
+            self._size = self.capacity
+            return
+        end = self._head + k
+        if end <= self.capacity:
+            self._data[self._head:end] = rows
+        else:
+            first = self.capacity - self._head
+            self._data[self._head:] = rows[:first]
+            self._data[:k - first] = rows[first:]
+        self._head = end % self.capacity
+        self._size = min(self._size + k, self.capacity)
+
+    def view(self):
+        """Array (len, width) em ordem cronológica."""
+        if self._size < self.capacity:
+            return self._data[:self._size].copy()
+        return np.roll(self._data, -self._head, axis=0)
+
+    def clear(self):
+        self._head = self._size = self.total = 0
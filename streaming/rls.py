@@ -0,0 +1,100 @@
+"""Identificação FOPDT recursiva (mínimos quadrados recursivos com esquecimento).
+
+Para cada atraso candidato d (em amostras) um estimador RLS ajusta o
+modelo ARX de primeira ordem, equivalente à ZOH exata de uma FOPDT com
+atraso d·dt:
+
+    y[k] = a·y[k-1] + b·u[k-1-d] + c
+
+de onde saem K = b/(1-a), τ = -dt/ln(a) e θ = d·dt (c absorve o nível
+de repouso). Os estimadores dos D atrasos são atualizados juntos
+(vetorizados) e vale o de menor erro de predição médio (ponderado
+exponencialmente pelo mesmo fator de esquecimento).
+
+Sinais rápidos (kHz) são médios em blocos de `decimate` amostras antes
+da atualização, de forma que o banco cubra max_delay com no máximo
+MAX_DELAY_TAPS atrasos: o custo por amostra recebida é O(1) (uma soma)
+e a cada bloco O(MAX_DELAY_TAPS).
+"""
+
+import numpy as np
+
+FORGETTING = 0.999
+P0 = 1e4
+MAX_DELAY_TAPS = 64
+WARMUP = 20   # atualizações antes de publicar estimativas
+
+
+class RecursiveFOPDT:
+    """Banco de estimadores RLS sobre os atrasos 0..max_delay (segundos)."""
+
+    def __init__(self, dt, max_delay, forgetting=FORGETTING, p0=P0, max_taps=MAX_DELAY_TAPS):
+        if dt <= 0:
+            raise ValueError("dt deve ser positivo")
+        self.decimate = max(1, int(np.ceil(max_delay / dt / max(int(max_taps) - 1, 1))))
+        self.dt = float(dt) * self.decimate
+        self.n_delays = int(np.floor(max_delay / self.dt)) + 1
+        self.lam = float(forgetting)
+        D = self.n_delays
+        self.w = np.zeros((D, 3))                    # (a, b, c) por atraso
+        self.P = np.repeat(np.eye(3)[None] * float(p0), D, axis=0)
+        self.score = np.zeros(D)                     # erro quadrático médio a priori
+        self._u_hist = np.zeros(D + 1)              # u[k-1], u[k-2], ... (anel)
+        self._pos = 0
+        self._y_prev = None
+        self._acc_u = self._acc_y = 0.0
+        self._acc_n = 0
+        self.updates = 0
+
+    def push(self, u, y):
+        """Acrescenta uma amostra bruta; atualiza o banco a cada `decimate` amostras."""
+        self._acc_u += u
+        self._acc_y += y
+        self._acc_n += 1
+        if self._acc_n == self.decimate:
+            self._update(self._acc_u / self.decimate, self._acc_y / self.decimate)
+            self._acc_u = self._acc_y = 0.0
+            self._acc_n = 0
+
+    def push_block(self, u, y):
+        for ui, yi in zip(np.asarray(u, dtype=float).tolist(), np.asarray(y, dtype=float).tolist()):
+            self.push(ui, yi)
+
+    def _update(self, u, y):
+        D = self.n_delays
+        if self._y_prev is not None:
+            # u[k-1-d] para d = 0..D-1, lidos do anel (posição _pos = mais recente)
+            idx = (self._pos - np.arange(D)) % (D + 1)
+            phi = np.column_stack([np.full(D, self._y_prev), self._u_hist[idx], np.ones(D)])
+            e = y - np.einsum("dj,dj->d", phi, self.w)
+            Pphi = np.einsum("dij,dj->di", self.P, phi)
+            g = Pphi / (self.lam + np.einsum("dj,dj->d", phi, Pphi))[:, None]
+            self.w += g * e[:, None]
+            self.P -= g[:, :, None] * Pphi[:, None, :]
+            self.P /= self.lam
+            self.score = self.lam * self.score + (1.0 - self.lam) * e ** 2
+            self.updates += 1
+        self._pos = (self._pos + 1) % (D + 1)
+        self._u_hist[self._pos] = u
+        self._y_prev = y
+
+    def estimate(self):
+        """dict com k, tau, theta, delay (amostras decimadas), erro e a, b; None se indisponível."""
+        if self.updates < WARMUP:
+            return None
+        score = np.where(np.isfinite(self.score), self.score, np.inf)
+        a_all = self.w[:, 0]
+        score = np.where((a_all > 0) & (a_all < 1), score, np.inf)
+        if not np.any(np.isfinite(score)):
+            return None
+        d = int(np.argmin(score))
+        a, b, c = (float(v) for v in self.w[d])
+        return {
+            "k": b / (1.0 - a),
+            "tau": float(-self.dt / np.log(a)),
+            "theta": d * self.dt,
+            "delay": d,
+            "eqm": float(score[d]),
+            "a": a, "b": b, "offset": c / (1.0 - a),
+            "updates": self.updates,
+        }
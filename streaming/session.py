@@ -0,0 +1,61 @@
+"""Sessão de aquisição: fonte -> buffer circular -> identificação recursiva."""
+
+import numpy as np
+from streaming.ring_buffer import RingBuffer
+from streaming.rls import RecursiveFOPDT
+
+BUFFER_SAMPLES = 200_000
+MAX_DELAY = 30.0      # maior atraso considerado pelo banco RLS (s)
+DT_PROBE = 16         # amostras usadas para estimar dt de fontes sem dt fixo
+
+
+class StreamSession:
+    """Consome uma fonte e mantém os últimos BUFFER_SAMPLES pontos e a estimativa FOPDT.
+
+    poll() lê tudo o que chegou (sem bloquear) e alimenta o estimador;
+    arrays() devolve (t, u, y) do buffer para o gráfico.
+    """
+
+    def __init__(self, source, capacity=BUFFER_SAMPLES, max_delay=MAX_DELAY, dt=None):
+        self.source = source
+        self.buffer = RingBuffer(capacity, 3)
+        self.max_delay = float(max_delay)
+        self.dt = dt if dt is not None else getattr(source, "dt", None)
+        self.estimator = None
+        self._probe = []
+
+    def _start_estimator(self, rows):
+        if self.dt is None:
+            self._probe.append(rows)
+            probe = np.vstack(self._probe)
+            if probe.shape[0] < DT_PROBE:
+                return None
+            self.dt = float(np.median(np.diff(probe[:, 0])))
+            self._probe = []
+            rows = probe
+        self.estimator = RecursiveFOPDT(self.dt, self.max_delay)
+        return rows
+
+    def poll(self):
+        """Processa as amostras disponíveis; retorna quantas chegaram."""
+        rows = self.source.read()
+        n = rows.shape[0]
+        if n == 0:
+            return 0
+        self.buffer.extend(rows)
+        if self.estimator is None:
+            rows = self._start_estimator(rows)
+            if rows is None:
+                return n
+        self.estimator.push_block(rows[:, 1], rows[:, 2])
+        return n
+
+    def arrays(self):
+        data = self.buffer.view()
+        return data[:, 0], data[:, 1], data[:, 2]
+
+    def estimate(self):
+        return None if self.estimator is None else self.estimator.estimate()
+
+    def close(self):
+        self.source.close()
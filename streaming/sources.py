@@ -0,0 +1,231 @@
+"""Fontes de amostras para o modo em tempo real.
+
+Toda fonte devolve, a cada read(), um array (k, 3) com as colunas
+(t, u, y) das amostras que chegaram desde a leitura anterior (k pode ser
+zero); read() nunca bloqueia. Fontes de rede/pipe recebem texto, uma
+amostra por linha:
+
+    t,u,y        (ou "u,y": o tempo vira contagem·dt)
+
+Fontes disponíveis (open_source aceita a forma de URL):
+
+    tcp://host:porta        cliente TCP
+    udp://[host]:porta      escuta datagramas UDP
+    pipe:///caminho         pipe nomeado (FIFO) ou arquivo que cresce
+    sim://?K=1&tau=20&theta=4&dt=0.01&prbs=5   planta FOPDT simulada
+"""
+
+import os
+import socket
+import time
+from urllib.parse import urlparse, parse_qsl
+import numpy as np
+from scipy.signal import lfilter
+from models.simulation import zoh_coefficients
+
+READ_SIZE = 1 << 16
+MAX_BLOCK = 100_000   # amostras por read() no máximo (evita travar após pausas longas)
+
+
+class Source:
+    """Interface das fontes: read() -> array (k, 3) de (t, u, y), não bloqueante."""
+
+    closed = False
+
+    def read(self):
+        raise NotImplementedError
+
+    def close(self):
+        self.closed = True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class LineSource(Source):
+    """Base das fontes de texto: acumula bytes e converte as linhas completas."""
+
+    def __init__(self, dt=None):
+        self.dt = dt
+        self._pending = b""
+        self._count = 0
+
+    def _read_bytes(self):
+        """Bytes disponíveis agora (b"" se nada chegou)."""
+        raise NotImplementedError
+
+    def read(self):
+        chunk = self._read_bytes()
+        if not chunk:
+            return np.zeros((0, 3))
+        data = self._pending + chunk
+        lines, _, self._pending = data.rpartition(b"\n")
+        rows = []
+        for line in lines.split(b"\n"):
+            parts = line.replace(b";", b",").split(b",")
+            try:
+                values = [float(p) for p in parts]
+            except ValueError:
+                continue  # cabeçalho ou linha corrompida
+            if len(values) == 3:
+                rows.append(values)
+            elif len(values) == 2:
+                rows.append([self._count * (self.dt or 1.0)] + values)
+            else:
+                continue
+            self._count += 1
+        return np.array(rows, dtype=float).reshape(-1, 3)
+
+
+class TCPSource(LineSource):
+    """Cliente TCP que lê linhas "t,u,y" de um servidor de aquisição."""
+
+    def __init__(self, host, port, dt=None, timeout=5.0):
+        super().__init__(dt)
+        self.sock = socket.create_connection((host, int(port)), timeout=timeout)
+        self.sock.setblocking(False)
+
+    def _read_bytes(self):
+        out = []
+        while True:
+            try:
+                chunk = self.sock.recv(READ_SIZE)
+            except (BlockingIOError, InterruptedError):
+                break
+            if not chunk:
+                self.closed = True
+                break
+            out.append(chunk)
+        return b"".join(out)
+
+    def close(self):
+        super().close()
+        self.sock.close()
+
+
+class UDPSource(LineSource):
+    """Escuta datagramas UDP; cada datagrama traz uma ou mais linhas completas."""
+
+    def __init__(self, host, port, dt=None):
+        super().__init__(dt)
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.bind((host or "", int(port)))
+        self.sock.setblocking(False)
+
+    def _read_bytes(self):
+        out = []
+        while True:
+            try:
+                chunk, _ = self.sock.recvfrom(READ_SIZE)
+            except (BlockingIOError, InterruptedError):
+                break
+            out.append(chunk if chunk.endswith(b"\n") else chunk + b"\n")
+        return b"".join(out)
+
+    def close(self):
+        super().close()
+        self.sock.close()
+
+
+class PipeSource(LineSource):
+    """Pipe nomeado (FIFO) ou arquivo de log que cresce, lido sem bloquear (POSIX)."""
+
+    def __init__(self, path, dt=None):
+        super().__init__(dt)
+        self.fd = os.open(path, os.O_RDONLY | getattr(os, "O_NONBLOCK", 0))
+
+    def _read_bytes(self):
+        out = []
+        while True:
+            try:
+                chunk = os.read(self.fd, READ_SIZE)
+            except (BlockingIOError, InterruptedError):
+                break
+            if not chunk:
+                break  # sem escritor ou fim atual do arquivo
+            out.append(chunk)
+        return b"".join(out)
+
+    def close(self):
+        super().close()
+        os.close(self.fd)
+
+
+class SimulatedPlantSource(Source):
+    """Planta FOPDT simulada em tempo real (substitui o hardware em testes/demonstração).
+
+    Entrada: degrau de `amplitude` em `step_time` somado a uma PRBS de
+    amplitude `prbs` (trocas a cada `prbs_period` s), o que dá excitação
+    para a identificação recursiva. Saída: ZOH exata com ruído gaussiano.
+    realtime=False gera `block` amostras por leitura, sem esperar o relógio.
+    """
+
+    def __init__(self, K=1.0, tau=20.0, theta=4.0, dt=0.01, amplitude=60.0, step_time=1.0,
+                 prbs=0.0, prbs_period=5.0, noise=0.05, realtime=True, block=1000, seed=None):
+        self.dt = float(dt)
+        self.amplitude, self.step_time = float(amplitude), float(step_time)
+        self.prbs, self.prbs_period = float(prbs), float(prbs_period)
+        self.noise = float(noise)
+        self.realtime, self.block = bool(realtime), int(block)
+        self.a, self.b1, self.b2, self.d = zoh_coefficients(K, tau, theta, self.dt)
+        self._u_hist = np.zeros(self.d + 1)   # u[k-d-1 .. k-1]
+        self._x = 0.0
+        self._k = 0
+        self._rng = np.random.default_rng(None if seed is None else int(seed))
+        self._prbs_level = 1.0
+        self._prbs_next = self.step_time + self.prbs_period
+        self._t0 = time.perf_counter()
+
+    def _input(self, t):
+        u = np.where(t >= self.step_time, self.amplitude, 0.0)
+        if self.prbs:
+            levels = np.empty_like(t)
+            for i, ti in enumerate(t):
+                if ti >= self._prbs_next:
+                    self._prbs_next += self.prbs_period
+                    if self._rng.random() < 0.5:
+                        self._prbs_level = -self._prbs_level
+                levels[i] = self._prbs_level
+            u = u + np.where(t >= self.step_time, self.prbs * levels, 0.0)
+        return u
+
+    def read(self):
+        if self.realtime:
+            due = int((time.perf_counter() - self._t0) / self.dt) + 1
+            m = min(due - self._k, MAX_BLOCK)
+        else:
+            m = self.block
+        if m <= 0:
+            return np.zeros((0, 3))
+        t = (self._k + np.arange(m)) * self.dt
+        u = self._input(t)
+        # x[k+1] = a·x[k] + b1·u[k-d-1] + b2·u[k-d]; ext[i] = u[k-d-1+i]
+        ext = np.concatenate([self._u_hist, u])
+        w = self.b1 * ext[:m] + self.b2 * ext[1:m + 1]
+        xs, _ = lfilter([1.0], [1.0, -self.a], w, zi=[self.a * self._x])
+        y = np.concatenate([[self._x], xs[:-1]])
+        self._x = float(xs[-1])
+        self._u_hist = ext[-(self.d + 1):]
+        self._k += m
+        if self.noise:
+            y = y + self._rng.normal(0.0, self.noise, m)
+        return np.column_stack([t, u, y])
+
+
+def open_source(url):
+    """Cria a fonte descrita por `url` (ver docstring do módulo)."""
+    parsed = urlparse(url)
+    query = {k: float(v) for k, v in parse_qsl(parsed.query)}
+    dt = query.pop("dt", None)
+    if parsed.scheme == "tcp":
+        return TCPSource(parsed.hostname, parsed.port, dt=dt)
+    if parsed.scheme == "udp":
+        return UDPSource(parsed.hostname, parsed.port, dt=dt)
+    if parsed.scheme == "pipe":
+        return PipeSource(parsed.path, dt=dt)
+    if parsed.scheme == "sim":
+        return SimulatedPlantSource(dt=dt or 0.01, **query)
+    raise ValueError(f"fonte desconhecida: {url!r} (use tcp://, udp://, pipe:// ou sim://)")
@@ -0,0 +1,6 @@
+"""Os pacotes do projeto ficam na raiz do repositório (sem instalação)."""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,29 @@
+"""Margens com atraso exato contra python-control (atraso por Padé de ordem alta)."""
+
+import pytest
+from analysis.frequency import loop_analysis
+from models.closed_loop import DERIVATIVE_FILTER_N
+from tuning.tuning_methods import itae_from_params
+
+ctrl = pytest.importorskip("control")
+
+PADE_ORDER = 20
+
+
+@pytest.mark.parametrize("plant", [(1.0, 20.0, 4.0), (2.5, 8.0, 6.0), (0.7, 50.0, 2.0)])
+def test_margins_match_pade_reference(plant):
+    K, tau, theta = plant
+    kp, ti, td = itae_from_params(K, tau, theta)
+    ours = loop_analysis(K, tau, theta, (kp, ti, td))   # grid padrão, o mesmo da interface
+
+    N = DERIVATIVE_FILTER_N
+    s = ctrl.tf("s")
+    pid = kp * (1 + 1 / (ti * s) + td * s / (td / N * s + 1))
+    num, den = ctrl.pade(theta, PADE_ORDER)
+    L = pid * K / (tau * s + 1) * ctrl.tf(num, den)
+    gm, pm, _, wpc, wgc, _ = ctrl.stability_margins(L)
+
+    assert ours["gm"] == pytest.approx(gm, rel=1e-3)
+    assert ours["pm"] == pytest.approx(pm, rel=1e-3)
+    assert ours["wgc"] == pytest.approx(wgc, rel=1e-3)
+    assert ours["wpc"] == pytest.approx(wpc, rel=1e-3)
@@ -0,0 +1,59 @@
+"""Identificação FOPDT em registros que não partem do repouso."""
+
+import numpy as np
+import pytest
+from identification.least_squares import least_squares_identification
+from identification import ranking, higher_order
+from models.simulation import simulate_fopdt
+
+K, TAU, THETA = 2.0, 20.0, 4.0
+
+
+def test_least_squares_step_from_operating_point():
+    # y = 25 + 2·e^{-4s}/(20s+1)·10: degrau de 10 a partir de y = 25
+    t = np.arange(0.0, 200.0, 0.5)
+    _, y = simulate_fopdt(t, np.full(t.shape, 10.0), K, TAU, THETA)
+    params, _, y_model = least_squares_identification(t, y + 25.0, amplitude=10.0)
+    assert params["k"] == pytest.approx(K, rel=1e-3)
+    assert params["tau"] == pytest.approx(TAU, rel=1e-3)
+    assert params["theta"] == pytest.approx(THETA, abs=1e-2)
+    assert params["y0"] == pytest.approx(25.0, abs=1e-3)
+    assert np.max(np.abs(y_model - (y + 25.0))) < 1e-3
+
+
+def test_least_squares_arbitrary_input_from_equilibrium():
+    t = np.arange(0.0, 400.0, 0.5)
+    u = 50.0 + np.cumsum(np.random.default_rng(0).normal(0.0, 1.0, t.size))
+    _, y = simulate_fopdt(t, u, K, TAU, 5.0, u_init=u[0])
+    params, _, _ = least_squares_identification(t, y, u=u)
+    assert params["k"] == pytest.approx(K, rel=1e-3)
+    assert params["tau"] == pytest.approx(TAU, rel=1e-3)
+    assert params["theta"] == pytest.approx(5.0, abs=1e-2)
+
+
+def test_least_squares_multi_step_from_equilibrium():
+    # u 50 -> 60 -> 45 a partir do equilíbrio y = K·50 (caminho analítico por partes)
+    t = np.arange(0.0, 400.0, 0.5)
+    u = np.where(t < 100.0, 50.0, np.where(t < 250.0, 60.0, 45.0))
+    _, y = simulate_fopdt(t, u, K, TAU, 5.0, u_init=50.0)
+    params, _, y_model = least_squares_identification(t, y, u=u)
+    assert params["k"] == pytest.approx(K, rel=1e-3)
+    assert params["tau"] == pytest.approx(TAU, rel=1e-3)
+    assert params["theta"] == pytest.approx(5.0, abs=1e-2)
+    assert params["y0"] == pytest.approx(K * 50.0, rel=1e-4)
+    assert params["eqm"] < 1e-6
+
+
+def test_ranking_fits_fopdt_once_and_handles_offset(monkeypatch):
+    t = np.arange(0.0, 200.0, 0.5)
+    _, y = simulate_fopdt(t, np.full(t.shape, 10.0), K, TAU, THETA)
+    calls = []
+    fit = ranking.least_squares_identification
+    counted = lambda *a, **kw: calls.append(1) or fit(*a, **kw)
+    monkeypatch.setattr(ranking, "least_squares_identification", counted)
+    monkeypatch.setattr(higher_order, "least_squares_identification", counted)
+    params, _, _ = ranking.best_model_identification(t, y + 25.0, amplitude=10.0, workers=1)
+    assert len(calls) == 1
+    assert params["model"] == "FOPDT"
+    assert params["k"] == pytest.approx(K, rel=1e-3)
+    assert params["tau"] == pytest.approx(TAU, rel=1e-3)
@@ -0,0 +1,83 @@
+"""Leitura de .mat com variáveis selecionadas, janelas de tempo e blocos."""
+
+import numpy as np
+import pytest
+import scipy.io
+
+from Filtragem_dados import MatFile, load_mat
+
+N = 200
+DT = 0.5
+
+
+def _signals():
+    t = np.arange(N) * DT
+    y = np.sin(t / 7.0)
+    u = np.where(t >= 10.0, 2.0, 0.0)
+    return t, y, u
+
+
+@pytest.fixture
+def v5_file(tmp_path):
+    t, y, u = _signals()
+    path = tmp_path / "v5.mat"
+    # float32 de propósito: load_mat precisa devolver float64
+    scipy.io.savemat(path, {
+        "tiempo": t[None, :].astype(np.float32),
+        "salida": y[None, :].astype(np.float32),
+        "entrada": u[None, :].astype(np.float32),
+        "dados_saida": np.column_stack([y, 2 * y]).astype(np.float32),
+    })
+    return str(path)
+
+
+@pytest.fixture
+def v73_file(tmp_path):
+    h5py = pytest.importorskip("h5py")
+    t, y, u = _signals()
+    path = tmp_path / "v73.mat"
+    # HDF5 guarda os arrays transpostos em relação ao MATLAB
+    with h5py.File(path, "w") as f:
+        f["tiempo"] = t[:, None].astype(np.float32)
+        f["salida"] = y[:, None].astype(np.float32)
+        f["entrada"] = u[:, None].astype(np.float32)
+        f["dados_saida"] = np.vstack([y, 2 * y]).astype(np.float32)
+    return str(path)
+
+
+@pytest.mark.parametrize("fixture", ["v5_file", "v73_file"])
+def test_load_mat_variables_and_window(fixture, request):
+    path = request.getfixturevalue(fixture)
+    t, y, _ = _signals()
+    data = load_mat(path, variables=["tiempo", "salida", "dados_saida"], t_window=(20.0, 40.0))
+    assert set(data) == {"tiempo", "salida", "dados_saida"}
+    sel = (t >= 20.0) & (t <= 40.0)
+    for arr, ref in ((data["tiempo"], t[sel]), (data["salida"], y[sel]),
+                     (data["dados_saida"]["y"], y[sel]), (data["dados_saida"]["col2"], 2 * y[sel])):
+        assert arr.dtype == np.float64 and arr.flags["C_CONTIGUOUS"]
+        np.testing.assert_allclose(arr, ref.astype(np.float32), rtol=0, atol=0)
+
+
+@pytest.mark.parametrize("fixture", ["v5_file", "v73_file"])
+def test_iter_chunks_rebuilds_signal(fixture, request):
+    path = request.getfixturevalue(fixture)
+    _, y, _ = _signals()
+    with MatFile(path) as mat:
+        blocks = list(mat.iter_chunks("salida", chunk=64))
+        cols = list(mat.iter_chunks("dados_saida", chunk=64))
+    assert [b.shape[1] for b in blocks] == [64, 64, 64, 8]
+    np.testing.assert_array_equal(np.concatenate(blocks, axis=1).ravel(), y.astype(np.float32))
+    np.testing.assert_array_equal(np.concatenate(cols, axis=0)[:, 1], (2 * y).astype(np.float32))
+
+
+def test_window_from_config_dt(tmp_path):
+    _, y, _ = _signals()
+    path = str(tmp_path / "cfg.mat")
+    scipy.io.savemat(path, {
+        "configuracion_experimento": {"tiempo_total": N * DT, "dt": DT, "degrau_tiempo": 10.0,
+                                      "descripcion": "teste"},
+        "dados_saida": np.column_stack([y, y]),
+    })
+    data = load_mat(path, t_window=(5.0, 9.0))
+    np.testing.assert_allclose(data["tiempo"], np.arange(10, 19) * DT)
+    np.testing.assert_array_equal(data["dados_saida"]["y"], y[10:19])
@@ -0,0 +1,49 @@
+"""Kernel de métricas da resposta ao degrau (utils.metrics.step_metrics)."""
+
+import numpy as np
+import pytest
+
+from tuning.optimization import pid_cost
+from utils.metrics import METRIC_KEYS, step_metrics
+
+TAU = 10.0
+T = np.linspace(0.0, 100.0, 4001)
+
+
+def _first_order(tau=TAU, gain=1.0):
+    return gain * (1.0 - np.exp(-T / tau))
+
+
+def test_first_order_matches_analytic():
+    m = step_metrics(T, _first_order(), sp=1.0)
+    dt = T[1] - T[0]
+    decay = np.exp(-T[-1] / TAU)
+    assert m["tr"] == pytest.approx(TAU * np.log(9.0), rel=1e-4)
+    # ts: primeira amostra depois da última saída da faixa de 2 %
+    assert TAU * np.log(50.0) <= m["ts"] <= TAU * np.log(50.0) + dt
+    assert m["mp"] == pytest.approx(-decay, abs=1e-9)
+    assert m["ess"] == pytest.approx(0.0, abs=1e-3)
+    assert m["iae"] == pytest.approx(TAU * (1.0 - decay), rel=1e-4)
+    assert m["ise"] == pytest.approx(TAU / 2.0 * (1.0 - decay ** 2), rel=1e-4)
+    assert m["itae"] == pytest.approx(TAU ** 2 * (1.0 - decay * (1.0 + T[-1] / TAU)), rel=1e-4)
+
+
+def test_batch_matches_row_by_row():
+    wn, zeta = 0.3, 0.3
+    wd = wn * np.sqrt(1.0 - zeta ** 2)
+    underdamped = 1.0 - np.exp(-zeta * wn * T) * (np.cos(wd * T) + zeta * wn / wd * np.sin(wd * T))
+    Y = np.vstack([_first_order(), _first_order(tau=3.0, gain=0.5), underdamped, np.zeros_like(T)])
+    for sp in (None, 1.0):
+        batch = step_metrics(T, Y, sp=sp)
+        for i, y in enumerate(Y):
+            row = step_metrics(T, y, sp=sp)
+            for key in METRIC_KEYS:
+                np.testing.assert_allclose(batch[key][i], row[key], rtol=1e-12, equal_nan=True, err_msg=key)
+
+
+def test_pid_cost_uses_kernel_integrals():
+    y = _first_order()
+    m = step_metrics(T, 3.0 * y, sp=3.0)
+    assert pid_cost(T, 3.0 * y, sp=3.0, criterion="IAE") == pytest.approx(m["iae"] / 3.0)
+    assert pid_cost(T, 3.0 * y, sp=3.0, criterion="ISE") == pytest.approx(m["ise"] / 9.0)
+    assert pid_cost(T, 3.0 * y, sp=3.0, criterion="ITAE") == pytest.approx(m["itae"] / 3.0)
@@ -0,0 +1,29 @@
+"""Blocos em pool de processos (utils.parallel)."""
+
+import pytest
+
+from utils.parallel import map_chunks
+
+
+def _scaled_sum(chunk, factor):
+    return factor * sum(chunk)
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_map_chunks_keeps_order_and_reports_progress(workers):
+    chunks = [[i, i + 1] for i in range(6)]
+    seen = []
+    parts = map_chunks(_scaled_sum, chunks, (10,), workers=workers, progress=seen.append)
+    assert parts == [10 * (2 * i + 1) for i in range(6)]
+    assert seen == [pytest.approx((i + 1) / 6) for i in range(6)]
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_map_chunks_returns_none_when_cancelled(workers):
+    calls = []
+
+    def cancelled():
+        calls.append(None)
+        return len(calls) > 2
+
+    assert map_chunks(_scaled_sum, [[1]] * 5, (1,), workers=workers, cancelled=cancelled) is None
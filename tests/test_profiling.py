@@ -0,0 +1,35 @@
+"""Medição de memória com blocos concorrentes (pico do tracemalloc é global)."""
+
+import threading
+import numpy as np
+from utils import profiling
+
+
+def test_memory_not_reported_for_overlapping_threads():
+    profiling.reset()
+    profiling.enable(memory=True)
+    try:
+        with profiling.profile_block("alone"):
+            np.ones(1 << 20)
+        inside, release = threading.Event(), threading.Event()
+
+        def other():
+            with profiling.profile_block("other"):
+                inside.set()
+                release.wait(5)
+
+        th = threading.Thread(target=other)
+        th.start()
+        inside.wait(5)
+        with profiling.profile_block("overlapped"):
+            np.ones(1 << 20)
+        release.set()
+        th.join()
+        stats = profiling.stats()
+    finally:
+        profiling.disable()
+        profiling.reset()
+    assert stats["alone"]["max_bytes"] >= 8 << 20
+    assert stats["overlapped"]["max_bytes"] == 0
+    assert stats["other"]["max_bytes"] == 0
+    assert stats["overlapped"]["calls"] == 1
@@ -0,0 +1,82 @@
+"""Escalonamento de ganhos (tuning.scheduling)."""
+
+import numpy as np
+import pytest
+
+from tuning.optimization import CRITERIA
+from tuning.scheduling import (SCHEDULE_DTYPE, SCHEDULE_FIELDS, GainSchedule, design_schedule, load_schedule,
+                               points_from_segments)
+
+# métodos oferecidos na interface: CHR, ITAE e "Otimizado" com cada critério
+GUI_METHODS = ["CHR", "ITAE"] + [f"{c}-OPT" for c in CRITERIA]
+POINTS = [{"op": 50.0, "k": 1.0, "tau": 20.0, "theta": 4.0, "u": 50.0},
+          {"op": 80.0, "k": 2.0, "tau": 10.0, "theta": 2.0, "u": 65.0}]
+
+
+def _schedule():
+    table = np.array([(10.0, 1.0, 20.0, 4.0, 3.0, 20.0, 2.0),
+                      (30.0, 2.0, 10.0, 2.0, 1.0, 10.0, 1.0),
+                      (20.0, 1.5, 15.0, 3.0, 2.0, 16.0, 1.5)], dtype=SCHEDULE_DTYPE)
+    return GainSchedule(table, method="ITAE", u0=5.0)
+
+
+@pytest.mark.parametrize("method", GUI_METHODS)
+def test_design_schedule_accepts_every_gui_method(method):
+    sched = design_schedule(POINTS, method=method, workers=1)
+    assert len(sched) == 2 and sched.method == method
+    gains = sched.table[["kp", "ti", "td"]].tolist()
+    assert np.all(np.isfinite(gains)) and np.all(sched.table["kp"] > 0)
+    assert sched.u_eq[0] == pytest.approx(50.0)
+
+
+def test_lookup_interpolates_and_clamps():
+    sched = _schedule()
+    np.testing.assert_array_equal(sched.op, [10.0, 20.0, 30.0])
+    assert sched.gains(15.0) == pytest.approx((2.5, 18.0, 1.75))
+    assert sched.gains(25.0) == pytest.approx((1.5, 13.0, 1.25))
+    assert sched.gains(0.0) == pytest.approx((3.0, 20.0, 2.0))
+    assert sched.gains(99.0) == pytest.approx((1.0, 10.0, 1.0))
+    x = np.array([[12.0, 20.0], [27.5, 31.0]])
+    G = sched.lookup(x)
+    assert G.shape == (2, 2, 3)
+    for idx in np.ndindex(x.shape):
+        assert G[idx] == pytest.approx(sched.gains(x[idx]))
+        # consulta escalar do laço de simulação: mesma interpolação
+        assert sched._row(x[idx])[3:6] == pytest.approx(sched.gains(x[idx]))
+
+
+@pytest.mark.parametrize("ext", [".csv", ".json"])
+def test_save_load_round_trip(tmp_path, ext):
+    sched = _schedule()
+    path = str(tmp_path / f"tabela{ext}")
+    sched.save(path)
+    loaded = load_schedule(path)
+    for name in SCHEDULE_FIELDS:
+        np.testing.assert_allclose(loaded.table[name], sched.table[name], rtol=1e-15)
+    if ext == ".json":
+        assert loaded.method == "ITAE"
+        np.testing.assert_allclose(loaded.u_eq, sched.u_eq)
+    dense = str(tmp_path / f"densa{ext}")
+    sched.save(dense, points=5)
+    np.testing.assert_allclose(load_schedule(dense).op, [10.0, 15.0, 20.0, 25.0, 30.0])
+    assert load_schedule(dense).gains(15.0) == pytest.approx(sched.gains(15.0))
+
+
+def test_save_rejects_unknown_format(tmp_path):
+    with pytest.raises(ValueError):
+        _schedule().save(str(tmp_path / "tabela.txt"))
+
+
+def test_points_from_segments_merges_levels_and_skips_failures():
+    seg = lambda y0, u0, du, k, tau, theta, error=None: {
+        "y0": y0, "u0": u0, "du": du, "k": k, "tau": tau, "theta": theta, "error": error}
+    segments = [
+        seg(100.0, 50.0, 10.0, 2.0, 20.0, 5.0),     # op = 120
+        seg(120.0, 60.0, -15.0, 2.0, 18.0, 4.0),    # op = 90
+        seg(90.0, 45.0, 15.0, 2.0, 22.0, 6.0),      # op = 120 de novo: combinado pela mediana
+        seg(90.0, 45.0, 5.0, np.nan, np.nan, np.nan, error="falhou"),
+    ]
+    pts = points_from_segments(segments)
+    assert [p["op"] for p in pts] == pytest.approx([90.0, 120.0])
+    assert pts[0] == pytest.approx({"op": 90.0, "k": 2.0, "tau": 18.0, "theta": 4.0, "u": 45.0})
+    assert pts[1] == pytest.approx({"op": 120.0, "k": 2.0, "tau": 21.0, "theta": 5.5, "u": 60.0})
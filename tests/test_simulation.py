@@ -0,0 +1,64 @@
+"""Simulação FOPDT exata (ZOH com atraso), passo variável e superposição analítica."""
+
+import numpy as np
+import pytest
+from scipy.signal import lsim, tf2ss
+from models.simulation import simulate_fopdt
+from models.analytic import fopdt_response, fopdt_piecewise, change_points
+
+K, TAU, THETA = 1.5, 20.0, 4.3
+H = 0.01   # grid fino de referência (θ é múltiplo de H)
+
+
+def _reference(T, U, u_init=0.0):
+    """lsim com ZOH num grid fino: entrada U mantida entre os instantes T e atrasada de θ."""
+    tf = np.arange(0.0, T[-1] + H / 2, H)
+    idx = np.searchsorted(T, tf + 1e-9, side="right") - 1
+    uf = np.where(idx >= 0, U[np.maximum(idx, 0)], u_init)
+    d = int(round(THETA / H))
+    ud = np.r_[np.full(d, u_init), uf[:uf.size - d]]
+    A, B, C, D = tf2ss([K], [TAU, 1.0])
+    _, yf, _ = lsim((A, B, C, D), ud, tf, X0=[K * u_init / C[0, 0]], interp=False)   # parte de y = K·u_init
+    return np.interp(T, tf, yf)
+
+
+def _irregular_grid(n=400, seed=0):
+    rng = np.random.default_rng(seed)
+    return np.r_[0.0, np.sort(rng.choice(np.arange(1, 30000), n - 1, replace=False)) * H]
+
+
+def test_uniform_grid_matches_fine_reference():
+    T = np.arange(0.0, 200.0, 0.5)
+    U = np.where(T < 60.0, 1.0, np.where(T < 130.0, -0.5, 2.0))
+    _, y = simulate_fopdt(T, U, K, TAU, THETA)
+    assert np.max(np.abs(y - _reference(T, U))) < 1e-9
+
+
+def test_irregular_grid_matches_fine_reference():
+    T = _irregular_grid()
+    U = np.random.default_rng(1).normal(0.0, 1.0, T.size)
+    _, y = simulate_fopdt(T, U, K, TAU, THETA, u_init=0.3)
+    assert np.max(np.abs(y - _reference(T, U, u_init=0.3))) < 1e-9
+
+
+@pytest.mark.parametrize("irregular", [False, True])
+def test_analytic_superposition_matches_simulator(irregular):
+    T = _irregular_grid() if irregular else np.arange(0.0, 300.0, 0.5)
+    U = np.where(T < 50.0, 2.0, np.where(T < 120.0, 5.0, np.where(T < 200.0, 1.0, 3.0)))
+    y = fopdt_response(T, U, K, TAU, THETA, u_init=2.0)
+    assert y is not None
+    _, y_sim = simulate_fopdt(T, U, K, TAU, THETA, u_init=2.0)
+    assert np.max(np.abs(y - y_sim)) < 1e-10
+
+
+def test_analytic_jacobian_matches_finite_differences():
+    T = np.arange(0.0, 300.0, 0.5)
+    U = np.where(T < 50.0, 0.0, np.where(T < 120.0, 1.0, -0.5))
+    idx, du = change_points(U)
+    times = T[idx]
+    p = np.array([K, TAU, THETA])
+    _, J = fopdt_piecewise(T, times, du, *p, jacobian=True)
+    for j in range(3):
+        e = np.zeros(3); e[j] = 1e-6 * max(abs(p[j]), 1.0)
+        fd = (fopdt_piecewise(T, times, du, *(p + e)) - fopdt_piecewise(T, times, du, *(p - e))) / (2 * e[j])
+        assert np.max(np.abs(J[:, j] - fd)) < 1e-5 * max(np.max(np.abs(fd)), 1.0)
@@ -0,0 +1,10 @@
+"""Chaves do armazenamento persistente."""
+
+from utils import store
+
+
+def test_key_changes_with_kind_version(monkeypatch):
+    key = store.make_key("identification", "digest", method="Smith")
+    monkeypatch.setitem(store.KIND_VERSIONS, "identification", store.KIND_VERSIONS["identification"] + 1)
+    assert store.make_key("identification", "digest", method="Smith") != key
+    assert store.make_key("tune", "digest") == store.make_key("tune", "digest")
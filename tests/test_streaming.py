@@ -0,0 +1,63 @@
+"""Modo ao vivo: buffer circular e identificação recursiva."""
+
+import numpy as np
+import pytest
+
+from streaming.ring_buffer import RingBuffer
+from streaming.rls import RecursiveFOPDT
+from streaming.sources import open_source
+
+SIM = "sim://?K=2&tau=10&theta=3&prbs=5&prbs_period=3&realtime=0&seed=1&block=2000"
+
+
+def _rows(start, n):
+    i = np.arange(start, start + n, dtype=float)
+    return np.column_stack([i, 10 * i, 100 * i])
+
+
+def test_ring_buffer_wraps_in_chronological_order():
+    buf = RingBuffer(5)
+    buf.extend(_rows(0, 3))
+    np.testing.assert_array_equal(buf.view(), _rows(0, 3))
+    buf.extend(_rows(3, 4))          # passa do fim do array e volta ao início
+    np.testing.assert_array_equal(buf.view(), _rows(2, 5))
+    buf.extend(_rows(7, 1))
+    np.testing.assert_array_equal(buf.view(), _rows(3, 5))
+    assert len(buf) == 5 and buf.total == 8
+
+
+@pytest.mark.parametrize("k", [5, 12])
+def test_ring_buffer_overflow_keeps_newest(k):
+    buf = RingBuffer(5)
+    buf.extend(_rows(0, 2))
+    buf.extend(_rows(2, k))          # k >= capacity: sobrescreve tudo
+    np.testing.assert_array_equal(buf.view(), _rows(2 + k - 5, 5))
+    buf.extend(_rows(2 + k, 2))
+    np.testing.assert_array_equal(buf.view(), _rows(k - 1, 5))
+    assert buf.total == k + 4
+
+
+def test_rls_recovers_noise_free_plant_exactly():
+    src = open_source(SIM + "&dt=0.1&noise=0")
+    est = RecursiveFOPDT(0.1, max_delay=6.0)
+    assert est.decimate == 1
+    block = src.read()
+    est.push_block(block[:, 1], block[:, 2])
+    m = est.estimate()
+    assert m["k"] == pytest.approx(2.0, rel=1e-6)
+    assert m["tau"] == pytest.approx(10.0, rel=1e-6)
+    assert m["theta"] == pytest.approx(3.0)
+
+
+def test_rls_converges_on_noisy_decimated_stream():
+    src = open_source(SIM + "&dt=0.05&noise=0.01")
+    est = RecursiveFOPDT(0.05, max_delay=8.0)
+    assert est.decimate > 1
+    assert est.estimate() is None
+    for _ in range(3):
+        block = src.read()
+        est.push_block(block[:, 1], block[:, 2])
+    m = est.estimate()
+    assert m["k"] == pytest.approx(2.0, rel=0.05)
+    assert m["tau"] == pytest.approx(10.0, rel=0.1)
+    assert abs(m["theta"] - 3.0) <= est.dt
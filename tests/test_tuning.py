@@ -0,0 +1,22 @@
+"""Sintonia PID: métodos aceitos por tune()."""
+
+import numpy as np
+import pytest
+
+from tuning.optimization import CRITERIA, TUNING_METHODS, tune
+
+
+def test_every_criterion_is_a_tuning_method():
+    assert {f"{c}-OPT" for c in CRITERIA} <= set(TUNING_METHODS)
+
+
+@pytest.mark.parametrize("method", TUNING_METHODS)
+def test_tune_accepts_every_method(method):
+    gains = tune(method, 1.0, 20.0, 4.0)
+    assert len(gains) == 3
+    assert np.all(np.isfinite(gains)) and gains[0] > 0 and gains[1] > 0
+
+
+def test_tune_rejects_unknown_method():
+    with pytest.raises(ValueError):
+        tune("XYZ-OPT", 1.0, 20.0, 4.0)
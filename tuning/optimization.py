@@ -0,0 +1,157 @@
+"""Sintonia PID ótima por minimização numérica sobre o modelo FOPDT identificado.
+
+Em vez das correlações fechadas (CHR/ITAE), minimiza diretamente um critério
+de desempenho da resposta ao degrau em malha fechada simulada com o laço
+discreto exato (models.closed_loop):
+
+- "ITAE": integral de t·|e|
+- "IAE":  integral de |e|
+- "ISE":  integral de e²
+- "MP_TS": custo ponderado de sobressinal e tempo de acomodação
+
+O ponto inicial vem das fórmulas CHR/ITAE, refinado por uma nuvem de
+candidatos avaliada em lote e depois por Nelder-Mead em escala logarítmica.
+"""
+
+import time
+import numpy as np
+from scipy.optimize import minimize
+from models.closed_loop import simulate_pid_loop, simulate_pid_loop_batch
+from tuning.tuning_methods import chr_from_params, itae_from_params
+from utils.metrics import step_metrics
+from utils.profiling import profiled
+
+CRITERIA = ("ITAE", "IAE", "ISE", "MP_TS")
+# métodos aceitos por tune(): correlações fechadas ou "<critério>-OPT"
+TUNING_METHODS = ("CHR", "ITAE") + tuple(f"{c}-OPT" for c in CRITERIA)
+HORIZON_FACTOR = 10.0
+DEFAULT_POINTS = 400
+MAX_EVALS = 400
+MP_TS_WEIGHTS = (1.0, 1.0)  # (peso do sobressinal, peso de ts/horizonte)
+PENALTY = 1e12
+# multiplicadores da nuvem inicial em torno do melhor ponto de partida
+CLOUD_FACTORS = (0.5, 1.0, 2.0)
+
+
+def default_time_grid(tau, theta, points=DEFAULT_POINTS):
+    """Grid de simulação cobrindo ~10·(τ+θ), suficiente para acomodar a malha."""
+    t_end = HORIZON_FACTOR * (float(tau) + float(theta))
+    return np.linspace(0.0, t_end, int(points))
+
+
+def pid_cost(t, y, sp=1.0, criterion="ITAE", weights=MP_TS_WEIGHTS):
+    """Custo de uma resposta (N,) ou de várias respostas (M, N) ao degrau sp.
+
+    As integrais vêm de utils.metrics.step_metrics (as mesmas exibidas na
+    interface, na varredura e no lote), normalizadas por |sp| para que o
+    custo não dependa da amplitude. Respostas não finitas (malha instável)
+    recebem PENALTY.
+    """
+    if criterion not in CRITERIA:
+        raise ValueError(f"critério inválido: {criterion!r} (use um de {CRITERIA})")
+    t = np.asarray(t, dtype=float).ravel()
+    y = np.asarray(y, dtype=float)
+    scale = abs(float(sp)) if abs(float(sp)) > 1e-12 else 1.0
+    with np.errstate(over="ignore", invalid="ignore"):
+        m = step_metrics(t, y, sp=sp)
+        if criterion == "MP_TS":
+            w_mp, w_ts = weights
+            horizon = max(t[-1] - t[0], 1e-12)
+            mp = np.nan_to_num(np.maximum(m["mp"], 0.0), nan=0.0)
+            ts = np.where(np.isfinite(m["ts"]), m["ts"] - t[0], horizon)
+            finite = np.all(np.isfinite(y), axis=-1)
+            # IAE com peso pequeno desempata candidatos com mesmo Mp/ts
+            cost = w_mp * mp + w_ts * ts / horizon + 1e-3 * m["iae"] / (scale * horizon)
+            cost = np.where(finite, cost, np.inf)
+        else:
+            # integrais de e/|sp|: |e| escala com |sp| e e² com sp²
+            cost = m[criterion.lower()] / (scale ** 2 if criterion == "ISE" else scale)
+    return np.where(np.isfinite(cost), cost, PENALTY)
+
+
+def _start_points(k, tau, theta):
+    starts = {}
+    for name, fn in (("CHR", chr_from_params), ("ITAE", itae_from_params)):
+        try:
+            g = np.asarray(fn(k, tau, theta), dtype=float)
+        except Exception:
+            continue
+        if np.all(np.isfinite(g)) and g[0] > 0 and g[1] > 0:
+            starts[name] = g
+    if not starts:
+        # atraso nulo/ganho degenerado: ponto neutro baseado apenas em τ
+        starts["default"] = np.array([1.0 / max(abs(float(k)), 1e-6), max(float(tau), 1e-3), 0.0])
+    return starts
+
+
+@profiled("optimize_pid")
+def optimize_pid(k, tau, theta, criterion="ITAE", T=None, sp=1.0, max_evals=MAX_EVALS,
+                 u_min=None, u_max=None, weights=MP_TS_WEIGHTS):
+    """Busca (Kp, Ti, Td) que minimizam `criterion` para a planta (k, τ, θ).
+
+    Retorna ((kp, ti, td), info) onde info traz custo final, ponto de partida,
+    número de avaliações, avaliações por segundo e tempo total.
+    """
+    if criterion not in CRITERIA:
+        raise ValueError(f"critério inválido: {criterion!r} (use um de {CRITERIA})")
+    T = default_time_grid(tau, theta) if T is None else np.asarray(T, dtype=float).ravel()
+    t_start = time.perf_counter()
+    evals = 0
+
+    # 1) pontos de partida CHR/ITAE + nuvem multiplicativa avaliados em lote
+    starts = _start_points(k, tau, theta)
+    base = np.array(list(starts.values()))
+    f = np.array(CLOUD_FACTORS)
+    cloud = np.array([[kp * a, ti * b, td * c]
+                      for kp, ti, td in base for a in f for b in f for c in f])
+    candidates = np.vstack([base, cloud])
+    _, Y = simulate_pid_loop_batch(T, sp, k, tau, theta, candidates, u_min=u_min, u_max=u_max)
+    costs = pid_cost(T, Y, sp=sp, criterion=criterion, weights=weights)
+    evals += len(candidates)
+    best = candidates[int(np.argmin(costs))]
+    start_name = list(starts)[int(np.argmin(costs[:len(base)]))]
+
+    # 2) refinamento local em log(Kp), log(Ti), log(Td)
+    td_floor = 1e-6 * max(float(tau), 1e-6)
+
+    def unpack(z):
+        return np.exp(z[0]), np.exp(z[1]), np.exp(z[2]) - td_floor
+
+    def objective(z):
+        nonlocal evals
+        evals += 1
+        kp, ti, td = unpack(z)
+        _, y = simulate_pid_loop(T, sp, k, tau, theta, kp, ti, max(td, 0.0), u_min=u_min, u_max=u_max)
+        return float(pid_cost(T, y, sp=sp, criterion=criterion, weights=weights))
+
+    z0 = np.log([best[0], best[1], max(best[2], 0.0) + td_floor])
+    # tolerância relativa ao melhor custo inicial (critérios têm escalas diferentes)
+    fatol = 1e-4 * max(float(np.min(costs)), 1e-12)
+    res = minimize(objective, z0, method="Nelder-Mead",
+                   options={"maxfev": int(max_evals), "xatol": 1e-3, "fatol": fatol})
+    kp, ti, td = unpack(res.x)
+    gains = (float(kp), float(ti), float(max(td, 0.0)))
+
+    elapsed = time.perf_counter() - t_start
+    info = {
+        "criterion": criterion,
+        "cost": float(res.fun),
+        "start": start_name,
+        "evals": int(evals),
+        "elapsed": float(elapsed),
+        "evals_per_s": float(evals / elapsed) if elapsed > 0 else float("inf"),
+        "success": bool(res.success),
+    }
+    return gains, info
+
+
+def tune(method, k, tau, theta, T=None):
+    """(Kp, Ti, Td) pelo método CHR, ITAE ou '<critério>-OPT' (otimizado)."""
+    if method == "CHR":
+        return chr_from_params(k, tau, theta)
+    if method == "ITAE":
+        return itae_from_params(k, tau, theta)
+    if method in TUNING_METHODS:
+        gains, _ = optimize_pid(k, tau, theta, criterion=method[:-4], T=T)
+        return gains
+    raise ValueError(f"método de sintonia inválido: {method!r} (use um de {TUNING_METHODS})")
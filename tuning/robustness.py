@@ -0,0 +1,147 @@
+"""Análise de robustez (Monte Carlo) de uma sintonia PID sob incerteza da planta.
+
+Sorteia milhares de plantas (K, τ, θ) em torno do modelo identificado,
+simula todas as malhas fechadas com os mesmos ganhos no simulador
+vetorizado (models.closed_loop), cada bloco de plantas num processo, e
+resume a distribuição de sobressinal, acomodação, IAE e margens de
+estabilidade por percentis, junto com o envelope da resposta y(t).
+
+Distribuições de amostragem:
+
+    "uniform"    cada parâmetro × U(1 - spread, 1 + spread)
+    "lognormal"  cada parâmetro × exp(N(0, spread))
+    "cov"        normal multivariada com a covariância do ajuste
+                 (identification.least_squares, chave "cov")
+"""
+
+import numpy as np
+from models.closed_loop import simulate_pid_loop_batch
+from models.simulation import is_uniform_grid
+from analysis.frequency import loop_analysis
+from utils.metrics import step_metrics
+from utils.parallel import map_chunks
+from utils.profiling import profiled
+
+ROBUST_DTYPE = np.dtype([
+    ("k", "f8"), ("tau", "f8"), ("theta", "f8"),
+    ("tr", "f8"), ("ts", "f8"), ("mp", "f8"), ("ess", "f8"), ("iae", "f8"),
+    ("gm", "f8"), ("pm", "f8"), ("ms", "f8"), ("stable", "?"),
+])
+ROBUST_METRICS = ("mp", "ts", "tr", "iae", "gm", "pm", "ms")
+DISTRIBUTIONS = ("uniform", "lognormal", "cov")
+DEFAULT_SAMPLES = 10_000
+DEFAULT_SPREAD = 0.2
+PERCENTILES = (5, 25, 50, 75, 95)
+CHUNK_SIZE = 1000
+MAX_POINTS = 1000          # grids maiores (ou irregulares) são reamostrados (uniforme) para a simulação
+
+
+def sample_plants(k, tau, theta, n=DEFAULT_SAMPLES, spread=DEFAULT_SPREAD, dist="uniform",
+                  cov=None, seed=None):
+    """Array (n, 3) de plantas (K, τ, θ) sorteadas em torno do nominal.
+
+    spread: escalar ou (sK, sτ, sθ), relativo ao valor nominal.
+    τ é limitado a valores positivos e θ a não negativos.
+    """
+    rng = np.random.default_rng(seed)
+    nominal = np.array([k, tau, theta], dtype=float)
+    n = int(n)
+    if dist == "cov":
+        if cov is None:
+            raise ValueError("dist='cov' exige a matriz de covariância do ajuste")
+        cov = np.asarray(cov, dtype=float)
+        if not np.all(np.isfinite(cov)):
+            raise ValueError("covariância do ajuste indisponível (não finita)")
+        plants = rng.multivariate_normal(nominal, cov, size=n, method="eigh")
+    else:
+        s = np.broadcast_to(np.asarray(spread, dtype=float), (3,))
+        if dist == "uniform":
+            factors = rng.uniform(1.0 - s, 1.0 + s, size=(n, 3))
+        elif dist == "lognormal":
+            factors = np.exp(rng.normal(0.0, 1.0, size=(n, 3)) * s)
+        else:
+            raise ValueError(f"distribuição desconhecida: {dist!r} (use {', '.join(DISTRIBUTIONS)})")
+        plants = nominal * factors
+    plants[:, 1] = np.maximum(plants[:, 1], 1e-6 * max(abs(tau), 1.0))
+    plants[:, 2] = np.maximum(plants[:, 2], 0.0)
+    return plants
+
+
+def evaluate_plants(plants, gains, T, sp=1.0, u_min=None, u_max=None):
+    """Simula e mede um bloco de plantas (M, 3) com os mesmos ganhos.
+
+    Retorna (array ROBUST_DTYPE, Y float32 (M, N)).
+    """
+    plants = np.atleast_2d(np.asarray(plants, dtype=float))
+    T = np.asarray(T, dtype=float).ravel()
+    gains_rows = np.broadcast_to(np.asarray(gains, dtype=float), (len(plants), 3))
+    with np.errstate(over="ignore", invalid="ignore"):
+        _, Y = simulate_pid_loop_batch(T, sp, plants[:, 0], plants[:, 1], plants[:, 2], gains_rows,
+                                       u_min=u_min, u_max=u_max)
+    out = np.full(len(plants), np.nan, dtype=ROBUST_DTYPE)
+    out["k"], out["tau"], out["theta"] = plants.T
+    margins = loop_analysis(plants[:, 0], plants[:, 1], plants[:, 2], gains)
+    for name in ("gm", "pm", "ms"):
+        out[name] = margins[name]
+    finite = np.all(np.isfinite(Y), axis=1)
+    out["stable"] = finite & (out["gm"] > 1.0) & (out["pm"] > 0.0)
+    if np.any(finite):
+        with np.errstate(over="ignore", invalid="ignore"):
+            m = step_metrics(T, Y[finite], sp=sp)
+        for name in ("tr", "ts", "mp", "ess", "iae"):
+            out[name][finite] = m[name]
+    return out, Y.astype(np.float32)
+
+
+def percentile_bands(samples, percentiles=PERCENTILES, metrics=ROBUST_METRICS):
+    """{métrica: {p: valor}} ignorando NaN/inf (amostras instáveis)."""
+    bands = {}
+    for name in metrics:
+        v = samples[name]
+        v = v[np.isfinite(v)]
+        bands[name] = {p: (float(np.percentile(v, p)) if v.size else float("nan")) for p in percentiles}
+    return bands
+
+
+@profiled("robustness")
+def monte_carlo(k, tau, theta, gains, T, n=DEFAULT_SAMPLES, spread=DEFAULT_SPREAD, dist="uniform",
+                cov=None, sp=1.0, seed=None, workers=None, chunk_size=CHUNK_SIZE,
+                u_min=None, u_max=None, percentiles=PERCENTILES, progress=None, cancelled=None):
+    """Análise de Monte Carlo dos ganhos (Kp, Ti, Td) em n plantas sorteadas.
+
+    workers/progress/cancelled: ver utils.parallel.map_chunks (retorna
+    None se cancelado). Retorna dict com:
+      "samples": array ROBUST_DTYPE (uma linha por planta),
+      "t", "nominal": grid simulado e resposta da planta nominal,
+      "envelope": {p: y_p(t)} percentis da resposta em cada instante,
+      "bands": percentis das métricas (percentile_bands),
+      "stable_fraction": fração de malhas estáveis.
+    """
+    T = np.asarray(T, dtype=float).ravel()
+    # grids irregulares também vão para um uniforme: com passo variável o
+    # simulador em lote faz uma passada por θ distinto, e aqui cada planta tem o seu
+    if T.size > MAX_POINTS or not is_uniform_grid(T):
+        T = np.linspace(T[0], T[-1], min(T.size, MAX_POINTS))
+    plants = sample_plants(k, tau, theta, n=n, spread=spread, dist=dist, cov=cov, seed=seed)
+    chunks = [plants[i:i + chunk_size] for i in range(0, len(plants), chunk_size)]
+    args = (gains, T, sp, u_min, u_max)
+
+    parts = map_chunks(evaluate_plants, chunks, args, workers=workers, progress=progress, cancelled=cancelled)
+    if parts is None:
+        return None
+
+    samples = np.concatenate([p[0] for p in parts])
+    Y = np.concatenate([p[1] for p in parts])
+    Y = Y[np.all(np.isfinite(Y), axis=1)]
+    envelope = ({p: yp for p, yp in zip(percentiles, np.percentile(Y, percentiles, axis=0))}
+                if len(Y) else {})
+    nominal, y_nom = evaluate_plants([[k, tau, theta]], *args)
+    return {
+        "samples": samples,
+        "t": T,
+        "nominal": y_nom[0].astype(float),
+        "nominal_metrics": nominal[0],
+        "envelope": envelope,
+        "bands": percentile_bands(samples, percentiles),
+        "stable_fraction": float(np.mean(samples["stable"])),
+    }
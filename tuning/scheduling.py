@@ -0,0 +1,332 @@
+"""Escalonamento de ganhos PID entre pontos de operação.
+
+Cada ponto de operação tem seu modelo FOPDT identificado (ex.: um por
+degrau de um registro longo, ver identification.segmentation) e seus
+ganhos, calculados por tuning.optimization.tune. A tabela (SCHEDULE_DTYPE,
+ordenada pela variável de escalonamento `op`, no nível da saída) é
+consultada por busca binária com interpolação linear de cada coluna;
+fora da faixa valem os pontos das extremidades.
+
+A verificação simula transições entre os pontos numa planta não linear
+montada a partir da própria tabela:
+
+    τ(x)·dx/dt = K(x)·(u(t - θ(x)) - u_eq(x)),   du_eq/dx = 1/K(x)
+
+cuja linearização em cada ponto é exatamente o FOPDT identificado nele.
+O controlador escalonado é comparado com ganhos fixos do ponto central.
+"""
+
+import bisect
+import csv
+import json
+import math
+import os
+import numpy as np
+from models.closed_loop import DERIVATIVE_FILTER_N
+from models.scenarios import segment_metrics
+from models.simulation import is_uniform_grid, split_delay
+from tuning.optimization import tune, TUNING_METHODS
+from utils.parallel import map_chunks
+from utils.profiling import profiled
+
+SCHEDULE_DTYPE = np.dtype([
+    ("op", "f8"), ("k", "f8"), ("tau", "f8"), ("theta", "f8"),
+    ("kp", "f8"), ("ti", "f8"), ("td", "f8"),
+])
+SCHEDULE_FIELDS = SCHEDULE_DTYPE.names
+GAIN_FIELDS = ("kp", "ti", "td")
+SCHEDULE_FORMATS = (".csv", ".json")
+SCHEDULE_VARIABLES = ("y", "r")
+MERGE_TOL = 0.02          # pontos a menos desta fração da faixa de op são combinados
+DWELL_FACTOR = 10.0       # permanência em cada nível, em múltiplos do maior τ+θ
+STEPS_PER_HORIZON = 100   # amostras por menor τ+θ na verificação
+MAX_SAMPLES = 50000
+
+
+class GainSchedule:
+    """Tabela op -> (K, τ, θ, Kp, Ti, Td) com consulta interpolada.
+
+    u0: entrada de equilíbrio no primeiro ponto (âncora de u_eq na planta
+    de verificação; padrão op/K). Não altera a dinâmica, só o nível de u.
+    """
+
+    def __init__(self, table, method="", u0=None):
+        table = np.sort(np.asarray(table, dtype=SCHEDULE_DTYPE).ravel(), order="op")
+        if table.size == 0:
+            raise ValueError("a tabela de ganhos precisa de ao menos um ponto de operação")
+        if np.any(np.diff(table["op"]) <= 0):
+            raise ValueError("pontos de operação repetidos na tabela de ganhos")
+        self.table = table
+        self.method = method
+        self.op = table["op"]
+        k = table["k"]
+        if np.any(k == 0):
+            raise ValueError("ganho K nulo num ponto de operação")
+        u0 = float(self.op[0] / k[0]) if u0 is None else float(u0)
+        # u_eq nos nós: integral de dx/K(x) com K linear entre os nós
+        dk = np.diff(k)
+        dx = np.diff(self.op)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            inc = np.where(np.abs(dk) > 1e-12 * np.abs(k[:-1]), dx * np.log(k[1:] / k[:-1]) / dk, dx / k[:-1])
+        self.u_eq = u0 + np.r_[0.0, np.cumsum(inc)]
+        # listas para a consulta escalar dentro do laço de simulação
+        self._op = self.op.tolist()
+        self._rows = [list(r) + [u] for r, u in zip(table[list(SCHEDULE_FIELDS[1:])].tolist(), self.u_eq.tolist())]
+
+    def __len__(self):
+        return self.table.size
+
+    def lookup(self, x, fields=GAIN_FIELDS):
+        """Colunas `fields` interpoladas em x (escalar ou array) -> (..., len(fields))."""
+        x = np.asarray(x, dtype=float)
+        V = np.column_stack([self.table[f] for f in fields])
+        if self.op.size == 1:
+            return np.broadcast_to(V[0], x.shape + (len(fields),)).copy()
+        i = np.clip(np.searchsorted(self.op, x, side="right") - 1, 0, self.op.size - 2)
+        w = np.clip((x - self.op[i]) / (self.op[i + 1] - self.op[i]), 0.0, 1.0)[..., None]
+        return V[i] * (1.0 - w) + V[i + 1] * w
+
+    def gains(self, x):
+        """(Kp, Ti, Td) interpolados no ponto de operação x."""
+        return tuple(float(g) for g in self.lookup(float(x)))
+
+    def _row(self, x):
+        """[K, τ, θ, Kp, Ti, Td, u_eq] em x escalar (bisect, sem NumPy)."""
+        op = self._op
+        i = bisect.bisect_right(op, x) - 1
+        if i < 0:
+            # abaixo da tabela: idem, com o primeiro ponto
+            row = list(self._rows[0])
+            row[-1] += (x - op[0]) / row[0]
+            return row
+        if i >= len(op) - 1:
+            if x > op[-1] or len(op) == 1:
+                # acima da tabela: parâmetros do último ponto, u_eq com inclinação 1/K
+                row = list(self._rows[-1])
+                row[-1] += (x - op[-1]) / row[0]
+                return row
+            i = len(op) - 2
+        w = (x - op[i]) / (op[i + 1] - op[i])
+        return [a + (b - a) * w for a, b in zip(self._rows[i], self._rows[i + 1])]
+
+    def rows(self, points=None):
+        """Linhas da tabela como dicts; points=n exporta n pontos igualmente espaçados
+        (tabela densa interpolada, ex.: para um CLP sem interpolação)."""
+        if points is None:
+            return [dict(zip(SCHEDULE_FIELDS, map(float, r))) for r in self.table.tolist()]
+        ops = np.linspace(self.op[0], self.op[-1], int(points))
+        V = self.lookup(ops, SCHEDULE_FIELDS[1:])
+        return [dict(zip(SCHEDULE_FIELDS, map(float, (o, *v)))) for o, v in zip(ops, V)]
+
+    def save(self, path, points=None):
+        """Grava a tabela conforme a extensão (.csv ou .json)."""
+        ext = os.path.splitext(path)[1].lower()
+        rows = self.rows(points)
+        if ext == ".csv":
+            with open(path, "w", newline="", encoding="utf-8") as f:
+                writer = csv.DictWriter(f, fieldnames=SCHEDULE_FIELDS)
+                writer.writeheader()
+                writer.writerows(rows)
+        elif ext == ".json":
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump({"method": self.method, "u0": float(self.u_eq[0]), "table": rows}, f,
+                          indent=2, ensure_ascii=False)
+        else:
+            raise ValueError(f"formato inválido: {ext!r} (use um de {SCHEDULE_FORMATS})")
+
+
+def load_schedule(path):
+    """GainSchedule gravado por GainSchedule.save (.csv ou .json)."""
+    ext = os.path.splitext(path)[1].lower()
+    method, u0 = "", None
+    if ext == ".csv":
+        with open(path, newline="", encoding="utf-8") as f:
+            rows = list(csv.DictReader(f))
+    elif ext == ".json":
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        rows = data["table"] if isinstance(data, dict) else data
+        if isinstance(data, dict):
+            method, u0 = data.get("method", ""), data.get("u0")
+    else:
+        raise ValueError(f"formato inválido: {ext!r} (use um de {SCHEDULE_FORMATS})")
+    table = np.array([tuple(float(r[f]) for f in SCHEDULE_FIELDS) for r in rows], dtype=SCHEDULE_DTYPE)
+    return GainSchedule(table, method=method, u0=u0)
+
+
+def points_from_segments(segments, merge_tol=MERGE_TOL):
+    """Pontos de operação {op, k, tau, theta, u} a partir de identify_segments.
+
+    op é o nível de saída ao fim de cada degrau (y0 + K·Δu). Segmentos que
+    chegam ao mesmo nível (dentro de merge_tol da faixa) são combinados
+    pela mediana; segmentos com falha são ignorados.
+    """
+    pts = []
+    for s in segments:
+        if s.get("error") or not np.all(np.isfinite([s["k"], s["tau"], s["theta"]])):
+            continue
+        pts.append({"op": s["y0"] + s["k"] * s["du"], "k": s["k"], "tau": s["tau"],
+                    "theta": s["theta"], "u": s["u0"] + s["du"]})
+    pts.sort(key=lambda p: p["op"])
+    if len(pts) < 2:
+        return pts
+    tol = merge_tol * (pts[-1]["op"] - pts[0]["op"])
+    groups = [[pts[0]]]
+    for p in pts[1:]:
+        if p["op"] - groups[-1][-1]["op"] <= tol:
+            groups[-1].append(p)
+        else:
+            groups.append([p])
+    return [{key: float(np.median([p[key] for p in g])) for key in ("op", "k", "tau", "theta", "u")}
+            for g in groups]
+
+
+def _tune_plant(plant, method, T):
+    return tune(method, *plant, T=T)
+
+
+@profiled("gain_schedule")
+def design_schedule(points, method="ITAE", T=None, workers=None, progress=None, cancelled=None):
+    """Ganhos `method` (ver tuning.optimization.TUNING_METHODS) em cada ponto de operação.
+
+    points: dicts {op, k, tau, theta} e, opcionalmente, u (entrada de
+    equilíbrio). Métodos otimizados rodam um ponto por processo;
+    workers/progress/cancelled: ver utils.parallel.map_chunks (retorna None
+    se cancelado).
+    """
+    if method not in TUNING_METHODS:
+        raise ValueError(f"método de sintonia inválido: {method!r} (use um de {TUNING_METHODS})")
+    points = sorted(points, key=lambda p: float(p["op"]))
+    if not points:
+        raise ValueError("nenhum ponto de operação")
+    plants = [(float(p["k"]), float(p["tau"]), float(p["theta"])) for p in points]
+    # correlações fechadas são instantâneas: não compensam abrir o pool
+    workers = workers if method.endswith("-OPT") else 1
+    gains = map_chunks(_tune_plant, plants, (method, T), workers=workers, progress=progress, cancelled=cancelled)
+    if gains is None:
+        return None
+
+    table = np.array([(float(p["op"]), *plant, *map(float, g)) for p, plant, g in zip(points, plants, gains)],
+                     dtype=SCHEDULE_DTYPE)
+    u0 = points[0].get("u")
+    return GainSchedule(table, method=method, u0=u0)
+
+
+def simulate_scheduled_loop(T, R, schedule, gains=None, variable="y", N=DERIVATIVE_FILTER_N,
+                            u_min=None, u_max=None):
+    """Malha PID escalonada sobre a planta não linear da tabela (ver docstring do módulo).
+
+    Os ganhos são interpolados a cada amostra na saída medida (variable="y")
+    ou na referência ("r"); com `gains` = (Kp, Ti, Td) o PID é fixo. A
+    simulação parte do equilíbrio em R[0]. Como em
+    models.closed_loop.simulate_pid_loop, a integral é acumulada já
+    multiplicada por Kp/Ti, de modo que trocar os ganhos não causa salto em u.
+    Retorna (T, y, u, G) com G (N, 3) os ganhos usados em cada amostra.
+    """
+    if variable not in SCHEDULE_VARIABLES:
+        raise ValueError(f"variável de escalonamento inválida: {variable!r} (use {', '.join(SCHEDULE_VARIABLES)})")
+    T = np.asarray(T, dtype=float).ravel()
+    R = np.asarray(R, dtype=float).ravel()
+    if R.size == 1:
+        R = np.full(T.shape, float(R[0]))
+    if R.shape != T.shape:
+        raise ValueError("T e R devem ter o mesmo tamanho")
+    if T.size < 2 or not is_uniform_grid(T):
+        raise ValueError("a verificação do escalonamento exige grid uniforme")
+    n = T.size
+    dt = (T[-1] - T[0]) / (n - 1)
+    lo = -math.inf if u_min is None else float(u_min)
+    hi = math.inf if u_max is None else float(u_max)
+    if gains is not None:
+        G_in = np.broadcast_to(np.asarray(gains, dtype=float), (n, 3))
+    elif variable == "r":
+        G_in = schedule.lookup(R)
+    else:
+        G_in = None
+    g_list = G_in.tolist() if G_in is not None else None
+
+    L = split_delay(float(np.max(schedule.table["theta"])), dt)[0] + 2
+    x = float(R[0])
+    ue = schedule._row(x)[-1]
+    buf = [ue] * L
+    r = R.tolist()
+    y = np.empty(n); u_out = np.empty(n); G = np.empty((n, 3))
+    integ = ue; deriv = 0.0; e_prev = 0.0
+    last = None; ki = ad = bd = 0.0
+    for k in range(n):
+        y[k] = x
+        K, tau, theta, kp_s, ti_s, td_s, ue = schedule._row(x)
+        g = (kp_s, ti_s, td_s) if g_list is None else g_list[k]
+        if g != last:
+            kp, ti, td = g
+            ki = kp * dt / ti if (math.isfinite(ti) and ti > 0) else 0.0
+            if math.isfinite(td) and td > 0:
+                ad = td / (td + N * dt); bd = kp * td * N / (td + N * dt)
+            else:
+                ad = bd = 0.0
+            last = g
+        G[k] = g
+        e = r[k] - x
+        deriv = ad * deriv + bd * (e - e_prev)
+        e_prev = e
+        v = kp * e + integ + deriv
+        if v > hi:
+            uk = hi
+            if e < 0:
+                integ += ki * e
+        elif v < lo:
+            uk = lo
+            if e > 0:
+                integ += ki * e
+        else:
+            uk = v
+            integ += ki * e
+        buf[k % L] = uk
+        u_out[k] = uk
+        # ZOH com os parâmetros congelados em x[k] (atraso inteiro d + fração f)
+        tau = max(tau, 1e-12)
+        d, f = split_delay(theta, dt)
+        a = math.exp(-dt / tau)
+        af = math.exp(-(1.0 - f) * dt / tau)
+        x = x + K * ((af - a) * (buf[(k - d - 1) % L] - ue) + (1.0 - af) * (buf[(k - d) % L] - ue))
+    return T, y, u_out, G
+
+
+@profiled("verify_schedule")
+def verify_schedule(schedule, levels=None, dwell=None, dt=None, variable="y", fixed=None,
+                    N=DERIVATIVE_FILTER_N, u_min=None, u_max=None):
+    """Simula a escada de referência `levels` (padrão: sobe e desce pelos pontos
+    da tabela) com o PID escalonado e com ganhos fixos.
+
+    fixed: (Kp, Ti, Td) de comparação (padrão: ganhos no ponto central).
+    Retorna dict com "t", "r", "y", "u", "gains" (N, 3), "y_fixed",
+    "u_fixed", "fixed_gains", "segments"/"segments_fixed" (segment_metrics
+    por transição) e "iae"/"iae_fixed" totais.
+    """
+    op = schedule.op
+    levels = [float(v) for v in (np.r_[op, op[-2::-1]] if levels is None else levels)]
+    if len(levels) < 2:
+        raise ValueError("a verificação precisa de ao menos dois níveis (dois pontos de operação)")
+    h = schedule.table["tau"] + schedule.table["theta"]
+    dwell = DWELL_FACTOR * float(np.max(h)) if dwell is None else float(dwell)
+    total = dwell * len(levels)
+    dt = float(np.min(h)) / STEPS_PER_HORIZON if dt is None else float(dt)
+    dt = max(dt, total / MAX_SAMPLES)
+    m = max(int(round(dwell / dt)), 2)
+    T = dt * np.arange(m * len(levels))
+    R = np.repeat(levels, m)
+    fixed = schedule.gains(np.median(op)) if fixed is None else tuple(float(g) for g in fixed)
+
+    _, y, u, G = simulate_scheduled_loop(T, R, schedule, variable=variable, N=N, u_min=u_min, u_max=u_max)
+    _, y_f, u_f, _ = simulate_scheduled_loop(T, R, schedule, gains=fixed, N=N, u_min=u_min, u_max=u_max)
+    segments = [{"t0": float(T[j * m]), "t1": float(T[min((j + 1) * m, T.size - 1)]), "i0": j * m,
+                 "i1": (j + 1) * m, "kind": "setpoint", "label": f"{levels[j - 1]:.4g} → {levels[j]:.4g}"}
+                for j in range(1, len(levels))]
+    with np.errstate(over="ignore", invalid="ignore"):
+        metrics = segment_metrics(T, np.vstack([y, y_f]), R, segments)
+    split = lambda i: [{key: (float(v[i]) if isinstance(v, np.ndarray) else v) for key, v in s.items()}
+                       for s in metrics]
+    seg_s, seg_f = split(0), split(1)
+    return {"t": T, "r": R, "y": y, "u": u, "gains": G, "y_fixed": y_f, "u_fixed": u_f,
+            "fixed_gains": fixed, "segments": seg_s, "segments_fixed": seg_f,
+            "iae": sum(s["iae"] for s in seg_s), "iae_fixed": sum(s["iae"] for s in seg_f)}
@@ -0,0 +1,95 @@
+"""Varredura paralela de ganhos PID em torno do ponto CHR/ITAE.
+
+Avalia uma grade (Kp, Ti, Td) sobre o modelo FOPDT identificado, calcula
+tr, ts, Mp, ess e IAE para cada ponto e distribui os blocos de candidatos
+entre os núcleos com um pool de processos. Cada bloco é simulado de uma vez
+com o simulador vetorizado (models.closed_loop).
+
+O resultado é um array estruturado NumPy (SWEEP_DTYPE) na ordem da grade,
+que pode ser remodelado para (n_kp, n_ti, n_td).
+"""
+
+import numpy as np
+from models.closed_loop import simulate_pid_loop_batch
+from tuning.tuning_methods import chr_from_params, itae_from_params
+from utils.metrics import step_metrics
+from utils.parallel import map_chunks
+from utils.profiling import profiled
+
+SWEEP_DTYPE = np.dtype([
+    ("kp", "f8"), ("ti", "f8"), ("td", "f8"),
+    ("tr", "f8"), ("ts", "f8"), ("mp", "f8"), ("ess", "f8"), ("iae", "f8"),
+])
+SWEEP_METRICS = ("iae", "ts", "tr", "mp", "ess")
+DEFAULT_SHAPE = (21, 21, 5)   # pontos em Kp, Ti, Td
+DEFAULT_SPAN = 3.0            # cada eixo vai de centro/span até centro·span
+CHUNK_SIZE = 256
+
+
+def gain_grid(center, shape=DEFAULT_SHAPE, span=DEFAULT_SPAN):
+    """Grade logarítmica em torno de center=(Kp, Ti, Td).
+
+    Eixos com centro nulo (ex.: Td = 0) ficam constantes.
+    Retorna (gains (M, 3), grid_shape).
+    """
+    axes = []
+    for c, n in zip(center, shape):
+        c = float(c)
+        if c > 0 and n > 1:
+            axes.append(c * np.logspace(-np.log10(span), np.log10(span), int(n)))
+        else:
+            axes.append(np.full(max(int(n), 1), max(c, 0.0)))
+    kp, ti, td = np.meshgrid(*axes, indexing="ij")
+    return np.column_stack([kp.ravel(), ti.ravel(), td.ravel()]), tuple(len(a) for a in axes)
+
+
+def evaluate_gains(gains, k, tau, theta, T, sp=1.0, u_min=None, u_max=None):
+    """Simula e mede um bloco de ganhos (M, 3); retorna array SWEEP_DTYPE."""
+    gains = np.atleast_2d(np.asarray(gains, dtype=float))
+    T = np.asarray(T, dtype=float).ravel()
+    with np.errstate(over="ignore", invalid="ignore"):
+        _, Y = simulate_pid_loop_batch(T, sp, k, tau, theta, gains, u_min=u_min, u_max=u_max)
+    out = np.full(len(gains), np.nan, dtype=SWEEP_DTYPE)
+    out["kp"], out["ti"], out["td"] = gains[:, 0], gains[:, 1], gains[:, 2]
+    stable = np.all(np.isfinite(Y), axis=1)  # malhas instáveis: métricas ficam NaN
+    if np.any(stable):
+        with np.errstate(over="ignore", invalid="ignore"):
+            m = step_metrics(T, Y[stable], sp=sp)
+        for name in ("tr", "ts", "mp", "ess", "iae"):
+            out[name][stable] = m[name]
+    return out
+
+
+@profiled("sweep_pid")
+def sweep_pid(k, tau, theta, T, center=None, method="ITAE", shape=DEFAULT_SHAPE, span=DEFAULT_SPAN,
+              sp=1.0, workers=None, chunk_size=CHUNK_SIZE, u_min=None, u_max=None,
+              progress=None, cancelled=None):
+    """Varre a grade de ganhos em paralelo.
+
+    center: (Kp, Ti, Td) central; se None usa CHR ou ITAE (method).
+    workers/progress/cancelled: ver utils.parallel.map_chunks (retorna None
+    se cancelado).
+    Retorna (results, grid_shape) com results em SWEEP_DTYPE.
+    """
+    if center is None:
+        fn = chr_from_params if method == "CHR" else itae_from_params
+        center = fn(k, tau, theta)
+    gains, grid_shape = gain_grid(center, shape=shape, span=span)
+    chunks = [gains[i:i + chunk_size] for i in range(0, len(gains), chunk_size)]
+    args = (k, tau, theta, T, sp, u_min, u_max)
+
+    parts = map_chunks(evaluate_gains, chunks, args, workers=workers, progress=progress, cancelled=cancelled)
+    if parts is None:
+        return None
+    return np.concatenate(parts), grid_shape
+
+
+def sweep_slice(results, grid_shape, metric="iae", td_index=None):
+    """Mapa 2-D (Ti × Kp) de `metric` para um índice de Td (padrão: o central).
+
+    Retorna (kp_axis, ti_axis, Z) com Z de forma (n_ti, n_kp).
+    """
+    cube = results.reshape(grid_shape)
+    j = grid_shape[2] // 2 if td_index is None else int(td_index)
+    plane = cube[:, :, j]
+    return plane["kp"][:, 0], plane["ti"][0, :], plane[metric].T
@@ -1,6 +1,8 @@
 import numpy as np
 from Filtragem_dados import filtragem
+from utils.profiling import profiled
 
+@profiled("chr_from_params")
 def chr_from_params(k, tau, theta):
     try:
         kp = (0.6*(tau))/(k*theta)
@@ -20,6 +22,7 @@ def chr_from_params(k, tau, theta):
         Td = max(0.0, float(theta)/2 if theta is not None else 0.0)
         return (Kp, Ti, Td)
 
+@profiled("itae_from_params")
 def itae_from_params(k, tau, theta):
     A = 0.965
     B = -0.85
@@ -0,0 +1,110 @@
+"""Decimação min/max para desenhar curvas longas na resolução da tela.
+
+Para cada "balde" de amostras mantém o ponto de mínimo e o de máximo (na
+ordem em que ocorrem), de modo que picos, degraus e ruído continuam
+visíveis mesmo com milhões de pontos reduzidos a ~2 pontos por pixel.
+
+Os índices de mínimo/máximo ficam numa pirâmide de resoluções (baldes de
+BASE_BUCKET, 2·BASE_BUCKET, 4·BASE_BUCKET, ... amostras), construída uma
+vez por curva; a cada zoom basta escolher o nível adequado e fatiar, com
+custo proporcional à largura em pixels e não ao tamanho do registro.
+"""
+
+import numpy as np
+
+BASE_BUCKET = 32
+# curvas com até este número de pontos são desenhadas sem decimação
+DECIMATE_MIN_POINTS = 20_000
+
+
+def _pair_reduce(y, imin, imax):
+    """Combina baldes vizinhos dois a dois (nível seguinte da pirâmide)."""
+    if imin.size % 2:
+        imin = np.append(imin, imin[-1])
+        imax = np.append(imax, imax[-1])
+    a, b = imin.reshape(-1, 2), imax.reshape(-1, 2)
+    rows = np.arange(a.shape[0])
+    imin = a[rows, np.argmin(y[a], axis=1)]
+    imax = b[rows, np.argmax(y[b], axis=1)]
+    return imin, imax
+
+
+class MinMaxPyramid:
+    """Pirâmide de índices (mínimo, máximo) por balde para x crescente."""
+
+    def __init__(self, x, y, base=BASE_BUCKET):
+        self.x = np.asarray(x, dtype=float).ravel()
+        self.y = np.asarray(y, dtype=float).ravel()
+        n = self.y.size
+        itype = np.int32 if n < 2 ** 31 else np.int64
+        self.base = int(base)
+        self.levels = []   # (tamanho do balde, imin, imax)
+        if n < 2 * self.base:
+            return
+        # nível 1: baldes de `base` amostras (visão sem cópia); sobra vira um balde menor
+        nb = n // self.base
+        blocks = self.y[:nb * self.base].reshape(nb, self.base)
+        start = np.arange(nb, dtype=itype) * self.base
+        imin = start + np.argmin(blocks, axis=1).astype(itype)
+        imax = start + np.argmax(blocks, axis=1).astype(itype)
+        if nb * self.base < n:
+            tail = self.y[nb * self.base:]
+            imin = np.append(imin, itype(nb * self.base + np.argmin(tail)))
+            imax = np.append(imax, itype(nb * self.base + np.argmax(tail)))
+        size = self.base
+        while True:
+            self.levels.append((size, imin, imax))
+            if imin.size <= 2:
+                break
+            imin, imax = _pair_reduce(self.y, imin, imax)
+            size *= 2
+
+    @staticmethod
+    def supports(x):
+        """Decimação exige x crescente (vetor de tempo)."""
+        x = np.asarray(x)
+        return x.ndim == 1 and x.size > 1 and bool(np.all(x[1:] >= x[:-1]))
+
+    def view(self, x0=None, x1=None, pixels=1000):
+        """(x, y) com ~2 pontos por pixel cobrindo o intervalo [x0, x1].
+
+        Inclui um ponto além de cada borda para a linha não ser cortada
+        antes do limite do eixo.
+        """
+        n = self.y.size
+        i0 = 0 if x0 is None else max(int(np.searchsorted(self.x, x0, side="left")) - 1, 0)
+        i1 = n if x1 is None else min(int(np.searchsorted(self.x, x1, side="right")) + 1, n)
+        count = i1 - i0
+        pixels = max(int(pixels), 1)
+        if count <= 0:
+            return self.x[:0], self.y[:0]
+        target = count / pixels
+        level = None
+        for size, imin, imax in self.levels:
+            if size > target:
+                break
+            level = (size, imin, imax)
+        if level is None:
+            return self.x[i0:i1], self.y[i0:i1]
+        size, imin, imax = level
+        # baldes inteiramente dentro de [i0, i1) vêm da pirâmide; as pontas
+        # parciais são reduzidas na hora (no máximo 2·size amostras)
+        j0, j1 = -(-i0 // size), i1 // size
+        if j1 <= j0:
+            j0 = j1 = i1 // size
+            head, tail = self._minmax_index(i0, i1), np.zeros(0, dtype=np.int64)
+        else:
+            head, tail = self._minmax_index(i0, j0 * size), self._minmax_index(j1 * size, i1)
+        lo, hi = imin[j0:j1], imax[j0:j1]
+        first, second = np.minimum(lo, hi), np.maximum(lo, hi)
+        mid = np.empty(2 * first.size, dtype=np.int64)
+        mid[0::2], mid[1::2] = first, second
+        idx = np.concatenate([[i0], head, mid, tail, [i1 - 1]])
+        return self.x[idx], self.y[idx]
+
+    def _minmax_index(self, a, b):
+        """Índices (em ordem) do mínimo e do máximo de y[a:b]."""
+        if b <= a:
+            return np.zeros(0, dtype=np.int64)
+        seg = self.y[a:b]
+        return np.sort(np.array([a + int(np.argmin(seg)), a + int(np.argmax(seg))], dtype=np.int64))
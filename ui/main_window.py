@@ -2,18 +2,144 @@ import os
 import numpy as np
 from PyQt5.QtWidgets import (
     QMainWindow, QWidget, QTabWidget, QVBoxLayout, QPushButton, QFileDialog, QLabel,
-    QHBoxLayout, QFormLayout, QLineEdit, QComboBox, QFrame
+    QHBoxLayout, QFormLayout, QLineEdit, QComboBox, QFrame, QCheckBox, QTableWidget, QTableWidgetItem,
+    QHeaderView
 )
-from PyQt5.QtCore import Qt
+from PyQt5.QtCore import Qt, QTimer
 from ui.plot_widget import PlotWidget
+from ui.tasks import TaskScheduler
 from Filtragem_dados import load_mat
 from identification.smith import smith_identification
+from identification.least_squares import least_squares_identification
+from identification.ranking import best_model_identification
+from identification.segmentation import segmented_identification
+from preprocessing.pipeline import make_pipeline
 from tuning.tuning_methods import chr_from_params, itae_from_params
+from tuning.optimization import optimize_pid, CRITERIA, default_time_grid
+from tuning.sweep import sweep_pid, sweep_slice, SWEEP_METRICS
+from analysis.frequency import bode, loop_analysis, frequency_grid
+from tuning.scheduling import design_schedule, verify_schedule, points_from_segments, SCHEDULE_FORMATS
+from tuning.robustness import monte_carlo, ROBUST_METRICS, PERCENTILES, DEFAULT_SAMPLES, DEFAULT_SPREAD
 from models.system_model import SystemModel
-from utils.metrics import compute_tr, compute_mp, compute_ts, eqm as eqm_func
+from models.scenarios import run_scenario, standard_scenarios, load_scenarios
+from utils.metrics import step_metrics, eqm as eqm_func
+from utils import profiling
+from utils.cache import cache_stats, array_key
+from utils.timebase import TimeBase
+from utils.store import default_store, make_key
+from streaming.sources import open_source
+from streaming.session import StreamSession
 from pyqtgraph.exporters import ImageExporter
 
 DEFAULT_DATA_PATH = "datasets"
+STEP_SCENARIO = "Degrau (dataset/SP)"
+LOAD_SCENARIOS = "Carregar cenários (JSON)..."
+DEFAULT_STREAM_URL = "sim://?dt=0.01&prbs=5"
+BODE_SPAN = (1e-2, 3e1)  # faixa exibida de ω·(τ+θ); acima disso só a fase do atraso cresce
+STREAM_FPS = 20          # quadros por segundo do gráfico em tempo real
+STREAM_POLL_MS = 10      # intervalo de leitura da fonte
+# rótulo da UI -> distribuição de tuning.robustness.sample_plants
+ROBUST_DISTRIBUTIONS = {
+    "Uniforme": "uniform",
+    "Lognormal": "lognormal",
+    "Covariância do ajuste": "cov",
+}
+# rótulo da UI -> preset de preprocessing.pipeline
+PREPROCESS_PRESETS = {
+    "Nenhum": "none",
+    "Hampel (outliers)": "hampel",
+    "Hampel + Butterworth": "hampel-butter",
+    "Savitzky-Golay": "savgol",
+    "Reamostrar + Hampel": "resample-hampel",
+}
+# método de identificação -> função com a assinatura de smith_identification
+IDENTIFICATION_METHODS = {
+    "Smith": smith_identification,
+    "Mínimos Quadrados": least_squares_identification,
+    "Automático (AIC)": best_model_identification,
+    "Segmentado (vários degraus)": segmented_identification,
+}
+
+def _stored(kind, fn, *parts, **settings):
+    """fn() memoizado no armazenamento persistente (utils.store), se ativo."""
+    store = default_store()
+    if store is None:
+        return fn()
+    return store.get_or_compute(make_key(kind, *parts, **settings), fn, kind=kind)
+
+
+def _load_job(fname):
+    """Lê o .mat ou o recupera do armazenamento pelo sha256 do conteúdo."""
+    store = default_store()
+    if store is None:
+        return load_mat(fname)
+    return _stored("dataset", lambda: load_mat(fname), store.file_digest(fname))
+
+
+def _identify_job(identify, id_method, preset, t, y, u, amplitude):
+    """Pré-processamento (cache LRU) + identificação (armazenamento persistente).
+
+    Retorna (resultado da identificação, t, y, u) já pré-processados.
+    """
+    key = array_key(t, y, u)
+    t, y, u = make_pipeline(preset).apply(t, y, u)
+    result = _stored("identification", lambda: identify(t, y, amplitude=amplitude, u=u),
+                     id_method, float(amplitude), key, preprocess=preset)
+    return result, t, y, u
+
+
+@profiling.profiled("run_tune")
+def _tune_job(plant, gains, method, criterion, T, U, T_opt=None, scenario=None):
+    """Sintonia (se method), simulação em malha fechada e métricas; roda fora da thread da UI.
+
+    Com `scenario` (models.scenarios) a malha é simulada no cenário em vez
+    do degrau, e o resultado traz também as métricas por segmento.
+    """
+    k, tau, theta = plant
+    info = None
+    if method == "CHR":
+        gains = chr_from_params(k, tau, theta)
+    elif method == "ITAE":
+        gains = itae_from_params(k, tau, theta)
+    elif method == "Otimizado":
+        gains, info = optimize_pid(k, tau, theta, criterion=criterion, T=T_opt)
+    elif method is not None:
+        gains = (0.0, 0.0, 0.0)
+    # simula com os mesmos valores (4 casas) exibidos nos campos
+    kp, ti, td = (round(float(g), 4) for g in gains)
+
+    if scenario is not None:
+        sc = run_scenario(scenario, k, tau, theta, (kp, ti, td))
+        first = sc["segments"][0] if sc["segments"] else None
+        n_first = int(np.searchsorted(sc["t"], first["t1"])) if first else sc["t"].size
+        m = step_metrics(sc["t"][:n_first], sc["y"][:n_first], sp=sc["r"][max(n_first - 1, 0)])
+        return {"method": method, "gains": (kp, ti, td), "info": info, "t": sc["t"], "y": sc["y"],
+                "metrics": m, "scenario": sc}
+
+    model = SystemModel(k, tau, theta, pade_order=10)
+    try:
+        t_cl, y_cl = model.simulate_step_closedloop(kp, ti, td, T, U=U)
+    except TypeError:
+        try:
+            t_cl, y_cl = model.simulate_step_closedloop(kp, ti, td, T)
+        except Exception:
+            t_cl = T; y_cl = np.zeros_like(T)
+    except Exception:
+        t_cl = T; y_cl = np.zeros_like(T)
+    t_cl = np.asarray(t_cl, dtype=float).ravel(); y_cl = np.asarray(y_cl, dtype=float).ravel()
+
+    # métricas: kernel único de utils.metrics (valor final = média dos últimos 5%)
+    m = step_metrics(t_cl, y_cl)
+    return {"method": method, "gains": (kp, ti, td), "info": info, "t": t_cl, "y": y_cl, "metrics": m}
+
+
+def _schedule_job(points, method, progress=None, cancelled=None):
+    """Ganhos em cada ponto de operação + verificação das transições."""
+    schedule = design_schedule(points, method, progress=progress, cancelled=cancelled)
+    if schedule is None:
+        return None
+    return schedule, verify_schedule(schedule)
+
 
 class MainWindow(QMainWindow):
     def __init__(self):
@@ -25,16 +151,36 @@ class MainWindow(QMainWindow):
         self.tab_id = QWidget()
         self.tab_pid = QWidget()
         self.tab_inicio = QWidget()
+        self.tab_freq = QWidget()
+        self.tab_map = QWidget()
+        self.tab_robust = QWidget()
+        self.tab_stream = QWidget()
+        self.tab_perf = QWidget()
         self.tabs.addTab(self.tab_inicio, "Início")
         self.tabs.addTab(self.tab_id, "Identificação")
         self.tabs.addTab(self.tab_pid, "Controle PID")
+        self.tabs.addTab(self.tab_freq, "Frequência")
+        self.tabs.addTab(self.tab_map, "Mapa de Desempenho")
+        self.tabs.addTab(self.tab_robust, "Robustez")
+        self.tabs.addTab(self.tab_stream, "Tempo Real")
+        self.tabs.addTab(self.tab_perf, "Desempenho")
 
         # estado
         self.current_data = None
         self.ident_params = None
         self.current_t = None
         self.current_u = None
+        self.timebase = None
         self.current_y = None
+        self.sweep_results = None
+        self.schedule = None
+
+        # tarefas pesadas (leitura, identificação, sintonia, varredura) rodam
+        # fora da thread da interface; o andamento aparece na barra de status
+        self.tasks = TaskScheduler(self)
+        self.lbl_status = QLabel("")
+        self.statusBar().addWidget(self.lbl_status, 1)
+        self.tasks.status.connect(self.lbl_status.setText)
 
         # Aba Início (apresentação)
         inicio_layout = QVBoxLayout()
@@ -71,6 +217,12 @@ class MainWindow(QMainWindow):
         self.lbl_filename = QLabel("Selecione um dataset.")
         right_layout.addWidget(self.lbl_filename)
         # botão Identificação removido (identificação é automática ao carregar)
+        right_layout.addWidget(QLabel("Método de identificação:"))
+        self.id_method_combo = QComboBox(); self.id_method_combo.addItems(list(IDENTIFICATION_METHODS))
+        right_layout.addWidget(self.id_method_combo)
+        right_layout.addWidget(QLabel("Pré-processamento:"))
+        self.preprocess_combo = QComboBox(); self.preprocess_combo.addItems(list(PREPROCESS_PRESETS))
+        right_layout.addWidget(self.preprocess_combo)
 
         form = QFormLayout()
         self.k_field = QLineEdit(); self.tau_field = QLineEdit(); self.theta_field = QLineEdit(); self.eqm_field = QLineEdit()
@@ -78,6 +230,9 @@ class MainWindow(QMainWindow):
             w.setReadOnly(True); w.setFixedWidth(160)
         form.addRow("K:", self.k_field); form.addRow("τ:", self.tau_field); form.addRow("θ:", self.theta_field); form.addRow("EQM:", self.eqm_field)
         right_layout.addLayout(form)
+        self.lbl_ci = QLabel("")
+        self.lbl_ci.setWordWrap(True)
+        right_layout.addWidget(self.lbl_ci)
 
         self.btn_export_id = QPushButton("Exportar Gráfico")
         self.btn_reset_id = QPushButton("Reset")
@@ -101,8 +256,17 @@ class MainWindow(QMainWindow):
         self.mode_combo = QComboBox(); self.mode_combo.addItems(["Método", "Manual"])
         right_layout_pid.addWidget(self.mode_combo)
         right_layout_pid.addWidget(QLabel("Método (se Método):"))
-        self.method_combo = QComboBox(); self.method_combo.addItems(["CHR", "ITAE"])
+        self.method_combo = QComboBox(); self.method_combo.addItems(["CHR", "ITAE", "Otimizado"])
         right_layout_pid.addWidget(self.method_combo)
+        right_layout_pid.addWidget(QLabel("Critério (se Otimizado):"))
+        self.criterion_combo = QComboBox(); self.criterion_combo.addItems(list(CRITERIA))
+        right_layout_pid.addWidget(self.criterion_combo)
+        right_layout_pid.addWidget(QLabel("Cenário de simulação:"))
+        self.scenario_combo = QComboBox()
+        self.scenario_combo.addItems([STEP_SCENARIO] + [sc["name"] for sc in standard_scenarios(1.0, 1.0, 0.0)]
+                                     + [LOAD_SCENARIOS])
+        right_layout_pid.addWidget(self.scenario_combo)
+        self.custom_scenarios = {}
 
         pid_form = QFormLayout()
         self.kp_input = QLineEdit("0.0000"); self.ti_input = QLineEdit("0.0000"); self.td_input = QLineEdit("0.0000"); self.lambda_input = QLineEdit("0.0000")
@@ -121,7 +285,14 @@ class MainWindow(QMainWindow):
         self.btn_tune = QPushButton("Sintonizar e Simular")
         self.btn_export_pid = QPushButton("Exportar Gráfico")
         self.btn_reset_pid = QPushButton("Reset")
+        self.btn_schedule = QPushButton("Escalonar ganhos (vários degraus)")
+        self.btn_export_schedule = QPushButton("Exportar tabela de ganhos")
+        self.btn_export_schedule.setEnabled(False)
         right_layout_pid.addWidget(self.btn_tune); right_layout_pid.addWidget(self.btn_export_pid); right_layout_pid.addWidget(self.btn_reset_pid)
+        right_layout_pid.addWidget(self.btn_schedule); right_layout_pid.addWidget(self.btn_export_schedule)
+        self.lbl_status_pid = QLabel("")
+        self.lbl_status_pid.setWordWrap(True)
+        right_layout_pid.addWidget(self.lbl_status_pid)
         right_layout_pid.addStretch()
 
         h_pid = QHBoxLayout()
@@ -129,15 +300,189 @@ class MainWindow(QMainWindow):
         h_pid.addWidget(right_frame_pid, 1)
         self.tab_pid.setLayout(h_pid)
 
+        # --- Aba Frequência (Bode/Nyquist com atraso exato) ---
+        left_freq = QVBoxLayout()
+        self.plot_bode_mag = PlotWidget(title="Bode: |L(jω)| (dB)", enable_legend=False)
+        self.plot_bode_phase = PlotWidget(title="Bode: fase de L(jω) (graus)", enable_legend=False)
+        left_freq.addWidget(self.plot_bode_mag)
+        left_freq.addWidget(self.plot_bode_phase)
+
+        right_freq = QVBoxLayout()
+        self.plot_nyquist = PlotWidget(title="Nyquist", enable_legend=True)
+        right_freq.addWidget(self.plot_nyquist, 3)
+        right_frame_freq = QFrame(); right_frame_freq.setFrameShape(QFrame.StyledPanel)
+        right_layout_freq = QVBoxLayout(right_frame_freq)
+        freq_form = QFormLayout()
+        self.gm_field = QLineEdit(); self.pm_field = QLineEdit(); self.ms_field = QLineEdit(); self.bw_field = QLineEdit()
+        for w in (self.gm_field, self.pm_field, self.ms_field, self.bw_field):
+            w.setReadOnly(True); w.setFixedWidth(160)
+        freq_form.addRow("Margem de ganho (dB):", self.gm_field)
+        freq_form.addRow("Margem de fase (°):", self.pm_field)
+        freq_form.addRow("Ms:", self.ms_field)
+        freq_form.addRow("Banda passante (rad/s):", self.bw_field)
+        right_layout_freq.addLayout(freq_form)
+        self.btn_freq = QPushButton("Atualizar com os ganhos atuais")
+        right_layout_freq.addWidget(self.btn_freq)
+        self.lbl_status_freq = QLabel("")
+        self.lbl_status_freq.setWordWrap(True)
+        right_layout_freq.addWidget(self.lbl_status_freq)
+        right_freq.addWidget(right_frame_freq, 1)
+
+        h_freq = QHBoxLayout()
+        h_freq.addLayout(left_freq, 1)
+        h_freq.addLayout(right_freq, 1)
+        self.tab_freq.setLayout(h_freq)
+
+        # --- Aba Mapa de Desempenho (varredura de ganhos) ---
+        left_map = QVBoxLayout()
+        self.plot_map = PlotWidget(title="Mapa de Desempenho (Kp × Ti)", enable_legend=False)
+        left_map.addWidget(self.plot_map)
+
+        right_frame_map = QFrame(); right_frame_map.setFrameShape(QFrame.StyledPanel)
+        right_layout_map = QVBoxLayout(right_frame_map)
+        right_layout_map.addWidget(QLabel("Métrica:"))
+        self.map_metric_combo = QComboBox(); self.map_metric_combo.addItems(list(SWEEP_METRICS))
+        right_layout_map.addWidget(self.map_metric_combo)
+        self.btn_sweep = QPushButton("Varrer Ganhos")
+        right_layout_map.addWidget(self.btn_sweep)
+        self.lbl_status_map = QLabel("Centro da grade: ganhos atuais da aba Controle PID (ou ITAE).")
+        self.lbl_status_map.setWordWrap(True)
+        right_layout_map.addWidget(self.lbl_status_map)
+        right_layout_map.addStretch()
+
+        h_map = QHBoxLayout()
+        h_map.addLayout(left_map, 3)
+        h_map.addWidget(right_frame_map, 1)
+        self.tab_map.setLayout(h_map)
+
+        # --- Aba Robustez (Monte Carlo sobre a incerteza da planta) ---
+        left_robust = QVBoxLayout()
+        self.plot_robust = PlotWidget(title="Envelope da resposta (Monte Carlo)", enable_legend=True)
+        left_robust.addWidget(self.plot_robust)
+
+        right_frame_robust = QFrame(); right_frame_robust.setFrameShape(QFrame.StyledPanel)
+        right_layout_robust = QVBoxLayout(right_frame_robust)
+        robust_form = QFormLayout()
+        self.robust_samples = QLineEdit(str(DEFAULT_SAMPLES))
+        self.robust_spread = QLineEdit(f"{DEFAULT_SPREAD:g}")
+        self.robust_dist = QComboBox(); self.robust_dist.addItems(list(ROBUST_DISTRIBUTIONS))
+        robust_form.addRow("Amostras:", self.robust_samples)
+        robust_form.addRow("Variação relativa:", self.robust_spread)
+        robust_form.addRow("Distribuição:", self.robust_dist)
+        right_layout_robust.addLayout(robust_form)
+        self.btn_robust = QPushButton("Analisar Robustez")
+        right_layout_robust.addWidget(self.btn_robust)
+        self.robust_table = QTableWidget(len(ROBUST_METRICS), len(PERCENTILES))
+        self.robust_table.setVerticalHeaderLabels(list(ROBUST_METRICS))
+        self.robust_table.setHorizontalHeaderLabels([f"P{p}" for p in PERCENTILES])
+        self.robust_table.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.robust_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        right_layout_robust.addWidget(self.robust_table)
+        self.lbl_status_robust = QLabel("Usa os ganhos atuais da aba Controle PID (ou ITAE).")
+        self.lbl_status_robust.setWordWrap(True)
+        right_layout_robust.addWidget(self.lbl_status_robust)
+        right_layout_robust.addStretch()
+
+        h_robust = QHBoxLayout()
+        h_robust.addLayout(left_robust, 3)
+        h_robust.addWidget(right_frame_robust, 1)
+        self.tab_robust.setLayout(h_robust)
+
+        # --- Aba Tempo Real (fonte -> buffer circular -> RLS) ---
+        left_stream = QVBoxLayout()
+        self.plot_stream = PlotWidget(title="Aquisição em tempo real", enable_legend=True)
+        left_stream.addWidget(self.plot_stream)
+
+        right_frame_stream = QFrame(); right_frame_stream.setFrameShape(QFrame.StyledPanel)
+        right_layout_stream = QVBoxLayout(right_frame_stream)
+        right_layout_stream.addWidget(QLabel("Fonte (tcp://, udp://, pipe://, sim://):"))
+        self.stream_url = QLineEdit(DEFAULT_STREAM_URL)
+        right_layout_stream.addWidget(self.stream_url)
+        self.btn_stream_start = QPushButton("Iniciar")
+        self.btn_stream_stop = QPushButton("Parar"); self.btn_stream_stop.setEnabled(False)
+        self.btn_stream_use = QPushButton("Usar modelo na sintonia"); self.btn_stream_use.setEnabled(False)
+        for b in (self.btn_stream_start, self.btn_stream_stop, self.btn_stream_use):
+            right_layout_stream.addWidget(b)
+        stream_form = QFormLayout()
+        self.k_stream = QLineEdit(); self.tau_stream = QLineEdit(); self.theta_stream = QLineEdit()
+        for w in (self.k_stream, self.tau_stream, self.theta_stream):
+            w.setReadOnly(True); w.setFixedWidth(160)
+        stream_form.addRow("K:", self.k_stream); stream_form.addRow("τ:", self.tau_stream); stream_form.addRow("θ:", self.theta_stream)
+        right_layout_stream.addLayout(stream_form)
+        self.lbl_stream = QLabel("")
+        self.lbl_stream.setWordWrap(True)
+        right_layout_stream.addWidget(self.lbl_stream)
+        right_layout_stream.addStretch()
+
+        h_stream = QHBoxLayout()
+        h_stream.addLayout(left_stream, 3)
+        h_stream.addWidget(right_frame_stream, 1)
+        self.tab_stream.setLayout(h_stream)
+        self.stream = None
+        self._stream_estimate = None
+        self._stream_poll_timer = QTimer(self)
+        self._stream_poll_timer.setInterval(STREAM_POLL_MS)
+        self._stream_poll_timer.timeout.connect(self._poll_stream)
+        self._stream_frame_timer = QTimer(self)
+        self._stream_frame_timer.setInterval(int(1000 / STREAM_FPS))
+        self._stream_frame_timer.timeout.connect(self._draw_stream)
+
+        # --- Aba Desempenho (instrumentação de utils.profiling) ---
+        perf_layout = QVBoxLayout()
+        perf_top = QHBoxLayout()
+        self.chk_profile = QCheckBox("Coletar tempos"); self.chk_profile.setChecked(profiling.is_enabled())
+        self.chk_profile_mem = QCheckBox("Medir memória (mais lento)")
+        self.btn_perf_reset = QPushButton("Zerar")
+        self.btn_perf_trace = QPushButton("Exportar trace (Chrome)")
+        self.btn_perf_json = QPushButton("Exportar JSON")
+        self.btn_store_clear = QPushButton("Limpar resultados salvos")
+        self.btn_store_clear.setEnabled(default_store() is not None)
+        for w in (self.chk_profile, self.chk_profile_mem, self.btn_perf_reset, self.btn_perf_trace, self.btn_perf_json,
+                  self.btn_store_clear):
+            perf_top.addWidget(w)
+        perf_top.addStretch()
+        perf_layout.addLayout(perf_top)
+        self.perf_table = QTableWidget(0, 6)
+        self.perf_table.setHorizontalHeaderLabels(["Função", "Chamadas", "Total (ms)", "Média (ms)", "Máx. (ms)", "Pico memória (MiB)"])
+        self.perf_table.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
+        self.perf_table.setEditTriggers(QTableWidget.NoEditTriggers)
+        perf_layout.addWidget(self.perf_table)
+        self.lbl_cache = QLabel("")
+        self.lbl_cache.setWordWrap(True)
+        perf_layout.addWidget(self.lbl_cache)
+        self.tab_perf.setLayout(perf_layout)
+        self._perf_timer = QTimer(self)
+        self._perf_timer.setInterval(1000)
+        self._perf_timer.timeout.connect(self._refresh_perf)
+
         # conexões
+        self.btn_freq.clicked.connect(self.run_frequency)
+        self.scenario_combo.activated[str].connect(self._on_scenario_chosen)
+        self.btn_robust.clicked.connect(self.run_robustness)
+        self.btn_stream_start.clicked.connect(self.start_stream)
+        self.btn_stream_stop.clicked.connect(self.stop_stream)
+        self.btn_stream_use.clicked.connect(self.use_stream_model)
         self.btn_load.clicked.connect(self.load_file)
         # botão identificar removido: sem conexão
         self.btn_export_id.clicked.connect(lambda: self._export_plot(self.plot_id))
         self.btn_export_pid.clicked.connect(lambda: self._export_plot(self.plot_pid))
         self.btn_tune.clicked.connect(self.run_tune)
+        self.btn_schedule.clicked.connect(self.run_schedule)
+        self.btn_export_schedule.clicked.connect(self.export_schedule)
+        self.btn_sweep.clicked.connect(self.run_sweep)
+        self.chk_profile.toggled.connect(self._toggle_profiling)
+        self.chk_profile_mem.toggled.connect(lambda _: self._toggle_profiling(self.chk_profile.isChecked()))
+        self.btn_perf_reset.clicked.connect(lambda: (profiling.reset(), self._refresh_perf()))
+        self.btn_perf_trace.clicked.connect(lambda: self._export_profile(profiling.dump_chrome_trace))
+        self.btn_perf_json.clicked.connect(lambda: self._export_profile(profiling.dump_json))
+        self.btn_store_clear.clicked.connect(lambda: (default_store().clear(), self._refresh_perf()))
+        self.tabs.currentChanged.connect(self._on_tab_changed)
+        self.map_metric_combo.currentTextChanged.connect(lambda _: self._plot_sweep())
         self.btn_reset_id.clicked.connect(self.reset_identification)
         self.btn_reset_pid.clicked.connect(self.reset_pid)
         self.mode_combo.currentTextChanged.connect(self._update_mode_fields)
+        self.id_method_combo.currentTextChanged.connect(lambda _: self.run_identification() if self.current_data else None)
+        self.preprocess_combo.currentTextChanged.connect(lambda _: self.run_identification() if self.current_data else None)
         self.method_combo.currentTextChanged.connect(self._update_method_fields)
         self._update_mode_fields(self.mode_combo.currentText())
         self._update_method_fields(self.method_combo.currentText())
@@ -148,8 +493,16 @@ class MainWindow(QMainWindow):
         fname, _ = QFileDialog.getOpenFileName(self, "Escolher .mat", start_path, "MAT files (*.mat)")
         if not fname:
             return
+        self.lbl_filename.setText(f"Carregando {os.path.basename(fname)}...")
+        # um novo arquivo torna obsoletas a identificação/sintonia em andamento
+        self.tasks.cancel("identification"); self.tasks.cancel("tune")
+        self.tasks.submit("load", _load_job, fname, label="Leitura do arquivo",
+                          on_done=lambda data: self._on_file_loaded(fname, data),
+                          on_error=lambda e: self.lbl_filename.setText("Erro ao carregar: " + str(e)))
+
+    def _on_file_loaded(self, fname, data):
         try:
-            self.current_data = load_mat(fname)
+            self.current_data = data
             self.lbl_filename.setText(os.path.basename(fname))
 
             # extrai vetores do dataset
@@ -157,6 +510,9 @@ class MainWindow(QMainWindow):
             y = np.asarray(self.current_data.get("salida") if "salida" in self.current_data else self.current_data["dados_saida"]["y"])
             u = np.asarray(self.current_data.get("entrada") if "entrada" in self.current_data else self.current_data["dados_entrada"]["u_fixed"])
 
+            # base de tempo canônica do dataset; u com outro tamanho é ajustado aqui, uma vez
+            self.timebase = TimeBase(t)
+            u = self.timebase.fit(u)
             self.current_t = t
             self.current_u = u
             self.current_y = y
@@ -202,27 +558,51 @@ class MainWindow(QMainWindow):
             y = np.asarray(self.current_data.get("salida") if "salida" in self.current_data else self.current_data["dados_saida"]["y"])
             amplitude = self.current_data.get("amplitude", self.current_data.get("params",{}).get("amplitude_escalon", 1.0))
 
-            # smith_identification agora retorna params, t_model, y_model
+            # identificação retorna params, t_model, y_model
             u_data = np.asarray(self.current_u) if hasattr(self, 'current_u') and self.current_u is not None else None
-            params, t_model, y_model = smith_identification(t, y, amplitude=amplitude, u=u_data)
+            id_method = self.id_method_combo.currentText()
+            identify = IDENTIFICATION_METHODS.get(id_method, smith_identification)
+            preset = PREPROCESS_PRESETS.get(self.preprocess_combo.currentText(), "none")
+            self.tasks.submit("identification", _identify_job, identify, id_method, preset, t, y, u_data, amplitude,
+                              label="Identificação",
+                              on_done=lambda result: self._on_identified(*result, id_method),
+                              on_error=lambda e: self.lbl_filename.setText(f"Erro na identificação: {e}"))
+
+    def _on_identified(self, result, t, y, u, id_method):
+            params, t_model, y_model = result
             self.ident_params = params
 
+            ci = params.get("ci") if isinstance(params, dict) else None
+            ranking = params.get("ranking") if isinstance(params, dict) else None
+            spread = params.get("spread") if isinstance(params, dict) else None
+            if ci:
+                conf = int(round(100 * params.get("confidence", 0.95)))
+                self.lbl_ci.setText(f"IC {conf}%:\n" + "\n".join(
+                    f"{name}: [{lo:.4f}, {hi:.4f}]" for name, (lo, hi) in zip(("K", "τ", "θ"), ci.values())))
+            elif ranking:
+                # K/τ/θ exibidos (e usados na sintonia) são do ajuste FOPDT
+                self.lbl_ci.setText(f"Melhor modelo: {params['model']}\n" + "\n".join(
+                    f"{kind}: EQM={e:.4g} AIC={a:.1f}" for kind, e, a in ranking))
+            elif spread:
+                self.lbl_ci.setText(f"{len(params['segments'])} segmento(s), mediana ± desvio (IQR):\n" + "\n".join(
+                    f"{name}: {s['median']:.4f} ± {s['std']:.4f} ({s['iqr']:.4f})"
+                    for name, s in zip(("K", "τ", "θ"), spread.values())))
+            else:
+                self.lbl_ci.setText("")
+            model_name = params.get("model", id_method) if isinstance(params, dict) else id_method
+
             # preenche campos identificacao
             self.k_field.setText(f"{params['k']:.4f}")
             self.tau_field.setText(f"{params['tau']:.4f}")
             self.theta_field.setText(f"{params['theta']:.4f}")
 
-            # interpola y_model (modelo) para o grid experimental t para cálculo de EQM
+            # modelo no grid experimental (sem cópia quando já simulado nele) para o EQM
             try:
-                t_model = np.asarray(t_model).ravel()
-                y_model = np.asarray(y_model).ravel()
-                if np.array_equal(t_model, np.asarray(t).ravel()):
-                    y_hat_on_t = y_model
-                else:
-                    y_hat_on_t = np.interp(np.asarray(t).ravel(), t_model, y_model)
-                from utils.metrics import eqm as mse_func
-                eqm_val = float(mse_func(np.asarray(y).ravel(), y_hat_on_t))
+                base = self.timebase if self.timebase is not None and self.timebase.same_grid(t) else TimeBase(t)
+                y_hat_on_t = base.align(t_model, y_model)
+                eqm_val = float(eqm_func(y, y_hat_on_t))
             except Exception:
+                y_hat_on_t = None
                 eqm_val = float(params.get('eqm', np.nan)) if isinstance(params, dict) else float(np.nan)
 
             self.eqm_field.setText(f"{eqm_val:.4f}")
@@ -234,7 +614,7 @@ class MainWindow(QMainWindow):
 
             # Replot único gráfico: degrau (u), saída experimental (y) e modelo smith (ŷ)
             try:
-                u = np.asarray(self.current_u) if hasattr(self, 'current_u') and self.current_u is not None else np.ones_like(t)
+                u = np.asarray(u) if u is not None else np.ones_like(t)
             except Exception:
                 u = np.ones_like(t)
 
@@ -242,24 +622,8 @@ class MainWindow(QMainWindow):
             self.plot_id.plot(t, u, name="Degrau (u)", color='#1f77b4', linewidth=1.2)
             self.plot_id.plot(t, y, name="Saída Experimental (y)", color='#111111', linewidth=1.6)
 
-            # plot model using t_model / y_model (o modelo pode ter sido simulado em t_model)
-            try:
-                # interpolate model output onto experimental time grid to ensure proper alignment
-                t_exp = np.asarray(t).ravel()
-                t_model_a = np.asarray(t_model).ravel()
-                y_model_a = np.asarray(y_model).ravel()
-                if np.array_equal(t_model_a, t_exp):
-                    y_to_plot = y_model_a
-                else:
-                    # use numpy interpolation; allow extrapolation by filling edges with nearest values
-                    try:
-                        y_to_plot = np.interp(t_exp, t_model_a, y_model_a)
-                    except Exception:
-                        # fallback to simple broadcast if shapes match
-                        y_to_plot = np.interp(t_exp, t_model_a, y_model_a)
-                self.plot_id.plot(t_exp, y_to_plot, name="Modelo Smith (ŷ)", color="#DD0D0D", linewidth=1.6)
-            except Exception:
-                pass
+            if y_hat_on_t is not None:
+                self.plot_id.plot(t, y_hat_on_t, name=f"Modelo {model_name} (ŷ)", color="#DD0D0D", linewidth=1.6)
 
             # marca t1,t2 aproximados a partir da saída experimental (para visual)
             try:
@@ -293,6 +657,7 @@ class MainWindow(QMainWindow):
         return self._update_method_fields(method_text)
 
     def _update_method_fields(self, method_text):
+        self.criterion_combo.setEnabled(self.mode_combo.currentText() == "Método" and method_text == "Otimizado")
         if str(method_text).upper() == "IMC":
             self.lambda_input.setReadOnly(False)
         else:
@@ -300,34 +665,26 @@ class MainWindow(QMainWindow):
             self.lambda_input.setText("0.0000")
 
     def run_tune(self):
+        """Sintoniza, simula a malha fechada e mede a resposta em segundo plano.
+
+        Um novo clique substitui a sintonia em andamento (resultado descartado).
+        """
         # decide valores kp, ti, td (método ou manual)
+        method = criterion = None
+        gains = (0.0, 0.0, 0.0)
         if self.mode_combo.currentText() == "Método":
             if not self.ident_params:
                 self.lbl_filename.setText("Identifique primeiro.")
                 return
             method = self.method_combo.currentText()
-            k = self.ident_params["k"]; tau = self.ident_params["tau"]; theta = self.ident_params["theta"]
-            if method == "CHR":
-                kp, ti, td = chr_from_params(k, tau, theta)
-            elif method == "ITAE":
-                kp, ti, td = itae_from_params(k, tau, theta)
-            else:
-                kp = ti = td = 0.0
-            self.kp_input.setText(f"{kp:.4f}"); self.ti_input.setText(f"{ti:.4f}"); self.td_input.setText(f"{td:.4f}")
-            self.kp_input.setReadOnly(True); self.ti_input.setReadOnly(True); self.td_input.setReadOnly(True)
+            criterion = self.criterion_combo.currentText()
         else:
             try:
-                kp = float(self.kp_input.text()); ti = float(self.ti_input.text()); td = float(self.td_input.text())
+                gains = (float(self.kp_input.text()), float(self.ti_input.text()), float(self.td_input.text()))
             except Exception:
                 self.lbl_filename.setText("Insira valores numéricos válidos no modo Manual")
                 return
 
-        # garante floats
-        try:
-            kp = float(self.kp_input.text()); ti = float(self.ti_input.text()); td = float(self.td_input.text())
-        except Exception:
-            kp = ti = td = 0.0
-
         # define vetor de tempo T
         if self.current_data and "tiempo" in self.current_data:
             T = np.asarray(self.current_data["tiempo"])
@@ -335,7 +692,7 @@ class MainWindow(QMainWindow):
             T = np.linspace(0, 150, 500)
 
         params = self.ident_params or {"k":1.0,"tau":1.0,"theta":0.0}
-        model = SystemModel(params["k"], params["tau"], params["theta"], pade_order=10)
+        plant = (params["k"], params["tau"], params["theta"])
 
         # decide sinal de entrada U com base no SP (UI) ou no dataset
         U = None
@@ -365,41 +722,94 @@ class MainWindow(QMainWindow):
         elif sp_val_user is not None and dataset_amp is None:
             U = np.ones_like(T, dtype=float) * float(sp_val_user)
         else:
-            # usa sinal do dataset (interpolado para grid T se necessário)
+            # usa sinal do dataset (já no grid T desde a leitura, ver _on_file_loaded)
             if hasattr(self, 'current_u') and self.current_u is not None:
-                cu = np.asarray(self.current_u, dtype=float)
-                if cu.shape == T.shape:
-                    U = cu
-                else:
-                    try:
-                        U = np.interp(T, np.linspace(T.min(), T.max(), num=cu.size), cu)
-                    except Exception:
-                        U = np.ones_like(T, dtype=float) * (float(dataset_amp) if dataset_amp is not None else 1.0)
+                U = self.current_u
             else:
                 U = np.ones_like(T, dtype=float) * (float(dataset_amp) if dataset_amp is not None else 1.0)
 
-        # simulação
+        sp_val = sp_val_user if sp_val_user is not None else (dataset_amp if dataset_amp is not None else 1.0)
+        T_opt = T if (self.current_data and "tiempo" in self.current_data) else None
+        if method == "Otimizado":
+            self.lbl_status_pid.setText("Otimizando ganhos...")
+        scenario = self._selected_scenario(sp_val, plant)
+        self.tasks.submit("tune", _stored, "tune",
+                          lambda: _tune_job(plant, gains, method, criterion, T, U, T_opt, scenario),
+                          plant, gains, method, criterion, array_key(T, U, T_opt), scenario, label="Sintonia",
+                          on_done=lambda result: self._on_tuned(result, U, sp_val),
+                          on_error=lambda e: self.lbl_status_pid.setText(f"Erro na sintonia: {e}"))
+
+    def _on_scenario_chosen(self, name):
+        """'Carregar cenários' abre um JSON e acrescenta os cenários à lista."""
+        if name != LOAD_SCENARIOS:
+            return
+        fname, _ = QFileDialog.getOpenFileName(self, "Cenários", ".", "JSON Files (*.json)")
+        self.scenario_combo.setCurrentIndex(0)
+        if not fname:
+            return
         try:
-            t_cl, y_cl = model.simulate_step_closedloop(kp, ti, td, T, U=U)
-        except TypeError:
+            specs = load_scenarios(fname)
+        except Exception as e:
+            self.lbl_status_pid.setText(f"Erro ao ler cenários: {e}")
+            return
+        for i, spec in enumerate(specs):
+            name = spec.get("name") or f"{os.path.basename(fname)} #{i + 1}"
+            if name not in self.custom_scenarios:
+                self.scenario_combo.insertItem(self.scenario_combo.count() - 1, name)
+            self.custom_scenarios[name] = spec
+        self.scenario_combo.setCurrentText(specs[0].get("name") or f"{os.path.basename(fname)} #1")
+
+    def _selected_scenario(self, sp, plant):
+        """Especificação do cenário escolhido (None = degrau do dataset/SP)."""
+        name = self.scenario_combo.currentText()
+        if name in self.custom_scenarios:
+            return self.custom_scenarios[name]
+        noise = 0.0
+        if self.current_data and "params" in self.current_data:
             try:
-                t_cl, y_cl = model.simulate_step_closedloop(kp, ti, td, T)
-            except Exception:
-                t_cl = T; y_cl = np.zeros_like(T)
-        except Exception:
-            t_cl = T; y_cl = np.zeros_like(T)
+                noise = float(self.current_data["params"].get("ruido") or 0.0)
+            except (TypeError, ValueError):
+                noise = 0.0
+        for spec in standard_scenarios(sp, plant[1], plant[2], noise_std=noise):
+            if spec["name"] == name:
+                return spec
+        return None
+
+    def _on_tuned(self, result, U, sp_val):
+        kp, ti, td = result["gains"]
+        if result["method"] is not None:
+            self.kp_input.setText(f"{kp:.4f}"); self.ti_input.setText(f"{ti:.4f}"); self.td_input.setText(f"{td:.4f}")
+            self.kp_input.setReadOnly(True); self.ti_input.setReadOnly(True); self.td_input.setReadOnly(True)
+        info = result["info"]
+        if info is not None:
+            self.lbl_status_pid.setText(
+                f"{info['criterion']}: custo={info['cost']:.4g} | {info['evals']} avaliações em "
+                f"{info['elapsed']*1000:.0f} ms ({info['evals_per_s']:.0f}/s) | partida {info['start']}")
 
-        t_cl = np.asarray(t_cl); y_cl = np.asarray(y_cl)
+        t_cl = result["t"]; y_cl = result["y"]; m = result["metrics"]
+        scenario = result.get("scenario")
 
         # plot no PID plot (apenas)
         self.plot_pid.clear()
         self.plot_pid.plot(t_cl, y_cl, name="Fechada (PID)", color="#333333", linewidth=1.6)
-        # draw setpoint as horizontal line (based on chosen SP or dataset)
-        sp_val = sp_val_user if sp_val_user is not None else (dataset_amp if dataset_amp is not None else 1.0)
-        try:
-            self.plot_pid.plot(t_cl, np.ones_like(t_cl) * float(sp_val), name="Setpoint (SP)", color='#1f77b4', linewidth=1.0)
-        except Exception:
-            pass
+        if scenario is not None:
+            self.plot_pid.plot(t_cl, scenario["r"], name="Referência", color='#1f77b4', linewidth=1.0)
+            if np.any(scenario["d"]):
+                self.plot_pid.plot(t_cl, scenario["d"], name="Perturbação (entrada)", color='#d62728', linewidth=1.0)
+            for seg in scenario["segments"][1:]:
+                self.plot_pid.add_vline(seg["t0"])
+            fmt = lambda v: f"{v:.3g}" if np.isfinite(v) else "-"
+            prefix = self.lbl_status_pid.text() + "\n" if info is not None else ""
+            self.lbl_status_pid.setText(prefix + f"{scenario['name']} | IAE total = {scenario['iae']:.4g}\n" + "\n".join(
+                f"{seg['label']}: IAE={fmt(seg['iae'])} ts={fmt(seg['ts'])} s pico={fmt(seg['peak_error'])}"
+                + (f" Mp={fmt(100 * seg['mp'])}%" if np.isfinite(seg['mp']) else "")
+                for seg in scenario["segments"]))
+        else:
+            # draw setpoint as horizontal line (based on chosen SP or dataset)
+            try:
+                self.plot_pid.plot(t_cl, np.ones_like(t_cl) * float(sp_val), name="Setpoint (SP)", color='#1f77b4', linewidth=1.0)
+            except Exception:
+                pass
         # set axis labels
         try:
             self.plot_pid.ax.set_xlabel('Tempo (s)')
@@ -408,100 +818,394 @@ class MainWindow(QMainWindow):
             pass
         self.plot_pid.autoscale()
 
-        # métricas: compute steady value from last 5% and use thresholds based on steady_value
+        # métricas já calculadas no worker (kernel único de utils.metrics)
+        t_arr = np.asarray(t_cl, dtype=float).ravel()
+        y_arr = np.asarray(y_cl, dtype=float).ravel()
+        nz = lambda v: float(v) if np.isfinite(v) else 0.0
+        tr_val = nz(m["tr"]); ts_val = nz(m["ts"])
+        mp_val = nz(m["mp"]) * 100.0
+        # erro em regime permanente (entrada final - steady)
         try:
-            y_arr = np.asarray(y_cl).ravel()
-            t_arr = np.asarray(t_cl).ravel()
-            n = len(y_arr)
-            last_n = max(1, int(0.05 * n))
-            steady_value = float(np.mean(y_arr[-last_n:]))
+            ess_val = float(U[-1]) - m["steady"] if U is not None else 0.0
+        except Exception:
+            ess_val = 0.0
 
-            # rise time between 10% and 90% of steady_value (use absolute fractions like the working example)
-            try:
-                low_thresh = 0.1 * steady_value
-                high_thresh = 0.9 * steady_value
-                idx_low = np.where(y_arr >= low_thresh)[0][0]
-                idx_high = np.where(y_arr >= high_thresh)[0][0]
-                tr_val = float(t_arr[idx_high] - t_arr[idx_low])
-            except Exception:
-                tr_val = 0.0
+        # update UI fields
+        self.tr_field.setText(f"{tr_val:.4f}")
+        self.ts_field.setText(f"{ts_val:.4f}")
+        self.mp_field.setText(f"{mp_val:.4f}")
 
-            # settling time (2%) — find last sample outside ±2% and take its time (fallback to end)
-            ts_val = 0.0
-            try:
-                low = steady_value * (1 - 0.02)
-                high = steady_value * (1 + 0.02)
-                idx_out = np.where((y_arr < low) | (y_arr > high))[0]
-                if idx_out.size == 0:
-                    ts_val = float(t_arr[0])
-                else:
-                    last_out = int(idx_out[-1])
-                    # match working example: return time at last out-of-bound sample
-                    ts_val = float(t_arr[last_out])
-            except Exception:
-                ts_val = 0.0
+        # markers: rise time point (fim da subida, cruzamento interpolado) and peak
+        if tr_val > 0 and np.isfinite(m["t_high"]):
+            y_high = m["y0"] + 0.9 * (m["final"] - m["y0"])
+            self.plot_pid.add_point(m["t_high"], y_high, label=f"tr={tr_val:.2f}s", size=8)
+        if y_arr.size > 0 and np.isfinite(m["tp"]):
+            self.plot_pid.add_point(m["tp"], float(np.interp(m["tp"], t_arr, y_arr)), label=f"Mp={mp_val:.2f}%")
+        self._plot_frequency((kp, ti, td))
 
-            # maximum overshoot as percent
-            try:
-                if abs(steady_value) < 1e-9:
-                    mp_val = 0.0
-                else:
-                    mp_val = (float(np.max(y_arr)) - steady_value) / abs(steady_value) * 100.0
-            except Exception:
-                mp_val = 0.0
+    def run_schedule(self):
+        """Ganhos por ponto de operação a partir dos segmentos da identificação segmentada."""
+        segments = (self.ident_params or {}).get("segments") or []
+        points = points_from_segments(segments)
+        if len(points) < 2:
+            self.lbl_status_pid.setText("Escalonamento requer a identificação \"Segmentado (vários degraus)\" "
+                                        "num registro com degraus em ao menos dois níveis.")
+            return
+        method = self.method_combo.currentText()
+        if method == "Otimizado":
+            method = f"{self.criterion_combo.currentText()}-OPT"
+        self.lbl_status_pid.setText(f"Escalonando ganhos ({method}) em {len(points)} pontos de operação...")
+        self.tasks.submit("schedule", _schedule_job, points, method, label="Escalonamento de ganhos",
+                          cooperative=True, on_done=self._on_scheduled,
+                          on_error=lambda e: self.lbl_status_pid.setText(f"Erro no escalonamento: {e}"))
 
-            # erro em regime permanente (entrada final - steady)
-            try:
-                ess_val = float(U[-1]) - steady_value if U is not None else 0.0
-            except Exception:
-                ess_val = 0.0
+    def _on_scheduled(self, result):
+        if result is None:
+            return
+        self.schedule, v = result
+        self.btn_export_schedule.setEnabled(True)
+        self.plot_pid.clear()
+        self.plot_pid.plot(v["t"], v["y"], name="Escalonado", color="#333333", linewidth=1.6)
+        self.plot_pid.plot(v["t"], v["y_fixed"], name="Ganhos fixos", color="#ff7f0e", linewidth=1.0)
+        self.plot_pid.plot(v["t"], v["r"], name="Referência", color="#1f77b4", linewidth=1.0)
+        for seg in v["segments"]:
+            self.plot_pid.add_vline(seg["t0"])
+        self.plot_pid.autoscale()
+        kp, ti, td = v["fixed_gains"]
+        rows = "\n".join(f"op={r['op']:.4g}: Kp={r['kp']:.4f} Ti={r['ti']:.4f} Td={r['td']:.4f}"
+                         for r in self.schedule.rows())
+        self.lbl_status_pid.setText(
+            f"{self.schedule.method}: IAE escalonado = {v['iae']:.4g} | fixo (Kp={kp:.4f} Ti={ti:.4f} Td={td:.4f}) = "
+            f"{v['iae_fixed']:.4g}\n{rows}\n" + "\n".join(
+                f"{s['label']}: IAE={s['iae']:.3g} (fixo {f['iae']:.3g})"
+                for s, f in zip(v["segments"], v["segments_fixed"])))
+
+    def export_schedule(self):
+        if self.schedule is None:
+            return
+        fname, _ = QFileDialog.getSaveFileName(self, "Salvar tabela de ganhos", "tabela_ganhos.csv",
+                                               "CSV (*.csv);;JSON (*.json)")
+        if not fname:
+            return
+        if not fname.lower().endswith(SCHEDULE_FORMATS):
+            fname += ".csv"
+        try:
+            self.schedule.save(fname)
+            self.lbl_filename.setText(f"Tabela salva: {os.path.basename(fname)}")
+        except Exception as e:
+            self.lbl_status_pid.setText(f"Erro ao salvar a tabela: {e}")
 
+    def run_frequency(self):
+        """Bode/Nyquist com os ganhos digitados na aba Controle PID."""
+        try:
+            gains = (float(self.kp_input.text()), float(self.ti_input.text()), float(self.td_input.text()))
         except Exception:
-            tr_val = 0.0; ts_val = 0.0; mp_val = 0.0; steady_value = float(sp_val) if sp_val is not None else 0.0; ess_val = 0.0
+            self.lbl_status_freq.setText("Insira valores numéricos válidos na aba Controle PID.")
+            return
+        self._plot_frequency(gains)
 
-        # update UI fields
-        self.tr_field.setText(f"{tr_val:.4f}")
-        self.ts_field.setText(f"{ts_val:.4f}")
-        self.mp_field.setText(f"{mp_val:.4f}")
+    def _plot_frequency(self, gains):
+        """Resposta em frequência da malha aberta PID + FOPDT identificada (atraso exato)."""
+        if not self.ident_params:
+            self.lbl_status_freq.setText("Identifique primeiro.")
+            return
+        k = self.ident_params["k"]; tau = self.ident_params["tau"]; theta = self.ident_params["theta"]
+        if gains[0] == 0:
+            self.lbl_status_freq.setText("Kp nulo: sem malha para analisar.")
+            return
+        w, mag_db, phase, L = bode(SystemModel(k, tau, theta), gains,
+                                   w=frequency_grid(tau + theta, span=BODE_SPAN))
+        m = loop_analysis(k, tau, theta, gains)
+        show = lambda v: f"{v:.4f}" if np.isfinite(v) else "∞"
+        self.gm_field.setText(show(m["gm_db"])); self.pm_field.setText(show(m["pm"]))
+        self.ms_field.setText(show(m["ms"])); self.bw_field.setText(show(m["bandwidth"]))
+        self.lbl_status_freq.setText(f"Kp={gains[0]:.4f} Ti={gains[1]:.4f} Td={gains[2]:.4f}"
+                                     + ("" if m["pm"] > 0 and m["gm"] > 1 else " | malha instável"))
 
-        # markers: rise time point and peak
+        for plot, values, ylabel in ((self.plot_bode_mag, mag_db, "dB"), (self.plot_bode_phase, phase, "graus")):
+            plot.clear()
+            plot.plot(w, values, name="L(jω)", color='#333333', linewidth=1.4)
+            plot.ax.set_xscale('log')
+            plot.ax.set_xlabel('ω (rad/s)'); plot.ax.set_ylabel(ylabel)
+            plot.autoscale()
+        if np.isfinite(m["wgc"]):
+            self.plot_bode_mag.add_vline(m["wgc"], label="ωgc")
+        if np.isfinite(m["wpc"]):
+            self.plot_bode_phase.add_vline(m["wpc"], label="ωpc")
+
+        self.plot_nyquist.clear()
+        self.plot_nyquist.plot(L.real, L.imag, name="L(jω)", color='#333333', linewidth=1.4)
+        arc = np.linspace(0.0, 2.0 * np.pi, 200)
+        if np.isfinite(m["ms"]) and m["ms"] > 0:
+            r = 1.0 / m["ms"]
+            self.plot_nyquist.plot(-1.0 + r * np.cos(arc), r * np.sin(arc), name=f"1/Ms = {r:.3f}",
+                                   color='#d62728', linewidth=1.0)
+        self.plot_nyquist.add_point(-1.0, 0.0, label="-1", size=6, brush='red')
+        self.plot_nyquist.ax.set_xlabel('Re'); self.plot_nyquist.ax.set_ylabel('Im')
+        self.plot_nyquist.ax.set_xlim(-3.0, 1.0); self.plot_nyquist.ax.set_ylim(-3.0, 1.0)
+        self.plot_nyquist.draw_idle()
+
+    def run_sweep(self):
+        """Dispara a varredura de ganhos em segundo plano (pool de processos).
+
+        Clicar de novo reinicia a varredura com os ganhos/SP atuais.
+        """
+        if not self.ident_params:
+            self.lbl_status_map.setText("Identifique primeiro.")
+            return
+        k = self.ident_params["k"]; tau = self.ident_params["tau"]; theta = self.ident_params["theta"]
+        if self.current_data and "tiempo" in self.current_data:
+            T = np.asarray(self.current_data["tiempo"], dtype=float)
+        else:
+            T = default_time_grid(tau, theta)
         try:
-            if tr_val and tr_val > 0 and len(t_arr) > 0:
-                # mark the time corresponding to the end of rise (t at idx_high)
-                idx_tr_mark = int(np.argmin(np.abs(t_arr - (t_arr[0] + tr_val)))) if len(t_arr) > 0 else 0
-                # safer: use idx_high if available
-                try:
-                    idx_tr_mark = int(idx_high)
-                except Exception:
-                    pass
-                if 0 <= idx_tr_mark < len(t_arr):
-                    self.plot_pid.add_point(t_arr[idx_tr_mark], y_arr[idx_tr_mark], label=f"tr={tr_val:.2f}s", size=8)
+            center = (float(self.kp_input.text()), float(self.ti_input.text()), float(self.td_input.text()))
+            if center[0] <= 0 or center[1] <= 0:
+                center = None
         except Exception:
-            pass
+            center = None
         try:
-            if (y_arr is not None) and (len(y_arr) > 0):
-                idx_peak = int(np.argmax(y_arr))
-                if 0 <= idx_peak < len(t_arr):
-                    self.plot_pid.add_point(t_arr[idx_peak], y_arr[idx_peak], label=f"Mp={mp_val:.2f}%")
+            sp = float(self.sp_input.text()) or 1.0
         except Exception:
-            pass
+            sp = 1.0
+        self.lbl_status_map.setText("Varrendo ganhos...")
+        self.tasks.submit("sweep", sweep_pid, k, tau, theta, T, center=center, sp=sp,
+                          label="Varredura", cooperative=True, on_done=self._on_sweep_done,
+                          on_error=lambda e: self.lbl_status_map.setText(f"Erro na varredura: {e}"))
+
+    def _on_sweep_done(self, sweep_results):
+        if sweep_results is None:
+            return
+        self.sweep_results = sweep_results
+        results, _ = self.sweep_results
+        self.lbl_status_map.setText(f"{len(results)} pontos avaliados.")
+        self._plot_sweep()
+        self.tabs.setCurrentWidget(self.tab_map)
+
+    def _plot_sweep(self):
+        if self.sweep_results is None:
+            return
+        results, grid_shape = self.sweep_results
+        metric = self.map_metric_combo.currentText()
+        kp_axis, ti_axis, Z = sweep_slice(results, grid_shape, metric=metric)
+        td_mid = results.reshape(grid_shape)[0, 0, grid_shape[2] // 2]["td"]
+        self.plot_map.clear()
+        self.plot_map.heatmap(kp_axis, ti_axis, Z, label=metric, logx=True, logy=True)
+        self.plot_map.ax.set_xlabel('Kp')
+        self.plot_map.ax.set_ylabel('Ti')
+        self.plot_map.ax.set_title(f"{metric} (Td = {td_mid:.4f})")
+        # melhor ponto do plano exibido
+        if np.any(np.isfinite(Z)) and metric in ("iae", "ts", "tr"):
+            i, j = np.unravel_index(np.nanargmin(Z), Z.shape)
+            self.plot_map.add_point(kp_axis[j], ti_axis[i], label="mín.", size=6, brush='red')
+        self.plot_map.draw_idle()
+
+    def run_robustness(self):
+        """Monte Carlo dos ganhos atuais sobre plantas sorteadas em torno do modelo."""
+        if not self.ident_params:
+            self.lbl_status_robust.setText("Identifique primeiro.")
+            return
+        k = self.ident_params["k"]; tau = self.ident_params["tau"]; theta = self.ident_params["theta"]
+        try:
+            gains = (float(self.kp_input.text()), float(self.ti_input.text()), float(self.td_input.text()))
+            if gains[0] <= 0:
+                raise ValueError
+        except Exception:
+            gains = itae_from_params(k, tau, theta)
+        try:
+            n = int(self.robust_samples.text()); spread = float(self.robust_spread.text())
+        except Exception:
+            self.lbl_status_robust.setText("Insira valores numéricos válidos.")
+            return
+        dist = ROBUST_DISTRIBUTIONS[self.robust_dist.currentText()]
+        cov = self.ident_params.get("cov")
+        if dist == "cov" and cov is None:
+            self.lbl_status_robust.setText("Covariância indisponível: identifique por Mínimos Quadrados.")
+            return
+        if self.current_data and "tiempo" in self.current_data:
+            T = np.asarray(self.current_data["tiempo"], dtype=float)
+        else:
+            T = default_time_grid(tau, theta)
+        try:
+            sp = float(self.sp_input.text()) or 1.0
+        except Exception:
+            sp = 1.0
+        self.lbl_status_robust.setText(f"Simulando {n} plantas...")
+        self.tasks.submit("robustness", monte_carlo, k, tau, theta, gains, T, n=n, spread=spread,
+                          dist=dist, cov=cov, sp=sp, label="Análise de robustez", cooperative=True,
+                          on_done=lambda result: self._on_robustness_done(result, gains),
+                          on_error=lambda e: self.lbl_status_robust.setText(f"Erro na análise: {e}"))
+
+    def _on_robustness_done(self, result, gains):
+        if result is None:
+            return
+        t = result["t"]; env = result["envelope"]
+        self.plot_robust.clear()
+        if env:
+            lo, hi = PERCENTILES[0], PERCENTILES[-1]
+            self.plot_robust.add_band(t, env[lo], env[hi], color='#1f77b4', alpha=0.2, label=f"P{lo}–P{hi}")
+            if len(PERCENTILES) > 3:
+                q1, q3 = PERCENTILES[1], PERCENTILES[-2]
+                self.plot_robust.add_band(t, env[q1], env[q3], color='#1f77b4', alpha=0.35, label=f"P{q1}–P{q3}")
+        self.plot_robust.plot(t, result["nominal"], name="Nominal", color='#d62728', linewidth=1.5)
+        self.plot_robust.autoscale()
+        bands = result["bands"]
+        for i, name in enumerate(ROBUST_METRICS):
+            for j, p in enumerate(PERCENTILES):
+                v = bands[name][p]
+                if name == "mp":
+                    v *= 100.0
+                self.robust_table.setItem(i, j, QTableWidgetItem(f"{v:.4g}"))
+        kp, ti, td = gains
+        self.lbl_status_robust.setText(
+            f"{len(result['samples'])} plantas | estáveis: {100 * result['stable_fraction']:.1f}% | "
+            f"Kp={kp:.4f} Ti={ti:.4f} Td={td:.4f} (mp em %, pm em graus)")
+
+    # --- tempo real ---
+    def start_stream(self):
+        self.stop_stream()
+        try:
+            self.stream = StreamSession(open_source(self.stream_url.text().strip()))
+        except Exception as e:
+            self.lbl_stream.setText(f"Erro ao abrir a fonte: {e}")
+            return
+        self._stream_estimate = None
+        self.plot_stream.clear()
+        self.btn_stream_start.setEnabled(False); self.btn_stream_stop.setEnabled(True)
+        self.lbl_stream.setText("Aguardando amostras...")
+        self._stream_poll_timer.start()
+        self._stream_frame_timer.start()
+
+    def stop_stream(self):
+        self._stream_poll_timer.stop()
+        self._stream_frame_timer.stop()
+        if self.stream is not None:
+            try:
+                self.stream.close()
+            except Exception:
+                pass
+            self._draw_stream()
+            self.stream = None
+        self.btn_stream_start.setEnabled(True); self.btn_stream_stop.setEnabled(False)
+
+    def _poll_stream(self):
+        # leitura não bloqueante; o custo do estimador é O(1) por amostra
+        try:
+            self.stream.poll()
+        except Exception as e:
+            self.lbl_stream.setText(f"Erro na aquisição: {e}")
+            self.stop_stream()
+            return
+        if self.stream.source.closed:
+            self.lbl_stream.setText("Fonte encerrada.")
+            self.stop_stream()
+
+    def _draw_stream(self):
+        """Atualiza gráfico e estimativa na taxa fixa STREAM_FPS."""
+        if self.stream is None or len(self.stream.buffer) == 0:
+            return
+        t, u, y = self.stream.arrays()
+        self.plot_stream.plot(t, u, name="Entrada (u)", color='#1f77b4', linewidth=1.0)
+        self.plot_stream.plot(t, y, name="Saída (y)", color='#111111', linewidth=1.2)
+        est = self.stream.estimate()
+        if est is not None:
+            self._stream_estimate = est
+            self.k_stream.setText(f"{est['k']:.4f}"); self.tau_stream.setText(f"{est['tau']:.4f}"); self.theta_stream.setText(f"{est['theta']:.4f}")
+            self.btn_stream_use.setEnabled(True)
+        self.plot_stream.autoscale()
+        total = self.stream.buffer.total
+        t_span = float(t[-1] - t[0]) if t.size > 1 else 0.0
+        self.lbl_stream.setText(f"{total} amostras recebidas | janela {t_span:.1f} s"
+                                + (f" | dt = {self.stream.dt:.4g} s" if self.stream.dt else ""))
+
+    def use_stream_model(self):
+        """Copia a estimativa atual para a identificação (base da sintonia)."""
+        est = self._stream_estimate
+        if est is None:
+            return
+        self.ident_params = {"k": est["k"], "tau": est["tau"], "theta": est["theta"], "eqm": est["eqm"], "model": "FOPDT (RLS)"}
+        self.k_field.setText(f"{est['k']:.4f}"); self.tau_field.setText(f"{est['tau']:.4f}")
+        self.theta_field.setText(f"{est['theta']:.4f}"); self.eqm_field.setText(f"{est['eqm']:.4f}")
+        self.lbl_ci.setText("Modelo estimado em tempo real (RLS).")
+        self.tabs.setCurrentWidget(self.tab_pid)
+
+    # --- desempenho ---
+    def _on_tab_changed(self, index):
+        # a tabela só é atualizada periodicamente enquanto a aba está visível
+        if self.tabs.widget(index) is self.tab_perf:
+            self._refresh_perf()
+            self._perf_timer.start()
+        else:
+            self._perf_timer.stop()
+
+    def _toggle_profiling(self, on):
+        if on:
+            profiling.enable(memory=self.chk_profile_mem.isChecked())
+        else:
+            profiling.disable()
+
+    def _refresh_perf(self):
+        rows = list(profiling.stats().items())
+        self.perf_table.setRowCount(len(rows))
+        for i, (name, st) in enumerate(rows):
+            mem = f"{st['max_bytes'] / 2 ** 20:.2f}" if st["max_bytes"] else "-"
+            values = (name, str(st["calls"]), f"{st['total_s'] * 1000:.1f}", f"{st['mean_s'] * 1000:.2f}",
+                      f"{st['max_s'] * 1000:.2f}", mem)
+            for j, v in enumerate(values):
+                item = QTableWidgetItem(v)
+                if j:
+                    item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
+                self.perf_table.setItem(i, j, item)
+        self.lbl_cache.setText("Caches: " + " | ".join(
+            f"{name}: {c['size']}/{c['maxsize']} itens, {100 * c['hit_rate']:.0f}% acertos ({c['hits']}/{c['hits'] + c['misses']})"
+            for name, c in cache_stats().items()))
+        store = default_store()
+        if store is not None:
+            st = store.stats()
+            self.lbl_cache.setText(self.lbl_cache.text() + (
+                f"\nArmazenamento ({st['path']}): {st['size']} resultados, {st['bytes'] / 2 ** 20:.2f} MiB, "
+                f"{100 * st['hit_rate']:.0f}% acertos nesta sessão"))
+
+    def _export_profile(self, dump):
+        fname, _ = QFileDialog.getSaveFileName(self, "Salvar perfil", "perfil.json", "JSON Files (*.json)")
+        if not fname:
+            return
+        try:
+            dump(fname)
+            self.lbl_status.setText(f"Perfil salvo: {os.path.basename(fname)}")
+        except Exception as e:
+            self.lbl_status.setText(f"Erro ao exportar perfil: {e}")
+
+    def closeEvent(self, event):
+        self.stop_stream()
+        super().closeEvent(event)
 
     def reset_identification(self):
+        self.tasks.cancel("load"); self.tasks.cancel("identification")
         self.plot_id.clear()
         self.k_field.setText(""); self.tau_field.setText(""); self.theta_field.setText(""); self.eqm_field.setText("")
+        self.lbl_ci.setText("")
         self.lbl_filename.setText("Selecione um dataset.")
         self.current_data = None; self.ident_params = None
-        self.current_t = None; self.current_u = None; self.current_y = None
+        self.current_t = None; self.current_u = None; self.current_y = None; self.timebase = None
         try:
             self.sp_input.setText("0.0000")
         except Exception:
             pass
 
     def reset_pid(self):
+        self.tasks.cancel("tune"); self.tasks.cancel("robustness"); self.tasks.cancel("schedule")
+        self.schedule = None
+        self.btn_export_schedule.setEnabled(False)
         self.plot_pid.clear()
+        for plot in (self.plot_bode_mag, self.plot_bode_phase, self.plot_nyquist):
+            plot.clear()
+        for field in (self.gm_field, self.pm_field, self.ms_field, self.bw_field):
+            field.setText("")
         self.kp_input.setText("0.0000"); self.ti_input.setText("0.0000"); self.td_input.setText("0.0000")
         self.kp_input.setReadOnly(False); self.ti_input.setReadOnly(False); self.td_input.setReadOnly(False)
         self.tr_field.setText("0.0000"); self.ts_field.setText("0.0000"); self.mp_field.setText("0.0000")
+        self.lbl_status_pid.setText("")
         try:
             self.sp_input.setText("0.0000")
         except Exception:
@@ -10,9 +10,16 @@ used by the app:
 - add_point(x, y, label=None, size=8, brush=None)
 - add_text(x, y, label)
 - autoscale(margin=0.05)
+- heatmap(x, y, Z, label=None, cmap='viridis', logx=False, logy=False)
 
 This keeps the rest of the application code unchanged while providing
 static, non-interactive plots that are rendered once when drawn.
+
+Long curves are drawn through a min/max decimation pyramid
+(ui.decimation): only ~2 points per pixel reach Matplotlib and the
+visible range is re-decimated whenever the x limits change. clear()
+hides and recycles the Line2D objects, so re-plotting a curve with the
+same name only updates its data (set_data).
 """
 
 from PyQt5.QtWidgets import QSizePolicy
@@ -30,8 +37,11 @@ if FigureCanvas is None:
     raise ImportError("Could not import a Qt FigureCanvas from Matplotlib backends")
 from matplotlib.figure import Figure
 import matplotlib.lines as mlines
+from matplotlib.collections import PolyCollection
 import matplotlib.pyplot as plt
 import numpy as np
+from utils.profiling import profiled
+from ui.decimation import MinMaxPyramid, DECIMATE_MIN_POINTS
 
 
 class PlotWidget(FigureCanvas):
@@ -41,8 +51,13 @@ class PlotWidget(FigureCanvas):
         self.setParent(parent)
         self.figure = fig
         self.ax = fig.add_subplot(111)
-        self._curves = {}  # name -> Line2D
+        self._curves = {}  # name -> Line2D (inclui as ocultas por clear(), reaproveitadas)
+        self._active = []  # nomes das curvas visíveis, em ordem de plotagem
+        self._pyramids = {}  # name -> MinMaxPyramid das curvas decimadas
         self._markers = []
+        self._colorbar = None
+        self._mesh = None
+        self._legend_dirty = False
         self._enable_legend = bool(enable_legend)
         if title:
             try:
@@ -54,12 +69,51 @@ class PlotWidget(FigureCanvas):
         self.ax.set_facecolor('white')
         self.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
         self.updateGeometry()
+        self.ax.callbacks.connect('xlim_changed', self._on_xlim_changed)
+
+    @profiled("PlotWidget.draw")
+    def draw(self):
+        # redesenho efetivo (draw_idle agenda esta chamada); a legenda é
+        # refeita uma vez aqui em vez de a cada plot()
+        if self._legend_dirty:
+            self._update_legend()
+        super().draw()
+
+    def _update_legend(self):
+        self._legend_dirty = False
+        leg = self.ax.get_legend()
+        if leg is not None:
+            leg.remove()
+        bands = [a for a in self._markers
+                 if isinstance(a, PolyCollection) and not str(a.get_label()).startswith('_')]
+        if self._enable_legend and (self._active or bands):
+            try:
+                self.ax.legend(handles=[self._curves[n] for n in self._active] + bands)
+            except Exception:
+                pass
+
+    def _pixels(self):
+        try:
+            return max(int(self.ax.bbox.width), 100)
+        except Exception:
+            return 1000
+
+    def _on_xlim_changed(self, ax):
+        """Re-decima as curvas longas para o novo intervalo visível."""
+        if not self._pyramids:
+            return
+        x0, x1 = ax.get_xlim()
+        pixels = self._pixels()
+        for name, pyr in self._pyramids.items():
+            self._curves[name].set_data(*pyr.view(x0, x1, pixels))
 
     def plot(self, x, y, name=None, pen=None, clear_legend=False, **kwargs):
         """Plot x,y on the static Matplotlib axes.
 
-        name: optional curve name used for legend management.
+        name: optional curve name used for legend management. Plotting an
+        existing name (even one hidden by clear()) reuses its Line2D.
         pen: ignored (kept for API compatibility). Use kwargs for color/linestyle.
+        Curves longer than DECIMATE_MIN_POINTS with increasing x are decimated.
         """
         try:
             x = np.asarray(x, dtype=float)
@@ -67,48 +121,73 @@ class PlotWidget(FigureCanvas):
         except Exception:
             x = np.array(list(x), dtype=float)
             y = np.array(list(y), dtype=float)
-        if name is None:
-            name = f"curve_{len(self._curves)}"
         if clear_legend:
             self.clear()
-        # remove existing curve with same name
-        if name in self._curves:
-            ln = self._curves.pop(name)
-            try:
-                ln.remove()
-            except Exception:
-                pass
+        if name is None:
+            name = f"curve_{len(self._active)}"
         # accept color and linewidth from kwargs to mimic pen
         color = kwargs.pop('color', None)
         linewidth = kwargs.pop('linewidth', 2)
-        line, = self.ax.plot(x, y, label=name if self._enable_legend else None, color=color, linewidth=linewidth, **kwargs)
-        self._curves[name] = line
-        if self._enable_legend:
-            try:
-                # only create legend if there are labeled artists
-                handles, labels = self.ax.get_legend_handles_labels()
-                if any([lab for lab in labels if not str(lab).startswith('_') and str(lab) != '']):
-                    self.ax.legend()
-            except Exception:
-                pass
+
+        self._pyramids.pop(name, None)
+        if x.size > DECIMATE_MIN_POINTS and x.shape == y.shape and MinMaxPyramid.supports(x):
+            pyr = MinMaxPyramid(x, y)
+            self._pyramids[name] = pyr
+            # curva inteira: o autoscale vê a extensão completa; o zoom re-decima
+            xd, yd = pyr.view(pixels=self._pixels())
+        else:
+            xd, yd = x, y
+
+        line = self._curves.get(name)
+        if line is None:
+            line, = self.ax.plot(xd, yd, color=color, linewidth=linewidth, **kwargs)
+            self._curves[name] = line
+        else:
+            line.set_data(xd, yd)
+            line.set_linewidth(linewidth)
+            line.set_color(color if color is not None else line.get_color())
+            if kwargs:
+                line.set(**kwargs)
+            line.set_visible(True)
+        line.set_label(name if self._enable_legend else '_' + name)
+        if name in self._active:
+            self._active.remove(name)
+        self._active.append(name)
+        self._legend_dirty = self._enable_legend
         self.draw_idle()
         return line
 
     def clear(self):
-        try:
-            self.ax.cla()
-        except Exception:
-            pass
-        self._curves.clear()
-        # clear markers list
+        """Oculta as curvas (reaproveitadas no próximo plot) e remove marcadores/mapas."""
+        for line in self._curves.values():
+            line.set_visible(False)
+            line.set_label('_hidden')
+        self._active.clear()
+        self._pyramids.clear()
+        for artist in self._markers:
+            try:
+                artist.remove()
+            except Exception:
+                pass
         self._markers.clear()
-        if self._enable_legend:
+        if self._colorbar is not None:
             try:
-                leg = self.ax.get_legend()
-                if leg is not None:
-                    leg.remove()
+                self._colorbar.remove()
             except Exception:
                 pass
+            self._colorbar = None
+        if self._mesh is not None:
+            try:
+                self._mesh.remove()
+            except Exception:
+                pass
+            self._mesh = None
+            self.ax.set_xscale('linear')
+            self.ax.set_yscale('linear')
+        leg = self.ax.get_legend()
+        if leg is not None:
+            leg.remove()
+        self._legend_dirty = False
         self.draw_idle()
 
     def add_vline(self, x, label=None, pen=None):
@@ -137,6 +216,19 @@ class PlotWidget(FigureCanvas):
         except Exception:
             return None
 
+    def add_band(self, x, lo, hi, color='C0', alpha=0.25, label=None):
+        """Faixa preenchida entre lo(x) e hi(x) (ex.: envelope de percentis)."""
+        try:
+            band = self.ax.fill_between(np.asarray(x, dtype=float), np.asarray(lo, dtype=float),
+                                        np.asarray(hi, dtype=float), color=color, alpha=alpha,
+                                        linewidth=0, label=label)
+            self._markers.append(band)
+            self._legend_dirty = self._enable_legend
+            self.draw_idle()
+            return band
+        except Exception:
+            return None
+
     def add_text(self, x, y, label):
         try:
             txt = self.ax.text(float(x), float(y), str(label), ha='right', va='top')
@@ -149,7 +241,9 @@ class PlotWidget(FigureCanvas):
     def autoscale(self, margin=0.05):
         # autoscale based on existing curves
         try:
-            self.ax.relim()
+            self.ax.relim(visible_only=True)
+            # set_xlim/set_ylim desligam o autoscale; sem cla() ele precisa ser religado
+            self.ax.set_autoscale_on(True)
             self.ax.autoscale_view()
             # apply margin
             xmin, xmax = self.ax.get_xlim()
@@ -161,3 +255,38 @@ class PlotWidget(FigureCanvas):
             self.draw_idle()
         except Exception:
             pass
+
+    def heatmap(self, x, y, Z, label=None, cmap='viridis', logx=False, logy=False, robust=True):
+        """Desenha Z (len(y) x len(x)) como mapa de cores com barra de escala.
+
+        Valores NaN (ex.: malhas instáveis) ficam transparentes. Com robust=True
+        a escala de cores vai dos percentis 2 a 95, para que poucos pontos
+        quase instáveis não achatem o restante do mapa.
+        """
+        try:
+            x = np.asarray(x, dtype=float); y = np.asarray(y, dtype=float)
+            Z = np.ma.masked_invalid(np.asarray(Z, dtype=float))
+            vmin = vmax = None
+            if robust and Z.count() > 0:
+                vmin, vmax = np.percentile(Z.compressed(), [2, 95])
+            if self._mesh is not None:
+                self._mesh.remove()
+            mesh = self.ax.pcolormesh(x, y, Z, cmap=cmap, shading='nearest', vmin=vmin, vmax=vmax)
+            self._mesh = mesh
+            if logx:
+                self.ax.set_xscale('log')
+            if logy:
+                self.ax.set_yscale('log')
+            # sem cla() o dataLim guarda mapas anteriores: limites vêm deste mapa
+            lim = mesh.get_datalim(self.ax.transData)
+            self.ax.set_xlim(lim.x0, lim.x1)
+            self.ax.set_ylim(lim.y0, lim.y1)
+            if self._colorbar is not None:
+                self._colorbar.remove()
+            self._colorbar = self.figure.colorbar(mesh, ax=self.ax)
+            if label:
+                self._colorbar.set_label(str(label))
+            self.draw_idle()
+            return mesh
+        except Exception:
+            return None
@@ -0,0 +1,164 @@
+"""Execução de tarefas fora da thread da interface (QThreadPool/QRunnable).
+
+Cada tarefa tem um nome ("load", "identification", "tune", "sweep", ...).
+Submeter de novo um nome que ainda está em andamento torna a tarefa
+anterior obsoleta: se ainda estiver na fila ela é removida do pool; se já
+estiver rodando, o resultado é descartado e a flag de cancelamento é
+ligada para que funções cooperativas parem cedo.
+
+Os callbacks on_done/on_error sempre rodam na thread da interface (os
+sinais do worker chegam por conexão enfileirada), portanto podem mexer
+em widgets e gráficos livremente.
+"""
+
+import time
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, QTimer, pyqtSignal
+
+STATUS_INTERVAL_MS = 100
+
+
+class TaskCancelled(Exception):
+    """A tarefa foi substituída antes de começar a rodar."""
+
+
+class _TaskSignals(QObject):
+    finished = pyqtSignal(object)
+    failed = pyqtSignal(object)
+    progress = pyqtSignal(float)
+
+
+class Task(QRunnable):
+    """Chamada fn(*args, **kwargs) executada por um QThreadPool."""
+
+    def __init__(self, name, fn, args=(), kwargs=None, label=None):
+        super().__init__()
+        # o Python mantém a referência (TaskScheduler._alive); sem isso
+        # tryTake() poderia devolver um objeto já destruído pelo Qt
+        self.setAutoDelete(False)
+        self.name = name
+        self.label = label or name
+        self.fn = fn
+        self.args = tuple(args)
+        self.kwargs = dict(kwargs or {})
+        self.signals = _TaskSignals()
+        self.submitted = time.perf_counter()
+        self.fraction = None
+        self._cancelled = False
+
+    def cancel(self):
+        self._cancelled = True
+
+    def cancelled(self):
+        """True se a tarefa foi substituída (consultado pelas funções cooperativas)."""
+        return self._cancelled
+
+    def report(self, fraction):
+        """Progresso em [0, 1]; pode ser chamado de dentro do worker."""
+        self.signals.progress.emit(float(fraction))
+
+    def elapsed(self):
+        return time.perf_counter() - self.submitted
+
+    def run(self):
+        if self._cancelled:
+            self.signals.failed.emit(TaskCancelled(self.name))
+            return
+        try:
+            result = self.fn(*self.args, **self.kwargs)
+        except Exception as e:
+            self.signals.failed.emit(e)
+        else:
+            self.signals.finished.emit(result)
+
+
+class TaskScheduler(QObject):
+    """Agenda tarefas nomeadas num QThreadPool e publica o status em `status`.
+
+    status emite textos como "Identificação... 1.3 s (40%)" enquanto há
+    tarefas ativas e "Identificação concluída em 2.1 s" ao terminar.
+    """
+
+    status = pyqtSignal(str)
+
+    def __init__(self, parent=None, pool=None):
+        super().__init__(parent)
+        self._pool = pool if pool is not None else QThreadPool.globalInstance()
+        self._tasks = {}     # nome -> tarefa vigente
+        self._alive = set()  # tarefas ainda no pool (vigentes ou obsoletas)
+        self._timer = QTimer(self)
+        self._timer.setInterval(STATUS_INTERVAL_MS)
+        self._timer.timeout.connect(self._tick)
+
+    def submit(self, name, fn, *args, label=None, on_done=None, on_error=None, cooperative=False, **kwargs):
+        """Roda fn(*args, **kwargs) em segundo plano, substituindo a tarefa `name` anterior.
+
+        cooperative=True passa também progress=<callable(fração)> e
+        cancelled=<callable() -> bool> para fn.
+        """
+        self.cancel(name)
+        task = Task(name, fn, args, kwargs, label=label)
+        if cooperative:
+            task.kwargs.update(progress=task.report, cancelled=task.cancelled)
+        task.signals.finished.connect(lambda result, t=task: self._finished(t, result, on_done))
+        task.signals.failed.connect(lambda error, t=task: self._failed(t, error, on_error))
+        task.signals.progress.connect(lambda f, t=task: setattr(t, "fraction", f))
+        self._tasks[name] = task
+        self._alive.add(task)
+        self._pool.start(task)
+        self._timer.start()
+        self._tick()
+        return task
+
+    def cancel(self, name):
+        """Torna obsoleta a tarefa `name` (se houver); retorna True se havia uma."""
+        task = self._tasks.pop(name, None)
+        if task is None:
+            return False
+        task.cancel()
+        if self._pool.tryTake(task):
+            self._alive.discard(task)
+        return True
+
+    def cancel_all(self):
+        for name in list(self._tasks):
+            self.cancel(name)
+
+    def is_running(self, name=None):
+        return bool(self._tasks) if name is None else name in self._tasks
+
+    def _release(self, task):
+        self._alive.discard(task)
+        current = self._tasks.get(task.name) is task
+        if current:
+            del self._tasks[task.name]
+        if not self._tasks:
+            self._timer.stop()
+        return current
+
+    def _finished(self, task, result, callback):
+        if not self._release(task):
+            return
+        self.status.emit(f"{task.label} concluída em {task.elapsed():.2f} s")
+        if callback is not None:
+            try:
+                callback(result)
+            except Exception as e:
+                self.status.emit(f"{task.label}: erro ao exibir resultado: {e}")
+
+    def _failed(self, task, error, callback):
+        if not self._release(task):
+            return
+        self.status.emit(f"{task.label} falhou após {task.elapsed():.2f} s: {error}")
+        if callback is not None:
+            callback(error)
+
+    def _tick(self):
+        if not self._tasks:
+            return
+        parts = []
+        for task in self._tasks.values():
+            text = f"{task.label}... {task.elapsed():.1f} s"
+            if task.fraction is not None:
+                text += f" ({100 * task.fraction:.0f}%)"
+            parts.append(text)
+        self.status.emit(" | ".join(parts))
@@ -0,0 +1,117 @@
+"""Cache LRU limitado com estatísticas de acerto/falha.
+
+Usado para memoizar aproximações de Padé, sistemas do python-control já
+montados e resultados de simulação (models.system_model). Os caches são
+compartilhados entre threads (tarefas da interface rodam em workers),
+por isso todas as operações são protegidas por um lock; o cálculo de um
+valor ausente acontece fora do lock.
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+import numpy as np
+
+_REGISTRY = {}
+
+
+def _nbytes(value):
+    """Tamanho aproximado de um valor em bytes (arrays NumPy e tuplas/listas deles)."""
+    if isinstance(value, np.ndarray):
+        return int(value.nbytes)
+    if isinstance(value, (tuple, list)):
+        return sum(_nbytes(v) for v in value)
+    return 0
+
+
+class LRUCache:
+    """Dicionário LRU com no máximo `maxsize` itens (e `max_bytes` de arrays, se dado)."""
+
+    def __init__(self, name, maxsize=128, max_bytes=None):
+        self.name = name
+        self.maxsize = int(maxsize)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        _REGISTRY[name] = self
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key]
+            self.misses += 1
+            return default
+
+    def put(self, key, value):
+        size = _nbytes(value)
+        if self.maxsize <= 0 or (self.max_bytes is not None and size > self.max_bytes):
+            return value
+        with self._lock:
+            if key in self._data:
+                self._bytes -= _nbytes(self._data.pop(key))
+            self._data[key] = value
+            self._bytes += size
+            while len(self._data) > self.maxsize or (self.max_bytes is not None and self._bytes > self.max_bytes):
+                _, old = self._data.popitem(last=False)
+                self._bytes -= _nbytes(old)
+        return value
+
+    def get_or_compute(self, key, fn):
+        """Valor de `key`; se ausente calcula fn(), guarda e retorna."""
+        missing = object()
+        value = self.get(key, missing)
+        if value is missing:
+            value = self.put(key, fn())
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+            self.hits = self.misses = 0
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+        }
+
+
+def array_key(*arrays):
+    """Resumo (blake2b) do conteúdo, forma e tipo dos arrays; usado como chave."""
+    h = hashlib.blake2b(digest_size=16)
+    for a in arrays:
+        if a is None:
+            h.update(b"None")
+            continue
+        a = np.ascontiguousarray(a)
+        h.update(str((a.shape, a.dtype.str)).encode())
+        h.update(a.tobytes())
+    return h.hexdigest()
+
+
+def cache_stats():
+    """{nome: estatísticas} de todos os caches criados."""
+    return {name: c.stats() for name, c in _REGISTRY.items()}
+
+
+def clear_caches():
+    for c in _REGISTRY.values():
+        c.clear()
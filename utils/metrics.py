@@ -1,76 +1,139 @@
 import numpy as np
+from utils.timebase import TimeBase
 
-def eqm(y_true, y_hat):
-    y_true = np.asarray(y_true).ravel()
-    y_hat = np.asarray(y_hat).ravel()
-    if y_true.shape != y_hat.shape:
-        xp = np.linspace(0, 1, num=len(y_hat))
-        x = np.linspace(0, 1, num=len(y_true))
-        y_hat = np.interp(x, xp, y_hat)
+def eqm(y_true, y_hat, t_true=None, t_hat=None):
+    """Erro quadrático médio.
+
+    Sinais de tamanhos diferentes exigem os tempos t_true e t_hat: y_hat é
+    levado ao grid de y_true por utils.timebase (plano memoizado).
+    """
+    y_true = np.asarray(y_true, dtype=float).ravel()
+    y_hat = np.asarray(y_hat, dtype=float).ravel()
+    if t_true is not None and t_hat is not None:
+        y_hat = TimeBase(t_true).align(t_hat, y_hat)
+    elif y_true.shape != y_hat.shape:
+        raise ValueError("y_true e y_hat com tamanhos diferentes: informe t_true e t_hat")
     return float(np.mean((y_true - y_hat) ** 2))
 
+TAIL_FRACTION = 0.05  # fração final das amostras usada como valor de regime
+METRIC_KEYS = ("y0", "steady", "final", "t_low", "t_high", "tr", "ts", "mp", "tp", "ess", "iae", "ise", "itae")
+
+
+def _first_crossing(t, Y, level, direction):
+    """Tempo interpolado do primeiro cruzamento de `level` por linha de Y (NaN se não cruzar)."""
+    z = direction[:, None] * (Y - level[:, None]) >= 0
+    hit = z.any(axis=1)
+    idx = np.argmax(z, axis=1)
+    rows = np.arange(Y.shape[0])
+    i1 = np.maximum(idx, 1)
+    y_prev, y_next = Y[rows, i1 - 1], Y[rows, i1]
+    dy = y_next - y_prev
+    with np.errstate(divide="ignore", invalid="ignore"):
+        alpha = np.where(np.abs(dy) > 1e-12, (level - y_prev) / dy, 0.0)
+    tc = t[i1 - 1] + np.clip(alpha, 0.0, 1.0) * (t[i1] - t[i1 - 1])
+    tc = np.where(idx == 0, t[0], tc)
+    return np.where(hit, tc, np.nan)
+
+
+def step_metrics(t, y, sp=None, low=0.1, high=0.9, tol=0.02, tail=TAIL_FRACTION):
+    """
+    Métricas da resposta ao degrau calculadas de uma vez, para uma resposta (N,)
+    ou para várias respostas (M, N) no mesmo grid t.
+
+    O valor final é sp (se fornecido) ou a média da última fração `tail` das
+    amostras. Retorna dict com (escalares para y 1-D, arrays (M,) para 2-D):
+    - y0, steady (média final), final (referência usada)
+    - t_low, t_high, tr: cruzamentos interpolados de low/high e tempo de subida
+    - ts: tempo de acomodação na faixa ±tol·|final|
+    - mp: sobressinal máximo (fração de |final|), tp: tempo de pico
+    - ess: sp - steady (ou steady - y0 sem sp)
+    - iae, ise, itae: integrais (trapézios) do erro final - y
+    Valores indefinidos (ex.: sem cruzamento, |final| ~ 0) ficam NaN.
+    """
+    t = np.asarray(t, dtype=float).ravel()
+    Y = np.asarray(y, dtype=float)
+    single = Y.ndim == 1
+    Y = np.atleast_2d(Y)
+    M, n = Y.shape
+    if n == 0 or t.size != n:
+        nan = np.full(M, np.nan)
+        out = {k: nan.copy() for k in METRIC_KEYS}
+        return {k: float(v[0]) for k, v in out.items()} if single else out
+
+    y0 = Y[:, 0]
+    steady = Y[:, -max(1, int(tail * n)):].mean(axis=1)
+    final = steady if sp is None else np.full(M, float(sp))
+    direction = np.where(final >= y0, 1.0, -1.0)
+
+    # tempo de subida entre as frações low e high da excursão y0 -> final
+    t_low = _first_crossing(t, Y, y0 + low * (final - y0), direction)
+    t_high = _first_crossing(t, Y, y0 + high * (final - y0), direction)
+
+    # acomodação: primeira amostra após a última saída da faixa de tolerância
+    outside = np.abs(Y - final[:, None]) > tol * np.abs(final)[:, None]
+    any_out = outside.any(axis=1)
+    last_out = n - 1 - np.argmax(outside[:, ::-1], axis=1)
+    ts = np.where(any_out, t[np.minimum(last_out + 1, n - 1)], t[0])
+
+    # sobressinal e tempo de pico no sentido do degrau
+    peak_idx = np.argmax(direction[:, None] * Y, axis=1)
+    peak = Y[np.arange(M), peak_idx]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mp = np.where(np.abs(final) >= 1e-9, direction * (peak - final) / np.abs(final), np.nan)
+    tp = t[peak_idx]
+
+    ess = (final - steady) if sp is not None else (steady - y0)
+
+    # integrais do erro pela regra dos trapézios
+    e = final[:, None] - Y
+    dt = np.diff(t)
+    trap = lambda f: np.sum(0.5 * (f[:, 1:] + f[:, :-1]) * dt, axis=1)
+    ae = np.abs(e)
+    iae = trap(ae)
+    ise = trap(e ** 2)
+    itae = trap((t - t[0]) * ae)
+
+    out = {"y0": y0, "steady": steady, "final": final, "t_low": t_low, "t_high": t_high,
+           "tr": t_high - t_low, "ts": ts, "mp": mp, "tp": tp, "ess": ess,
+           "iae": iae, "ise": ise, "itae": itae}
+    if single:
+        return {k: float(v[0]) for k, v in out.items()}
+    return out
+
+
+def _or_none(v):
+    return None if not np.isfinite(v) else float(v)
+
+
 def compute_tr(t, y, low=0.1, high=0.9, sp=None):
     """
-    Compute rise time between fractions low and high.
+    Compute rise time between fractions low and high (interpolated crossings).
     If sp (setpoint) is provided, the final value is assumed to be sp.
     Otherwise the steady value is estimated as the mean of the last 5% of samples.
     """
-    t = np.asarray(t).ravel()
-    y = np.asarray(y).ravel()
-    if len(t) < 2 or len(y) < 2:
-        return None
-    y0 = float(y[0])
-    if sp is None:
-        yf = float(np.mean(y[-max(1, int(0.05*len(y))):]))
-    else:
-        yf = float(sp)
-    ylow = y0 + low * (yf - y0)
-    yhigh = y0 + high * (yf - y0)
-    try:
-        idx_low = np.where(y >= ylow)[0][0]
-        idx_high = np.where(y >= yhigh)[0][0]
-        return float(t[idx_high] - t[idx_low])
-    except Exception:
+    if len(np.ravel(t)) < 2 or len(np.ravel(y)) < 2:
         return None
+    return _or_none(step_metrics(t, np.ravel(y), sp=sp, low=low, high=high)["tr"])
 
 def compute_mp(y, sp=None):
     """
     Compute maximum overshoot as a fraction (e.g. 0.1 == 10%).
     If sp is provided, Mp is computed relative to sp; otherwise relative to estimated steady value.
     """
-    y = np.asarray(y).ravel()
+    y = np.asarray(y, dtype=float).ravel()
     if y.size == 0:
         return None
-    if sp is None:
-        yf = float(np.mean(y[-max(1, int(0.05*len(y))):]))
-    else:
-        yf = float(sp)
-    if abs(yf) < 1e-9:
-        return None
-    Mp = (np.max(y) - yf) / abs(yf)
-    return float(Mp)
+    return _or_none(step_metrics(np.arange(y.size), y, sp=sp)["mp"])
 
 def compute_ts(t, y, tol=0.02, sp=None):
     """
     Compute settling time as the first time the response remains within tol (fraction) of final value.
     If sp is provided, the final value is assumed to be sp.
     """
-    t = np.asarray(t).ravel()
-    y = np.asarray(y).ravel()
+    y = np.asarray(y, dtype=float).ravel()
     if y.size == 0:
         return None
-    if sp is None:
-        yf = float(np.mean(y[-max(1, int(0.05*len(y))):]))
-    else:
-        yf = float(sp)
-    lower = yf * (1 - tol); upper = yf * (1 + tol)
-    idx_out = np.where((y < lower) | (y > upper))[0]
-    if idx_out.size == 0:
-        return float(t[0])
-    last_out = int(idx_out[-1])
-    if last_out + 1 < len(t):
-        return float(t[last_out + 1])
-    return float(t[-1])
+    return _or_none(step_metrics(t, y, sp=sp, tol=tol)["ts"])
 
 def compute_ess(y, sp=None):
     """
@@ -78,10 +141,18 @@ def compute_ess(y, sp=None):
     Se sp fornecido (setpoint real), compute ess = SP - steady_value.
     Senão, fallback para y[-1] - y[0].
     """
-    y = np.asarray(y).ravel()
+    y = np.asarray(y, dtype=float).ravel()
     if y.size == 0:
         return 0.0
-    steady = float(np.mean(y[-max(1, int(0.05*len(y))):]))
-    if sp is None:
-        return float(steady - float(y[0]))
-    return float(sp - steady)
+    return float(step_metrics(np.arange(y.size), y, sp=sp)["ess"])
+
+def aic(y_true, y_hat, n_params):
+    """
+    Critério de informação de Akaike para ajuste por mínimos quadrados:
+    AIC = n·ln(SSE/n) + 2·p. Menor é melhor; penaliza modelos com mais parâmetros.
+    """
+    y_true = np.asarray(y_true, dtype=float).ravel()
+    y_hat = np.asarray(y_hat, dtype=float).ravel()
+    n = y_true.size
+    sse = float(np.sum((y_true - y_hat) ** 2))
+    return float(n * np.log(max(sse, 1e-300) / n) + 2 * int(n_params))
@@ -0,0 +1,42 @@
+"""Execução de tarefas em blocos num pool de processos, com progresso e cancelamento.
+
+Laço comum à varredura de ganhos (tuning.sweep), à análise de Monte Carlo
+(tuning.robustness), à identificação por segmentos
+(identification.segmentation) e ao escalonamento de ganhos
+(tuning.scheduling).
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+
+def map_chunks(fn, chunks, args=(), workers=None, progress=None, cancelled=None):
+    """[fn(c, *args) for c in chunks], em paralelo, na ordem de `chunks`.
+
+    fn precisa ser importável pelos processos filhos.
+    workers: número de processos (None = todos os núcleos, 1 = sem pool).
+    progress: callable(fração) chamado a cada bloco concluído.
+    cancelled: callable() -> bool consultado entre blocos; se True os
+    blocos pendentes são descartados e a função retorna None.
+    """
+    chunks = list(chunks)
+    workers = (os.cpu_count() or 1) if workers is None else int(workers)
+    parts = []
+    if workers <= 1 or len(chunks) <= 1:
+        for c in chunks:
+            if cancelled is not None and cancelled():
+                return None
+            parts.append(fn(c, *args))
+            if progress is not None:
+                progress(len(parts) / len(chunks))
+        return parts
+    with ProcessPoolExecutor(max_workers=min(workers, len(chunks))) as pool:
+        futures = [pool.submit(fn, c, *args) for c in chunks]
+        for f in futures:
+            if cancelled is not None and cancelled():
+                pool.shutdown(wait=False, cancel_futures=True)
+                return None
+            parts.append(f.result())
+            if progress is not None:
+                progress(len(parts) / len(chunks))
+    return parts
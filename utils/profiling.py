@@ -0,0 +1,196 @@
+"""Instrumentação opcional dos caminhos críticos (tempo, chamadas e memória).
+
+Desligada por padrão: o decorador custa apenas um teste de flag por
+chamada. Liga pela variável de ambiente C213_PROFILE ou por enable():
+
+    C213_PROFILE=1       tempo de parede e contagem de chamadas
+    C213_PROFILE=memory  idem + bytes alocados (pico via tracemalloc)
+    C213_PROFILE_TRACE=arquivo.json  grava o trace Chrome ao sair
+
+Uso:
+
+    @profiled("smith_identification")
+    def smith_identification(...): ...
+
+    with profile_block("run_tune"):
+        ...
+
+O pico do tracemalloc é único para o processo: blocos que se sobrepõem
+em threads diferentes (ex.: duas tarefas de ui.tasks ao mesmo tempo)
+registram só o tempo, sem bytes. Alocações de threads fora de qualquer
+bloco medido ainda entram no pico, então a medição de memória é
+confiável com uma tarefa por vez.
+
+stats() agrega por nome; dump_chrome_trace() gera um arquivo para
+chrome://tracing / Perfetto e dump_json() as estatísticas agregadas.
+"""
+
+import atexit
+import functools
+import json
+import os
+import threading
+import time
+import tracemalloc
+from collections import deque
+from contextlib import contextmanager
+
+ENV_VAR = "C213_PROFILE"
+TRACE_ENV_VAR = "C213_PROFILE_TRACE"
+MAX_EVENTS = 100_000
+
+_enabled = False
+_memory = False
+_lock = threading.Lock()
+_local = threading.local()
+_stats = {}
+_events = deque(maxlen=MAX_EVENTS)
+# blocos com medição de memória em andamento: thread -> profundidade, e as
+# threads cujos blocos se sobrepuseram a outra thread (medição inválida)
+_mem_threads = {}
+_mem_tainted = set()
+_t0 = time.perf_counter()
+
+
+def enable(memory=False):
+    """Liga a coleta; memory=True também mede bytes alocados (mais lento)."""
+    global _enabled, _memory
+    _enabled = True
+    _memory = bool(memory)
+    if _memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+
+
+def disable():
+    global _enabled, _memory
+    _enabled = False
+    if _memory and tracemalloc.is_tracing():
+        tracemalloc.stop()
+    _memory = False
+
+
+def is_enabled():
+    return _enabled
+
+
+def reset():
+    with _lock:
+        _stats.clear()
+        _events.clear()
+
+
+def _record(name, start, elapsed, nbytes):
+    with _lock:
+        s = _stats.get(name)
+        if s is None:
+            s = _stats[name] = {"calls": 0, "total_s": 0.0, "max_s": 0.0, "bytes": 0, "max_bytes": 0}
+        s["calls"] += 1
+        s["total_s"] += elapsed
+        s["max_s"] = max(s["max_s"], elapsed)
+        if nbytes is not None:
+            s["bytes"] += nbytes
+            s["max_bytes"] = max(s["max_bytes"], nbytes)
+        _events.append((name, start, elapsed, threading.get_ident(), nbytes))
+
+
+@contextmanager
+def profile_block(name):
+    """Mede o bloco `with` sob o nome `name` (sem efeito se desligado)."""
+    if not _enabled:
+        yield
+        return
+    memory = _memory and tracemalloc.is_tracing()
+    stack = getattr(_local, "stack", None)
+    if stack is None:
+        stack = _local.stack = []
+    if memory:
+        me = threading.get_ident()
+        with _lock:
+            if any(t != me for t in _mem_threads):
+                _mem_tainted.update(_mem_threads)
+                _mem_tainted.add(me)
+            _mem_threads[me] = _mem_threads.get(me, 0) + 1
+        # o pico do tracemalloc é global: zera na entrada e repassa o
+        # pico interno ao bloco pai na saída, para suportar aninhamento
+        current0, peak0 = tracemalloc.get_traced_memory()
+        if stack:
+            stack[-1] = max(stack[-1], peak0)
+        tracemalloc.reset_peak()
+    stack.append(0)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        inner_peak = stack.pop()
+        nbytes = None
+        if memory:
+            _, peak1 = tracemalloc.get_traced_memory()
+            peak = max(peak1, inner_peak)
+            if stack:
+                stack[-1] = max(stack[-1], peak)
+            with _lock:
+                overlapped = me in _mem_tainted
+                depth = _mem_threads.pop(me) - 1
+                if depth:
+                    _mem_threads[me] = depth
+                else:
+                    _mem_tainted.discard(me)
+            nbytes = None if overlapped else max(peak - current0, 0)
+        _record(name, start, elapsed, nbytes)
+
+
+def profiled(name=None):
+    """Decorador: registra cada chamada sob `name` (padrão: módulo.função)."""
+    def decorator(fn):
+        label = name or f"{fn.__module__}.{fn.__qualname__}"
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return fn(*args, **kwargs)
+            with profile_block(label):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def stats():
+    """{nome: {calls, total_s, mean_s, max_s, bytes, max_bytes}} ordenado por tempo total."""
+    with _lock:
+        items = [(k, dict(v)) for k, v in _stats.items()]
+    for _, s in items:
+        s["mean_s"] = s["total_s"] / s["calls"] if s["calls"] else 0.0
+    return dict(sorted(items, key=lambda kv: kv[1]["total_s"], reverse=True))
+
+
+def chrome_trace():
+    """Eventos no formato Trace Event (chrome://tracing, Perfetto)."""
+    with _lock:
+        events = list(_events)
+    pid = os.getpid()
+    out = []
+    for name, start, elapsed, tid, nbytes in events:
+        ev = {"name": name, "ph": "X", "pid": pid, "tid": tid,
+              "ts": (start - _t0) * 1e6, "dur": elapsed * 1e6}
+        if nbytes is not None:
+            ev["args"] = {"bytes": nbytes}
+        out.append(ev)
+    return {"traceEvents": out, "displayTimeUnit": "ms"}
+
+
+def dump_chrome_trace(path):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(chrome_trace(), f)
+
+
+def dump_json(path):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(stats(), f, indent=2)
+
+
+_mode = os.environ.get(ENV_VAR, "").strip().lower()
+if _mode and _mode not in ("0", "false", "no", "off"):
+    enable(memory=_mode in ("memory", "mem", "2"))
+if os.environ.get(TRACE_ENV_VAR):
+    atexit.register(lambda: dump_chrome_trace(os.environ[TRACE_ENV_VAR]))
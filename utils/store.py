@@ -0,0 +1,216 @@
+"""Armazenamento persistente de resultados, endereçado pelo conteúdo.
+
+Um único arquivo SQLite guarda datasets já lidos, identificações e
+sintonias. A chave de cada entrada é o sha256 do tipo de resultado, do
+conteúdo do dataset (não do nome do arquivo) e das configurações usadas,
+de modo que reabrir um .mat já analisado (mesmo renomeado ou copiado)
+pula leitura e identificação. O sha256 de cada arquivo é memorizado por
+(caminho, tamanho, mtime), evitando reler arquivos grandes.
+
+Os valores são dicts/listas/tuplas com arrays NumPy e escalares: a
+estrutura vai em JSON e os arrays num .npz dentro do mesmo registro.
+
+    C213_STORE=/caminho/store.sqlite   local do arquivo (padrão ~/.cache/c213)
+    C213_STORE=0                       desliga o armazenamento
+
+Entradas menos usadas são descartadas quando o total passa de MAX_BYTES.
+"""
+
+import hashlib
+import io
+import json
+import os
+import sqlite3
+import threading
+import time
+import numpy as np
+
+ENV_VAR = "C213_STORE"
+DEFAULT_PATH = os.path.join(os.path.expanduser("~"), ".cache", "c213", "store.sqlite")
+# incrementar quando a codificação das entradas (_encode/_decode) mudar
+STORE_VERSION = 1
+# versão do algoritmo/formato de cada tipo de resultado, incluída na chave:
+# incrementar a entrada do tipo em toda mudança que altere o que ele produz
+# (pré-processamento, identificação, simulação, campos do resultado...),
+# senão resultados antigos continuam sendo servidos entre execuções
+KIND_VERSIONS = {
+    "dataset": 1,
+    "identification": 3,   # 2: pré-processamento, EQM no grid do dataset, LS com y0; 3: u0/y0 nos segmentos
+    "tune": 2,             # grids irregulares e resposta analítica na simulação
+}
+MAX_BYTES = 512 * 2 ** 20
+HASH_CHUNK = 1 << 20
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY, kind TEXT, created REAL, accessed REAL,
+    size INTEGER, meta TEXT, arrays BLOB);
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER, digest TEXT);
+"""
+
+
+def _encode(value, arrays):
+    """Estrutura JSON de `value`; arrays vão para o dict `arrays`."""
+    if isinstance(value, np.ndarray):
+        name = f"a{len(arrays)}"
+        arrays[name] = value
+        return {"__nd__": name}
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, dict):
+        if not all(isinstance(k, str) for k in value):
+            raise TypeError("apenas dicts com chaves str podem ser armazenados")
+        return {k: _encode(v, arrays) for k, v in value.items()}
+    if isinstance(value, tuple):
+        return {"__tuple__": [_encode(v, arrays) for v in value]}
+    if isinstance(value, list):
+        return [_encode(v, arrays) for v in value]
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    raise TypeError(f"tipo não suportado pelo armazenamento: {type(value).__name__}")
+
+
+def _decode(value, arrays):
+    if isinstance(value, dict):
+        if "__nd__" in value:
+            return arrays[value["__nd__"]]
+        if "__tuple__" in value:
+            return tuple(_decode(v, arrays) for v in value["__tuple__"])
+        return {k: _decode(v, arrays) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_decode(v, arrays) for v in value]
+    return value
+
+
+def make_key(kind, *parts, **settings):
+    """sha256 do tipo (e sua versão em KIND_VERSIONS), das partes (ex.: digest
+    do dataset) e das configurações."""
+    arrays = {}
+    payload = json.dumps({"v": STORE_VERSION, "kind": kind, "kind_v": KIND_VERSIONS.get(kind, 0),
+                          "parts": _encode(list(parts), arrays),
+                          "settings": _encode(settings, arrays)}, sort_keys=True)
+    if arrays:
+        raise TypeError("use utils.cache.array_key para incluir arrays na chave")
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class ResultStore:
+    """Tabela chave -> resultado num arquivo SQLite (seguro entre threads)."""
+
+    def __init__(self, path=DEFAULT_PATH, max_bytes=MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(_SCHEMA)
+
+    def file_digest(self, path):
+        """sha256 do conteúdo de `path`, memorizado por (tamanho, mtime)."""
+        path = os.path.abspath(path)
+        st = os.stat(path)
+        with self._lock:
+            row = self._db.execute("SELECT size, mtime_ns, digest FROM files WHERE path = ?", (path,)).fetchone()
+        if row is not None and row[0] == st.st_size and row[1] == st.st_mtime_ns:
+            return row[2]
+        h = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(HASH_CHUNK), b""):
+                h.update(chunk)
+        digest = h.hexdigest()
+        with self._lock:
+            self._db.execute("INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?)",
+                             (path, st.st_size, st.st_mtime_ns, digest))
+        return digest
+
+    def get(self, key, default=None):
+        with self._lock:
+            row = self._db.execute("SELECT meta, arrays FROM entries WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return default
+            self._db.execute("UPDATE entries SET accessed = ? WHERE key = ?", (time.time(), key))
+            self.hits += 1
+        with np.load(io.BytesIO(row[1]), allow_pickle=False) as npz:
+            arrays = {name: npz[name] for name in npz.files}
+        return _decode(json.loads(row[0]), arrays)
+
+    def put(self, key, value, kind=""):
+        arrays = {}
+        meta = json.dumps(_encode(value, arrays))
+        buf = io.BytesIO()
+        np.savez(buf, **arrays)
+        blob = buf.getvalue()
+        now = time.time()
+        with self._lock:
+            self._db.execute("INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?)",
+                             (key, kind, now, now, len(meta) + len(blob), meta, blob))
+            self._evict()
+        return value
+
+    def get_or_compute(self, key, fn, kind=""):
+        """Valor guardado em `key`; se ausente calcula fn() e guarda.
+
+        Falhas ao gravar (tipo não suportado, disco cheio) não impedem o
+        retorno do valor calculado.
+        """
+        missing = object()
+        value = self.get(key, missing)
+        if value is missing:
+            value = fn()
+            try:
+                self.put(key, value, kind)
+            except (TypeError, ValueError, OSError, sqlite3.Error):
+                pass
+        return value
+
+    def _evict(self):
+        total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if self.max_bytes is None or total <= self.max_bytes:
+            return
+        for key, size in self._db.execute("SELECT key, size FROM entries ORDER BY accessed").fetchall():
+            self._db.execute("DELETE FROM entries WHERE key = ?", (key,))
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    def clear(self):
+        with self._lock:
+            self._db.execute("DELETE FROM entries")
+            self._db.execute("DELETE FROM files")
+            self.hits = self.misses = 0
+
+    def stats(self):
+        with self._lock:
+            count, size = self._db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+        total = self.hits + self.misses
+        return {"hits": self.hits, "misses": self.misses, "hit_rate": self.hits / total if total else 0.0,
+                "size": count, "bytes": size, "max_bytes": self.max_bytes, "path": self.path}
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+_default = None
+_default_lock = threading.Lock()
+
+
+def default_store():
+    """ResultStore compartilhado (C213_STORE); None se desligado ou indisponível."""
+    global _default
+    with _default_lock:
+        if _default is None:
+            path = os.environ.get(ENV_VAR, DEFAULT_PATH)
+            if path.strip().lower() in ("0", "off", "false", ""):
+                _default = False
+            else:
+                try:
+                    _default = ResultStore(path)
+                except (OSError, sqlite3.Error):
+                    _default = False
+        return _default or None
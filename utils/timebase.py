@@ -0,0 +1,121 @@
+"""Base de tempo canônica de um dataset e planos de reamostragem reutilizáveis.
+
+TimeBase guarda o vetor de tempo de um registro (uniforme ou com
+instantes irregulares) junto com o que costuma ser recalculado a cada
+clique: passos, uniformidade e chave de conteúdo. Para levar um sinal de
+outro grid para esta base, plan() calcula uma vez os índices e pesos de
+interpolação (ResamplePlan) e os guarda num cache LRU; align() devolve o
+próprio array, sem cópia, quando o grid de origem já é esta base.
+"""
+
+import numpy as np
+from utils.cache import LRUCache, array_key
+
+UNIFORM_RTOL = 1e-6
+RESAMPLE_KINDS = ("linear", "zoh")
+
+PLAN_CACHE = LRUCache("resample_plans", maxsize=32, max_bytes=64 * 2 ** 20)
+
+
+def is_uniform_grid(T, rtol=UNIFORM_RTOL):
+    """True se o vetor de tempo T for (aproximadamente) igualmente espaçado."""
+    T = np.asarray(T, dtype=float).ravel()
+    if T.size < 3:
+        return True
+    dt = (T[-1] - T[0]) / (T.size - 1)
+    if dt <= 0:
+        return False
+    return bool(np.max(np.abs(np.diff(T) - dt)) <= rtol * abs(dt) + 1e-12)
+
+
+class ResamplePlan:
+    """Índices e pesos que levam sinais do grid `src` para o grid `dst`.
+
+    kind "linear" interpola entre amostras vizinhas; "zoh" repete a última
+    amostra (entradas aplicadas por segurador de ordem zero). Fora de
+    [src[0], src[-1]] valem os valores das extremidades.
+    """
+
+    def __init__(self, src, dst, kind="linear"):
+        if kind not in RESAMPLE_KINDS:
+            raise ValueError(f"tipo de reamostragem inválido: {kind!r} (use {', '.join(RESAMPLE_KINDS)})")
+        src = np.asarray(src, dtype=float).ravel()
+        dst = np.asarray(dst, dtype=float).ravel()
+        self.kind = kind
+        self.size = dst.size
+        i = np.searchsorted(src, dst, side="right") - 1
+        if kind == "zoh" or src.size < 2:
+            self.index = np.clip(i, 0, src.size - 1)
+            self.weight = None
+        else:
+            i = np.clip(i, 0, src.size - 2)
+            self.index = i
+            self.weight = np.clip((dst - src[i]) / (src[i + 1] - src[i]), 0.0, 1.0)
+
+    def apply(self, Y):
+        """Y (N,) ou (M, N) no grid de origem -> (..., len(dst))."""
+        Y = np.asarray(Y, dtype=float)
+        if self.weight is None:
+            return Y[..., self.index]
+        return Y[..., self.index] * (1.0 - self.weight) + Y[..., self.index + 1] * self.weight
+
+
+class TimeBase:
+    """Vetor de tempo estritamente crescente de um dataset, analisado uma vez."""
+
+    def __init__(self, t):
+        t = np.ascontiguousarray(np.asarray(t, dtype=float).ravel())
+        if t.size > 1 and not np.all(np.diff(t) > 0):
+            raise ValueError("o vetor de tempo deve ser estritamente crescente")
+        self.t = t
+        self.n = t.size
+        self.uniform = is_uniform_grid(t)
+        # passo médio (o passo de fato, em grids uniformes)
+        self.dt = float((t[-1] - t[0]) / (t.size - 1)) if t.size > 1 else 0.0
+        self._key = None
+
+    @property
+    def key(self):
+        if self._key is None:
+            self._key = array_key(self.t)
+        return self._key
+
+    def steps(self):
+        """Passos t[k+1] - t[k] (tamanho n - 1)."""
+        return np.diff(self.t)
+
+    def same_grid(self, t):
+        """True se `t` é este mesmo grid (o próprio array ou valores iguais)."""
+        if t is self.t:
+            return True
+        t = np.asarray(t)
+        return t.size == self.n and bool(np.array_equal(t.ravel(), self.t))
+
+    def plan(self, src, kind="linear"):
+        """ResamplePlan do grid `src` para esta base (memoizado)."""
+        src = np.asarray(src, dtype=float).ravel()
+        return PLAN_CACHE.get_or_compute((array_key(src), self.key, kind),
+                                         lambda: ResamplePlan(src, self.t, kind))
+
+    def align(self, src, Y, kind="linear"):
+        """Y amostrado em `src` levado para esta base; sem cópia se src já for a base."""
+        if self.same_grid(src):
+            return np.asarray(Y, dtype=float)
+        return self.plan(src, kind).apply(Y)
+
+    def fit(self, U, kind="linear"):
+        """Sinal com outro número de amostras esticado sobre [t[0], t[-1]].
+
+        Usado quando o .mat traz u e t com tamanhos diferentes: as amostras
+        de U são tomadas como igualmente espaçadas no mesmo intervalo.
+        """
+        U = np.asarray(U, dtype=float).ravel()
+        if U.size == self.n:
+            return U
+        if U.size == 1:
+            return np.full(self.n, float(U[0]))
+        return self.align(np.linspace(self.t[0], self.t[-1], U.size), U, kind)
+
+    def uniform_grid(self):
+        """Grid uniforme com as mesmas extremidades e número de amostras."""
+        return self.t if self.uniform else np.linspace(self.t[0], self.t[-1], self.n)